@@ -5,12 +5,27 @@ Implements the exact physical formulation from scoring_rules.md Section 8.2.1.C.
 Search domains bounded by electrical conversion thermodynamics & PMIC hardware physics
 (F_protocol in [0.65, 1.50], eta_base in [0.35, 0.55]), guaranteeing 100% strict interiority
 and physical interpretability across all candidate loss functions.
+
+Every optimizer takes space="T" (fit T_C - T_A, the default) or space="S1" / "S2" (fit the
+published 0-10 score S_C - S_A directly, Strategy 1 dynamic or Strategy 2 [9, 241] bounds,
+clipped; method_c_batch.space_residuals). main(score_space=True) compares the three.
 """
 
 import json
 import math
 import os
-import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "..", "section_8_2_method_c_huber_optimization_study", "working_files"
+))
+from method_c_batch import make_columns, predict_multiplier_12p, batch_loss, map_score, space_residuals
+from method_c_batch import map_score_s1 as _map_score_s1
+from batch_search import screen_candidates, pattern_search
+from result_cache import cache_inputs, cached
 
 # ============================================================================
 # BENCHMARK DATASET: 44 GSMArena laboratory-tested smartphones (5W to 240W)
@@ -68,6 +83,9 @@ BENCHMARK_DEVICES = [
     (19.25,   7.7, 'single', 'legacy_5v',   205.0,  0.49, "Samsung Galaxy A03 Core",  "https://www.gsmarena.com/samsung_galaxy_a03_core-review-2371p3.php"),
 ]
 
+# Column arrays of the benchmark for the vectorized screening loss
+BENCHMARK_COLUMNS = make_columns(BENCHMARK_DEVICES, "tuple")
+
 PARAM_KEYS = [
     "C_threshold", "k", "p", "eta_base", "s_low", "T_handshake",
     "F_charge_pump", "F_pps", "F_fixed_pd", "F_legacy_5v", "F_apple", "F_arch"
@@ -142,126 +160,103 @@ def predict_all(params):
     return [predict_duration(d[0], d[1], d[2], d[3], params) for d in BENCHMARK_DEVICES]
 
 
-def compute_loss(loss_type, params, delta=10.0):
-    T_C = predict_all(params)
-    N = len(BENCHMARK_DEVICES)
-    total = 0.0
-    for i, d in enumerate(BENCHMARK_DEVICES):
-        err = d[4] - T_C[i]  # T_A - T_C
-        ae = abs(err)
-        if loss_type == "mse":
-            total += err * err
-        elif loss_type == "mae":
-            total += ae
-        elif loss_type == "huber":
-            if ae <= delta:
-                total += 0.5 * ae * ae
-            else:
-                total += delta * ae - 0.5 * delta * delta
-    return total / N
-
-
-def global_optimize(loss_type, bounds, delta=10.0, num_trials=120000, seed=42):
-    random.seed(seed)
-    best_params = list(BASELINE_PARAMS)
-    best_loss = compute_loss(loss_type, best_params, delta)
-
-    # Multi-start random sampling across parameter space
-    for trial in range(num_trials):
-        cand = []
-        for j in range(len(PARAM_KEYS)):
-            lo, hi = bounds[j]
-            if lo == hi:
-                cand.append(lo)
-                continue
-            if random.random() < 0.6:
-                cand.append(BASELINE_PARAMS[j] + random.gauss(0, (hi - lo) * 0.15))
-            else:
-                cand.append(random.uniform(lo, hi))
-            cand[j] = max(lo, min(hi, cand[j]))
-        
-        l = compute_loss(loss_type, cand, delta)
+def compute_loss(loss_type, params, delta=10.0, space="T"):
+    """Calibration loss in duration space ("T") or Strategy 1 / 2 score space ("S1" / "S2")."""
+    T_C = np.array(predict_all(params))
+    return batch_loss(space_residuals(T_C, BENCHMARK_COLUMNS, space), loss_type, delta)
+
+
+def population_loss(loss_type, population, delta=10.0, space="T"):
+    """compute_loss for a whole (S, 12) population in one vectorized pass."""
+    T_C = predict_multiplier_12p(BENCHMARK_COLUMNS, population)["t_pred"]
+    return batch_loss(space_residuals(T_C, BENCHMARK_COLUMNS, space), loss_type, delta)
+
+
+def global_optimize(loss_type, bounds, delta=10.0, num_trials=120000, seed=42, top_k=8, block_size=4096,
+                    mode="greedy", space="T"):
+    def loss(pop):
+        return population_loss(loss_type, pop, delta, space)
+
+    # Quasi-random multi-start screening in vectorized blocks, keeping the top_k candidates
+    starts = screen_candidates(loss, bounds, BASELINE_PARAMS, num_trials,
+                               top_k=top_k, block_size=block_size, seed=seed)
+
+    # Multi-resolution adaptive pattern search (batched stencil) from every kept candidate;
+    # the best refined one wins
+    best_params, best_loss = None, math.inf
+    for _, cand in starts:
+        params, l = pattern_search(loss, cand, bounds, mode=mode, max_outer=3000)
         if l < best_loss:
-            best_loss = l
-            best_params = list(cand)
-
-    # Multi-resolution adaptive pattern search fine-tuning
-    step = 0.05
-    for outer in range(3000):
-        improved = False
-        for j in range(len(PARAM_KEYS)):
-            lo, hi = bounds[j]
-            if lo == hi:
-                continue
-            for mult in [1.0, 0.5, 0.2, 0.05, 0.01, 0.002]:
-                s = step * mult * (hi - lo)
-                for direction in [+1.0, -1.0]:
-                    trial = max(lo, min(hi, best_params[j] + direction * s))
-                    if abs(trial - best_params[j]) < 1e-12:
-                        continue
-                    cand = list(best_params)
-                    cand[j] = trial
-                    l = compute_loss(loss_type, cand, delta)
-                    if l < best_loss - 1e-10:
-                        best_loss = l
-                        best_params = list(cand)
-                        improved = True
-        if not improved:
-            step *= 0.5
-            if step < 1e-8:
-                break
+            best_params, best_loss = params, l
 
     return best_params, best_loss
 
 
-def compute_t_metrics(params):
-    T_C = predict_all(params)
-    N = len(BENCHMARK_DEVICES)
-    e = [BENCHMARK_DEVICES[i][4] - T_C[i] for i in range(N)]
-    mse = sum(x**2 for x in e) / N
+def cached_global_optimize(loss_type, bounds, delta=10.0, num_trials=120000, seed=42, top_k=8, block_size=4096,
+                           mode="greedy", space="T", refresh=False):
+    """global_optimize, loaded from the result cache when these exact inputs were solved before."""
+    settings = {"num_trials": num_trials, "top_k": top_k, "block_size": block_size, "mode": mode,
+                "sampler": "sobol", "max_outer": 3000}
+    if space != "T":
+        settings["space"] = space  # duration-space entries keep their existing keys
+    inputs = cache_inputs("multiplier_12p", BENCHMARK_DEVICES, bounds, loss_type, delta,
+                          settings=settings, seed=seed,
+                          code=[population_loss, predict_multiplier_12p, space_residuals])
+    params, loss = cached(
+        inputs,
+        lambda: global_optimize(loss_type, bounds, delta, num_trials, seed, top_k, block_size, mode, space),
+        refresh=refresh
+    )
+    return params, loss
+
+
+def t_metrics(T_C):
+    e = BENCHMARK_COLUMNS["T_A"] - np.asarray(T_C)
+    mse = float(np.mean(e ** 2))
     return {
         "MSE_T":   round(mse, 2),
         "RMSE_T":  round(math.sqrt(mse), 2),
-        "MAE_T":   round(sum(abs(x) for x in e) / N, 2),
-        "Mean_dT": round(sum(e) / N, 2),
-        "T_min_C": round(min(T_C), 2),
-        "T_max_C": round(max(T_C), 2),
+        "MAE_T":   round(float(np.mean(np.abs(e))), 2),
+        "Mean_dT": round(float(np.mean(e)), 2),
+        "T_min_C": round(float(np.min(T_C)), 2),
+        "T_max_C": round(float(np.max(T_C)), 2),
     }
 
 
+def compute_t_metrics(params):
+    return t_metrics(predict_all(params))
+
+
 def map_score_s2(T_C, T_min_A=9.00, T_max_A=241.0):
     """Strategy 2: Benchmark-aligned log normalization with floor clipping."""
-    log_min = math.log(T_min_A)
-    log_max = math.log(T_max_A)
-    denom = log_max - log_min
-    return [max(0.0, min(10.0, 10.0 * (log_max - math.log(max(1.0, tc))) / denom)) for tc in T_C]
+    return map_score(T_C, T_min_A, T_max_A)
 
 
 def map_score_s1(T_C):
     """Strategy 1: Dynamic model bounds log normalization."""
-    t_min = min(T_C)
-    t_max = max(T_C)
-    log_min = math.log(max(1.0, t_min))
-    log_max = math.log(max(2.0, t_max))
-    denom = log_max - log_min
-    if denom <= 0:
-        denom = 1.0
-    return [max(0.0, min(10.0, 10.0 * (log_max - math.log(max(1.0, tc))) / denom)) for tc in T_C]
+    return _map_score_s1(T_C)
 
 
 def compute_s_metrics(S_C):
-    N = len(BENCHMARK_DEVICES)
-    e = [BENCHMARK_DEVICES[i][5] - S_C[i] for i in range(N)]
-    mse = sum(x**2 for x in e) / N
+    e = BENCHMARK_COLUMNS["S_A"] - np.asarray(S_C)
+    mse = float(np.mean(e ** 2))
     return {
         "MSE_S":   round(mse, 4),
         "RMSE_S":  round(math.sqrt(mse), 4),
-        "MAE_S":   round(sum(abs(x) for x in e) / N, 4),
-        "Mean_dS": round(sum(e) / N, 4),
+        "MAE_S":   round(float(np.mean(np.abs(e))), 4),
+        "Mean_dS": round(float(np.mean(e)), 4),
     }
 
 
-def main():
+def compute_metrics(params):
+    """Duration metrics and Strategy 1 / Strategy 2 score metrics from one prediction pass."""
+    T_C = np.array(predict_all(params))
+    return {"T": t_metrics(T_C), "S1": compute_s_metrics(map_score_s1(T_C)),
+            "S2": compute_s_metrics(map_score_s2(T_C))}
+
+
+def main(score_space=False):
+    # score_space: also calibrate Pure MAE directly on the Strategy 1 / 2 scores (section 3b)
     N = len(BENCHMARK_DEVICES)
     print("=" * 80)
     print("METHOD C MASTER PARAMETER OPTIMIZATION (PHYSICALLY BOUNDED SANITY DOMAINS)")
@@ -269,9 +264,9 @@ def main():
     print("=" * 80)
 
     # ---- Global multi-start optimization across loss functions ----
-    p_mse, l_mse = global_optimize("mse", PARAM_BOUNDS, seed=101)
-    p_mae, l_mae = global_optimize("mae", PARAM_BOUNDS, seed=202)
-    p_hub, l_hub = global_optimize("huber", PARAM_BOUNDS, delta=10.0, seed=303)
+    p_mse, l_mse = cached_global_optimize("mse", PARAM_BOUNDS, seed=101)
+    p_mae, l_mae = cached_global_optimize("mae", PARAM_BOUNDS, seed=202)
+    p_hub, l_hub = cached_global_optimize("huber", PARAM_BOUNDS, delta=10.0, seed=303)
 
     # ---- Print Parameter Table ----
     print("\n--- 1. CALIBRATED PARAMETER TABLE ---")
@@ -281,32 +276,41 @@ def main():
         lo, hi = PARAM_BOUNDS[j]
         print(f"{name:<28} {BASELINE_PARAMS[j]:>9.4f} {p_mse[j]:>9.4f} {p_mae[j]:>9.4f} {p_hub[j]:>9.4f}  [{lo:.2f}, {hi:.2f}]")
 
-    # ---- Duration Metrics ----
+    # ---- Duration and score metrics, one prediction pass per model ----
+    models = [("Baseline", BASELINE_PARAMS), ("Pure MSE", p_mse), ("Pure MAE", p_mae), ("Huber 10", p_hub)]
+    metrics = {label: compute_metrics(p) for label, p in models}
+
     print("\n--- 2. DURATION METRICS COMPARISON ---")
     print(f"{'Model':<14} {'MSE_T':>10} {'RMSE_T':>8} {'MAE_T':>8} {'Mean_dT':>9} {'T_min_C':>8} {'T_max_C':>9}")
     print("-" * 70)
-    for label, p in [("Baseline", BASELINE_PARAMS), ("Pure MSE", p_mse),
-                     ("Pure MAE", p_mae), ("Huber 10", p_hub)]:
-        tm = compute_t_metrics(p)
+    for label, _ in models:
+        tm = metrics[label]["T"]
         print(f"{label:<14} {tm['MSE_T']:>10.2f} {tm['RMSE_T']:>8.2f} {tm['MAE_T']:>8.2f} {tm['Mean_dT']:>+9.2f} {tm['T_min_C']:>8.2f} {tm['T_max_C']:>9.2f}")
 
     # ---- Score Metrics ----
     print("\n--- 3. SCORE METRICS: STRATEGY 2 (Benchmark Aligned Bounds, T_max=241.0) ---")
     print(f"{'Model':<14} {'MSE_S':>8} {'RMSE_S':>8} {'MAE_S':>8} {'Mean_dS':>9}")
     print("-" * 50)
-    for label, p in [("Baseline", BASELINE_PARAMS), ("Pure MSE", p_mse),
-                     ("Pure MAE", p_mae), ("Huber 10", p_hub)]:
-        T_C = predict_all(p)
-        S_C = map_score_s2(T_C)
-        sm = compute_s_metrics(S_C)
+    for label, _ in models:
+        sm = metrics[label]["S2"]
         print(f"{label:<14} {sm['MSE_S']:>8.4f} {sm['RMSE_S']:>8.4f} {sm['MAE_S']:>8.4f} {sm['Mean_dS']:>+9.4f}")
 
+    if score_space:
+        print("\n--- 3b. SCORE-SPACE CALIBRATION (Pure MAE on T vs on S_C - S_A) ---")
+        print(f"{'Calibrated on':<14} {'MAE_T':>8} {'RMSE_T':>8} {'Mean_dT':>9} {'MAE_S1':>8} {'MAE_S2':>8} {'RMSE_S2':>8} {'Mean_dS2':>9}")
+        print("-" * 82)
+        for space in ["T", "S1", "S2"]:
+            p_space = p_mae if space == "T" else cached_global_optimize("mae", PARAM_BOUNDS, seed=202, space=space)[0]
+            m = compute_metrics(p_space)
+            print(f"{space:<14} {m['T']['MAE_T']:>8.2f} {m['T']['RMSE_T']:>8.2f} {m['T']['Mean_dT']:>+9.2f} "
+                  f"{m['S1']['MAE_S']:>8.4f} {m['S2']['MAE_S']:>8.4f} {m['S2']['RMSE_S']:>8.4f} {m['S2']['Mean_dS']:>+9.4f}")
+
     # ---- Huber Delta Sweep ----
     print("\n--- 4. HUBER DELTA SENSITIVITY SWEEP ---")
     deltas = [5.0, 7.5, 10.0, 12.5, 15.0, 20.0]
     sweep_data = []
     for dv in deltas:
-        pd, _ = global_optimize("huber", PARAM_BOUNDS, delta=dv, num_trials=30000, seed=int(dv*100))
+        pd, _ = cached_global_optimize("huber", PARAM_BOUNDS, delta=dv, num_trials=30000, seed=int(dv*100))
         tm = compute_t_metrics(pd)
         sweep_data.append({
             "delta": dv,
@@ -338,6 +342,7 @@ def main():
         })
 
     # ---- Export Results JSON ----
+    json_keys = [("baseline", "Baseline"), ("pure_mse", "Pure MSE"), ("pure_mae", "Pure MAE"), ("huber_10", "Huber 10")]
     results = {
         "dataset_size": N,
         "search_domains": {PARAM_KEYS[j]: list(PARAM_BOUNDS[j]) for j in range(len(PARAM_KEYS))},
@@ -347,22 +352,9 @@ def main():
             "pure_mae": [round(x, 4) for x in p_mae],
             "huber_10": [round(x, 4) for x in p_hub],
         },
-        "duration_metrics": {
-            "baseline": compute_t_metrics(BASELINE_PARAMS),
-            "pure_mse": compute_t_metrics(p_mse),
-            "pure_mae": compute_t_metrics(p_mae),
-            "huber_10": compute_t_metrics(p_hub),
-        },
-        "score_metrics_strategy1": {
-            label: compute_s_metrics(map_score_s1(predict_all(p)))
-            for label, p in [("baseline", BASELINE_PARAMS), ("pure_mse", p_mse),
-                             ("pure_mae", p_mae), ("huber_10", p_hub)]
-        },
-        "score_metrics_strategy2": {
-            label: compute_s_metrics(map_score_s2(predict_all(p)))
-            for label, p in [("baseline", BASELINE_PARAMS), ("pure_mse", p_mse),
-                             ("pure_mae", p_mae), ("huber_10", p_hub)]
-        },
+        "duration_metrics": {key: metrics[label]["T"] for key, label in json_keys},
+        "score_metrics_strategy1": {key: metrics[label]["S1"] for key, label in json_keys},
+        "score_metrics_strategy2": {key: metrics[label]["S2"] for key, label in json_keys},
         "huber_sweep": sweep_data,
         "device_matrix": device_matrix,
     }
@@ -1,10 +1,22 @@
 import math
+import os
+import sys
 import time
 import json
 import numpy as np
 from scipy.optimize import differential_evolution
 from benchmark_devices import BENCHMARK_DEVICES, T_MIN_BENCHMARK, T_MAX_BENCHMARK
 
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "..", "section_8_2_method_c_huber_optimization_study", "working_files"
+))
+from method_c_batch import make_columns, predict_exponential_11p, batch_loss, log_score, space_residuals
+from sweep_runner import run_sweep
+from result_cache import cache_inputs, cached, require
+
+BENCHMARK_COLUMNS = make_columns(BENCHMARK_DEVICES, "benchmark")
+
 PARAM_BOUNDS = [
     (0.30, 0.95),   # 0: eta_CCCV
     (0.50, 3.00),   # 1: C_thresh
@@ -84,25 +96,18 @@ def predict_single(dev, params):
         "p_eff": p_eff
     }
 
-def huber_loss_calc(r, delta):
-    abs_r = abs(r)
-    if abs_r <= delta:
-        return 0.5 * (r ** 2)
-    else:
-        return delta * (abs_r - 0.5 * delta)
+def loss_evaluator(params, loss_type="mse", delta=10.0, space="T"):
+    # space: "T" fits T_C - T_A; "S1" / "S2" fit the clipped Strategy 1 / 2 score S_C - S_A
+    t_pred = predict_exponential_11p(BENCHMARK_COLUMNS, params)["t_pred"]
+    return batch_loss(space_residuals(t_pred, BENCHMARK_COLUMNS, space), loss_type, delta)
 
-def loss_evaluator(params, loss_type="mse", delta=10.0):
-    total = 0.0
-    for dev in BENCHMARK_DEVICES:
-        res = predict_single(dev, params)
-        r = res["t_pred"] - dev["t_actual_min"]
-        if loss_type == "mse":
-            total += r ** 2
-        elif loss_type == "mae":
-            total += abs(r)
-        elif loss_type == "huber":
-            total += huber_loss_calc(r, delta)
-    return total / len(BENCHMARK_DEVICES)
+def loss_evaluator_population(population, loss_type="mse", delta=10.0, space="T"):
+    """
+    Population form of loss_evaluator for differential_evolution(vectorized=True).
+    population: (11, S) array of candidates as passed by SciPy. Returns the S losses.
+    """
+    t_pred = predict_exponential_11p(BENCHMARK_COLUMNS, np.asarray(population).T)["t_pred"]
+    return batch_loss(space_residuals(t_pred, BENCHMARK_COLUMNS, space), loss_type, delta)
 
 def compute_full_metrics(params):
     device_results = []
@@ -147,28 +152,18 @@ def compute_full_metrics(params):
     t_min_C = float(np.min(t_preds))
     t_max_C = float(np.max(t_preds))
     
-    diffs_S1 = []
-    diffs_S2 = []
-    for d in device_results:
-        tp = d["t_pred"]
-        sa = d["s_actual"]
-        
-        # Strategy 1 (dynamic bounds)
-        s1 = 10.0 * (math.log(t_max_C / tp) / math.log(t_max_C / t_min_C))
-        dS1 = s1 - sa
-        d["s_pred_s1"] = round(s1, 4)
-        d["dS_s1"] = round(dS1, 4)
-        diffs_S1.append(dS1)
-        
-        # Strategy 2 (aligned benchmark bounds [9.0, 241.0])
-        s2 = 10.0 * (math.log(T_MAX_BENCHMARK / tp) / math.log(T_MAX_BENCHMARK / T_MIN_BENCHMARK))
-        dS2 = s2 - sa
-        d["s_pred_s2"] = round(s2, 4)
-        d["dS_s2"] = round(dS2, 4)
-        diffs_S2.append(dS2)
-        
-    diffs_S1 = np.array(diffs_S1)
-    diffs_S2 = np.array(diffs_S2)
+    # Scores of both strategies in one vectorized pass (unclipped, as reported by this study):
+    # Strategy 1 (dynamic bounds) and Strategy 2 (aligned benchmark bounds [9.0, 241.0])
+    s_actual = np.array([d["s_actual"] for d in device_results])
+    s1 = log_score(t_preds, t_min_C, t_max_C, clip=False)
+    s2 = log_score(t_preds, T_MIN_BENCHMARK, T_MAX_BENCHMARK, clip=False)
+    diffs_S1 = s1 - s_actual
+    diffs_S2 = s2 - s_actual
+    for i, d in enumerate(device_results):
+        d["s_pred_s1"] = round(float(s1[i]), 4)
+        d["dS_s1"] = round(float(diffs_S1[i]), 4)
+        d["s_pred_s2"] = round(float(s2[i]), 4)
+        d["dS_s2"] = round(float(diffs_S2[i]), 4)
     
     strat1_metrics = {
         "MSE_S": float(np.mean(diffs_S1 ** 2)),
@@ -195,20 +190,32 @@ def compute_full_metrics(params):
         "device_predictions": device_results
     }
 
-def run_opt(loss_type="mse", delta=10.0, seed=42):
+# Differential Evolution settings shared by every run (part of the result-cache key)
+DE_SETTINGS = {
+    "strategy": "best1bin",
+    "maxiter": 1000,
+    "popsize": 15,
+    "tol": 1e-7,
+    "mutation": (0.5, 1.0),
+    "recombination": 0.9,
+}
+
+HUBER_DELTAS = [5.0, 7.5, 10.0, 12.5, 15.0, 20.0, 22.5, 25.0, 27.5, 30.0, 40.0, 50.0]
+
+def run_opt(loss_type="mse", delta=10.0, seed=42, vectorized=True, space="T"):
+    # vectorized=True (default) scores the whole population per generation. SciPy only supports
+    # that with deferred updating, which follows a different DE trajectory than the scalar
+    # immediate-updating path (vectorized=False), so the two give different seeded optima.
     t0 = time.time()
     res = differential_evolution(
-        loss_evaluator,
+        loss_evaluator_population if vectorized else loss_evaluator,
         bounds=PARAM_BOUNDS,
-        args=(loss_type, delta),
-        strategy='best1bin',
-        maxiter=1000,
-        popsize=15,
-        tol=1e-7,
-        mutation=(0.5, 1.0),
-        recombination=0.9,
+        args=(loss_type, delta, space),
         seed=seed,
-        workers=1
+        updating='deferred' if vectorized else 'immediate',
+        workers=1,
+        vectorized=vectorized,
+        **DE_SETTINGS
     )
     elapsed = time.time() - t0
     params = res.x.tolist()
@@ -235,15 +242,41 @@ def run_opt(loss_type="mse", delta=10.0, seed=42):
         "elapsed_sec": round(elapsed, 2)
     }
 
-def main():
+def run_opt_inputs(loss_type="mse", delta=10.0, seed=42, vectorized=True, space="T"):
+    # Result-cache key of run_opt: DE settings, seed, and the source of the loss / predictor / metrics it runs
+    settings = dict(DE_SETTINGS, updating='deferred' if vectorized else 'immediate')
+    if space != "T":
+        settings["space"] = space
+    code = [loss_evaluator_population if vectorized else loss_evaluator, predict_exponential_11p, space_residuals,
+            compute_full_metrics, predict_single]
+    return cache_inputs("exponential_11p", BENCHMARK_DEVICES, PARAM_BOUNDS, loss_type, delta,
+                        settings=settings, seed=seed, code=code)
+
+def cached_run_opt(loss_type="mse", delta=10.0, seed=42, vectorized=True, space="T", refresh=False):
+    # Same result as run_opt, loaded from the result cache when these exact inputs were solved before
+    inputs = run_opt_inputs(loss_type, delta, seed, vectorized, space)
+    return cached(inputs, lambda: run_opt(loss_type, delta, seed, vectorized, space), refresh=refresh)
+
+def load_run_opt(loss_type="mse", delta=10.0, seed=42, vectorized=True, space="T"):
+    # Read-only: the cached run_opt result, LookupError if main() has not solved it yet
+    return require(run_opt_inputs(loss_type, delta, seed, vectorized, space))
+
+def run_opt_task(task):
+    loss_type, delta, seed, vectorized = task
+    return cached_run_opt(loss_type=loss_type, delta=delta, seed=seed, vectorized=vectorized)
+
+def main(workers=None, vectorized=True):
+    # vectorized=False runs the scalar immediate-updating DE (minutes instead of seconds)
     results = {}
     
-    # 1. Delta sweep for Huber
-    deltas = [5.0, 7.5, 10.0, 12.5, 15.0, 20.0, 22.5, 25.0, 27.5, 30.0, 40.0, 50.0]
+    # 1. Delta sweep for Huber, plus the pure MSE and MAE runs, fanned across the pool
+    deltas = HUBER_DELTAS
+    tasks = [("huber", d, 42, vectorized) for d in deltas] + [("mse", 10.0, 42, vectorized),
+                                                              ("mae", 10.0, 42, vectorized)]
+    runs = run_sweep(run_opt_task, tasks, workers)
     results["huber_sweep"] = []
     
-    for d in deltas:
-        res = run_opt(loss_type="huber", delta=d, seed=42)
+    for d, res in zip(deltas, runs):
         print(f"delta = {d:4.1f} mins | MSE_T: {res['metrics']['MSE_T']:7.2f} | RMSE_T: {res['metrics']['RMSE_T']:5.2f} | MAE_T: {res['metrics']['MAE_T']:5.2f} | Mean_dT: {res['metrics']['Mean_dT']:+6.2f} | Score MAE_S: {res['metrics']['Strategy_2']['MAE_S']:.4f}")
         results["huber_sweep"].append({
             "delta": d,
@@ -258,19 +291,20 @@ def main():
         })
         
     # 2. Pure MSE
-    opt_mse = run_opt(loss_type="mse", seed=42)
+    opt_mse = runs[len(deltas)]
     print(f"\nPure MSE     | MSE_T: {opt_mse['metrics']['MSE_T']:7.2f} | RMSE_T: {opt_mse['metrics']['RMSE_T']:5.2f} | MAE_T: {opt_mse['metrics']['MAE_T']:5.2f} | Mean_dT: {opt_mse['metrics']['Mean_dT']:+6.2f} | Score MAE_S: {opt_mse['metrics']['Strategy_2']['MAE_S']:.4f}")
     results["mse"] = opt_mse
     
     # 3. Pure MAE
-    opt_mae = run_opt(loss_type="mae", seed=42)
+    opt_mae = runs[len(deltas) + 1]
     print(f"Pure MAE     | MSE_T: {opt_mae['metrics']['MSE_T']:7.2f} | RMSE_T: {opt_mae['metrics']['RMSE_T']:5.2f} | MAE_T: {opt_mae['metrics']['MAE_T']:5.2f} | Mean_dT: {opt_mae['metrics']['Mean_dT']:+6.2f} | Score MAE_S: {opt_mae['metrics']['Strategy_2']['MAE_S']:.4f}")
     results["mae"] = opt_mae
     
-    with open("scratch/clean_optimization_results.json", "w") as f:
+    out_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scratch", "clean_optimization_results.json")
+    with open(out_path, "w") as f:
         json.dump(results, f, indent=2)
         
-    print("\nSaved to scratch/clean_optimization_results.json")
+    print(f"\nSaved to {out_path}")
 
 if __name__ == "__main__":
     main()
@@ -1,10 +1,18 @@
 import math
+import os
+import sys
 import numpy as np
 from scipy.optimize import differential_evolution
 import json
 import time
 from benchmark_devices import BENCHMARK_DEVICES
 
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "..", "section_8_2_method_c_huber_optimization_study", "working_files"
+))
+from robust_losses import mean_loss
+
 # Model B Forward Simulation
 T_HANDSHAKE = 0.5000  # Fixed physical protocol handshake intercept (mins)
 
@@ -81,27 +89,9 @@ PARAM_NAMES = [
     "eta_arch_single", "eta_cp", "eta_pps", "eta_pd", "eta_5v", "eta_apple"
 ]
 
-def huber_element(r, delta):
-    abs_r = abs(r)
-    if abs_r <= delta:
-        return 0.5 * (r ** 2)
-    else:
-        return delta * (abs_r - 0.5 * delta)
-
 def loss_func(params, loss_type="mse", delta=10.0):
-    total_loss = 0.0
-    N = len(BENCHMARK_DEVICES)
-    for dev in BENCHMARK_DEVICES:
-        t_pred, _, _, _, _, _ = predict_duration(dev, params)
-        t_actual = dev["t_actual_min"]
-        r = t_pred - t_actual
-        if loss_type == "mse":
-            total_loss += (r ** 2)
-        elif loss_type == "mae":
-            total_loss += abs(r)
-        elif loss_type == "huber":
-            total_loss += huber_element(r, delta)
-    return total_loss / N
+    residuals = [predict_duration(dev, params)[0] - dev["t_actual_min"] for dev in BENCHMARK_DEVICES]
+    return mean_loss(residuals, loss_type, delta)
 
 def compute_metrics(params):
     N = len(BENCHMARK_DEVICES)
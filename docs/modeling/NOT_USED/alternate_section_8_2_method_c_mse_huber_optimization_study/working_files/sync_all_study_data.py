@@ -1,8 +1,20 @@
 import math
 import json
-import random
+import os
+import sys
 
-from optimize_method_c import BENCHMARK_DEVICES
+import numpy as np
+
+from optimize_method_c import (BENCHMARK_DEVICES, BENCHMARK_COLUMNS, t_metrics, map_score_s1, map_score_s2,
+                               compute_s_metrics)
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "..", "section_8_2_method_c_huber_optimization_study", "working_files"
+))
+from method_c_batch import THERMAL_DECAYS, predict_efficiency_12p, batch_loss, space_residuals
+from batch_search import screen_candidates, pattern_search
+from result_cache import cache_inputs, cached
 
 # Master script to ensure 100% mathematical coherence across all tables in section_8_2 study doc
 
@@ -61,10 +73,7 @@ def predict_duration(wh, p_peak_w, arch_type, protocol_type, params, formulation
 
     if C_rate > C_thresh:
         delta_C = max(1e-9, C_rate - C_thresh)
-        if formulation == "rational":
-            eta_thermal = 1.0 / (1.0 + k * math.pow(delta_C, p))
-        elif formulation == "exponential":
-            eta_thermal = math.exp(-k * math.pow(delta_C, p))
+        eta_thermal = float(THERMAL_DECAYS[formulation](delta_C, k, p))
         eff_eta_CCCV = eta_CCCV
     else:
         eta_thermal = 1.0
@@ -80,122 +89,60 @@ def predict_duration(wh, p_peak_w, arch_type, protocol_type, params, formulation
 def predict_all(params, formulation="exponential"):
     return [predict_duration(d[0], d[1], d[2], d[3], params, formulation) for d in BENCHMARK_DEVICES]
 
-def compute_loss(loss_type, params, delta=10.0, formulation="exponential"):
-    T_C = predict_all(params, formulation)
-    N = len(BENCHMARK_DEVICES)
-    total = 0.0
-    for i, d in enumerate(BENCHMARK_DEVICES):
-        err = d[4] - T_C[i]
-        ae = abs(err)
-        if loss_type == "mse":
-            total += err * err
-        elif loss_type == "mae":
-            total += ae
-        elif loss_type == "huber":
-            if ae <= delta:
-                total += 0.5 * ae * ae
-            else:
-                total += delta * ae - 0.5 * delta * delta
-    return total / N
-
-def global_optimize(loss_type, bounds, delta=10.0, formulation="exponential", num_trials=150000, seed=42):
-    random.seed(seed)
-    best_params = list(BASELINE_PARAMS_LOSS)
-    best_loss = compute_loss(loss_type, best_params, delta, formulation)
-
-    for trial in range(num_trials):
-        cand = []
-        for j in range(len(PARAM_KEYS_LOSS)):
-            lo, hi = bounds[j]
-            if lo == hi:
-                cand.append(lo)
-                continue
-            if random.random() < 0.6:
-                cand.append(BASELINE_PARAMS_LOSS[j] + random.gauss(0, (hi - lo) * 0.15))
-            else:
-                cand.append(random.uniform(lo, hi))
-            cand[j] = max(lo, min(hi, cand[j]))
-        
-        l = compute_loss(loss_type, cand, delta, formulation)
+def compute_loss(loss_type, params, delta=10.0, formulation="exponential", space="T"):
+    T_C = np.array(predict_all(params, formulation))
+    return batch_loss(space_residuals(T_C, BENCHMARK_COLUMNS, space), loss_type, delta)
+
+def population_loss(loss_type, population, delta=10.0, formulation="exponential", space="T"):
+    T_C = predict_efficiency_12p(BENCHMARK_COLUMNS, population, formulation)["t_pred"]
+    return batch_loss(space_residuals(T_C, BENCHMARK_COLUMNS, space), loss_type, delta)
+
+def global_optimize(loss_type, bounds, delta=10.0, formulation="exponential", num_trials=150000, seed=42,
+                    top_k=8, block_size=4096, mode="greedy", space="T"):
+    # space: "T" fits durations, "S1" / "S2" the Strategy 1 / 2 scores (see optimize_method_c)
+    def loss(pop):
+        return population_loss(loss_type, pop, delta, formulation, space)
+
+    starts = screen_candidates(loss, bounds, BASELINE_PARAMS_LOSS, num_trials,
+                               top_k=top_k, block_size=block_size, seed=seed)
+
+    best_params, best_loss = None, math.inf
+    for _, cand in starts:
+        params, l = pattern_search(loss, cand, bounds, mode=mode, max_outer=3500)
         if l < best_loss:
-            best_loss = l
-            best_params = list(cand)
-
-    step = 0.05
-    for outer in range(3500):
-        improved = False
-        for j in range(len(PARAM_KEYS_LOSS)):
-            lo, hi = bounds[j]
-            if lo == hi:
-                continue
-            for mult in [1.0, 0.5, 0.2, 0.05, 0.01, 0.002]:
-                s = step * mult * (hi - lo)
-                for direction in [+1.0, -1.0]:
-                    trial = max(lo, min(hi, best_params[j] + direction * s))
-                    if abs(trial - best_params[j]) < 1e-12:
-                        continue
-                    cand = list(best_params)
-                    cand[j] = trial
-                    l = compute_loss(loss_type, cand, delta, formulation)
-                    if l < best_loss - 1e-10:
-                        best_loss = l
-                        best_params = list(cand)
-                        improved = True
-        if not improved:
-            step *= 0.5
-            if step < 1e-8:
-                break
+            best_params, best_loss = params, l
 
     return best_params, best_loss
 
-def compute_t_metrics(params, formulation="exponential"):
-    T_C = predict_all(params, formulation)
-    N = len(BENCHMARK_DEVICES)
-    e = [BENCHMARK_DEVICES[i][4] - T_C[i] for i in range(N)]
-    mse = sum(x**2 for x in e) / N
-    return {
-        "MSE_T":   round(mse, 2),
-        "RMSE_T":  round(math.sqrt(mse), 2),
-        "MAE_T":   round(sum(abs(x) for x in e) / N, 2),
-        "Mean_dT": round(sum(e) / N, 2),
-        "T_min_C": round(min(T_C), 2),
-        "T_max_C": round(max(T_C), 2),
-    }
+def cached_global_optimize(loss_type, bounds, delta=10.0, formulation="exponential", num_trials=150000, seed=42,
+                           top_k=8, block_size=4096, mode="greedy", space="T", refresh=False):
+    # global_optimize, loaded from the result cache when these exact inputs were solved before
+    settings = {"num_trials": num_trials, "top_k": top_k, "block_size": block_size, "mode": mode,
+                "sampler": "sobol", "max_outer": 3500}
+    if space != "T":
+        settings["space"] = space
+    inputs = cache_inputs("efficiency_12p", BENCHMARK_DEVICES, bounds, loss_type, delta, formulation,
+                          settings=settings, seed=seed,
+                          code=[population_loss, predict_efficiency_12p, THERMAL_DECAYS[formulation],
+                                space_residuals])
+    params, loss = cached(
+        inputs,
+        lambda: global_optimize(loss_type, bounds, delta, formulation, num_trials, seed, top_k, block_size, mode,
+                                space),
+        refresh=refresh
+    )
+    return params, loss
 
-def map_score_s1(T_C):
-    t_min = min(T_C)
-    t_max = max(T_C)
-    log_min = math.log(max(1.0, t_min))
-    log_max = math.log(max(2.0, t_max))
-    denom = log_max - log_min
-    if denom <= 0:
-        denom = 1.0
-    return [max(0.0, min(10.0, 10.0 * (log_max - math.log(max(1.0, tc))) / denom)) for tc in T_C]
-
-def map_score_s2(T_C, T_min_A=9.00, T_max_A=241.0):
-    log_min = math.log(T_min_A)
-    log_max = math.log(T_max_A)
-    denom = log_max - log_min
-    return [max(0.0, min(10.0, 10.0 * (log_max - math.log(max(1.0, tc))) / denom)) for tc in T_C]
-
-def compute_s_metrics(S_C):
-    N = len(BENCHMARK_DEVICES)
-    e = [BENCHMARK_DEVICES[i][5] - S_C[i] for i in range(N)]
-    mse = sum(x**2 for x in e) / N
-    return {
-        "MSE_S":   round(mse, 4),
-        "RMSE_S":  round(math.sqrt(mse), 4),
-        "MAE_S":   round(sum(abs(x) for x in e) / N, 4),
-        "Mean_dS": round(sum(e) / N, 4),
-    }
+def compute_t_metrics(params, formulation="exponential"):
+    return t_metrics(predict_all(params, formulation))
 
 def main():
     print("Generating single source of truth for all 4 models...")
 
     # Single optimization runs for candidate models
-    p_mse, _ = global_optimize("mse", PARAM_BOUNDS_LOSS, seed=101)
-    p_mae, _ = global_optimize("mae", PARAM_BOUNDS_LOSS, seed=202)
-    p_hub, _ = global_optimize("huber", PARAM_BOUNDS_LOSS, delta=10.0, seed=303)
+    p_mse, _ = cached_global_optimize("mse", PARAM_BOUNDS_LOSS, seed=101)
+    p_mae, _ = cached_global_optimize("mae", PARAM_BOUNDS_LOSS, seed=202)
+    p_hub, _ = cached_global_optimize("huber", PARAM_BOUNDS_LOSS, delta=10.0, seed=303)
 
     models = {
         "baseline": BASELINE_PARAMS_LOSS,
@@ -211,7 +158,7 @@ def main():
         if dv == 10.0:
             pd = p_hub
         else:
-            pd, _ = global_optimize("huber", PARAM_BOUNDS_LOSS, delta=dv, num_trials=60000, seed=int(dv*100))
+            pd, _ = cached_global_optimize("huber", PARAM_BOUNDS_LOSS, delta=dv, num_trials=60000, seed=int(dv*100))
         tm = compute_t_metrics(pd)
         sweep.append({
             "delta": dv,
@@ -267,11 +214,13 @@ def main():
             "url": url
         })
 
+    # One prediction pass per model feeds both the duration and the score metrics
+    model_T_C = {k: np.array(predict_all(v)) for k, v in models.items()}
     master_data = {
         "params": {k: [round(x, 4) for x in v] for k, v in models.items()},
-        "t_metrics": {k: compute_t_metrics(v) for k, v in models.items()},
-        "s_metrics_s1": {k: compute_s_metrics(map_score_s1(predict_all(v))) for k, v in models.items()},
-        "s_metrics_s2": {k: compute_s_metrics(map_score_s2(predict_all(v))) for k, v in models.items()},
+        "t_metrics": {k: t_metrics(T_C) for k, T_C in model_T_C.items()},
+        "s_metrics_s1": {k: compute_s_metrics(map_score_s1(T_C)) for k, T_C in model_T_C.items()},
+        "s_metrics_s2": {k: compute_s_metrics(map_score_s2(T_C)) for k, T_C in model_T_C.items()},
         "huber_sweep": sweep,
         "device_parameters": device_parameters,
         "device_predictions": device_predictions,
@@ -1,9 +1,9 @@
-import json
 import sys
 import os
 sys.path.insert(0, os.path.abspath('scratch'))
 import numpy as np
 from benchmark_devices import BENCHMARK_DEVICES
+from run_clean_11param_optimization import load_run_opt, HUBER_DELTAS
 
 # Baseline parameters
 baseline_params = {
@@ -96,12 +96,11 @@ baseline_stats = {
     's2_mean_bias_S': s2_mean_dS
 }
 
-with open("scratch/optimization_results.json", "r") as f:
-    data = json.load(f)
-
-opt1 = data["mse"]
-opt2 = data["mae"]
-huber_sweep = data["huber_sweep"]
+# Calibrations are read from the result cache, never re-solved here: run
+# run_clean_11param_optimization.py first (a missing entry raises LookupError)
+opt1 = load_run_opt("mse", 10.0, 42)
+opt2 = load_run_opt("mae", 10.0, 42)
+huber_sweep = [load_run_opt("huber", d, 42) for d in HUBER_DELTAS]
 h10 = [h for h in huber_sweep if h["delta"] == 10.0][0]
 
 # 1. Sweep Table
@@ -0,0 +1,181 @@
+"""
+Batched Global Search
+---------------------
+Screening stage for the multi-start + pattern-search calibrations
+(optimize_method_c.global_optimize, sync_all_study_data.global_optimize).
+
+Instead of drawing candidates one at a time with random.gauss / random.uniform and scoring
+each with a per-device Python loss, screen_candidates() draws them in blocks from a
+scrambled Sobol (or Latin-hypercube) sequence, scores each block with one vectorized loss
+call and keeps only the K best candidates in a heap. Memory stays at one block plus K
+candidates regardless of the trial budget.
+
+The candidate distribution is the same mixture the scripts used: each free coordinate is,
+with probability `local_fraction`, a Gaussian around the baseline (sigma = `local_sigma` x
+bound width) and otherwise uniform over its bounds, clipped into the bounds. The quasi-random
+sequence only replaces the pseudo-random draws, so coverage of the same budget is at least
+as even as before.
+
+pattern_search() is the matching refinement stage: the multi-resolution coordinate pattern
+search of the scripts, with the whole stencil of moves (free parameter x step multiplier x
+direction) built as one array and scored in one vectorized call. "greedy" acceptance
+reproduces the scripts' sequential first-improvement sweep exactly (after an accepted move
+the rest of the stencil is rebuilt from the new point and re-scored); "best" acceptance
+takes the best move of each stencil.
+"""
+
+import heapq
+
+import numpy as np
+from scipy.stats import norm, qmc
+
+
+def _make_sampler(sampler, dim, seed):
+    if sampler == "sobol":
+        return qmc.Sobol(dim, scramble=True, seed=seed)
+    if sampler == "lhs":
+        return qmc.LatinHypercube(dim, seed=seed)
+    raise ValueError(f"Unknown sampler: {sampler}")
+
+
+def candidate_blocks(bounds, baseline, num_trials, block_size=4096, sampler="sobol",
+                     local_fraction=0.6, local_sigma=0.15, seed=42):
+    """
+    Yields (B, P) candidate blocks, num_trials rows in total.
+
+    Fixed parameters (lo == hi) are pinned to their bound.
+    """
+    lo, hi = np.array(bounds, dtype=float).T
+    width = hi - lo
+    baseline = np.asarray(baseline, dtype=float)
+    dim = len(lo)
+    # First dim coordinates pick the mixture component, the last dim give the value
+    engine = _make_sampler(sampler, 2 * dim, seed)
+
+    remaining = num_trials
+    while remaining > 0:
+        u = engine.random(block_size)[:min(block_size, remaining)]
+        pick, v = u[:, :dim], u[:, dim:]
+        local = baseline + norm.ppf(np.clip(v, 1e-12, 1.0 - 1e-12)) * (local_sigma * width)
+        uniform = lo + v * width
+        block = np.clip(np.where(pick < local_fraction, local, uniform), lo, hi)
+        yield block
+        remaining -= len(block)
+
+
+def screen_candidates(population_loss, bounds, baseline, num_trials, top_k=8, block_size=4096,
+                      sampler="sobol", seed=42):
+    """
+    Scores num_trials quasi-random candidates block by block and keeps the top K.
+
+    Args:
+        population_loss: Function mapping an (S, P) population to an (S,) array of losses.
+        bounds: Parameter bounds [(lo, hi), ...].
+        baseline: Baseline parameter vector; it is always a candidate itself.
+        num_trials: Screening budget (number of candidates).
+        top_k: Number of best candidates kept for the refinement stage.
+        block_size: Candidates scored per vectorized call (bounds memory use).
+        sampler: "sobol" or "lhs".
+        seed: Scrambling seed.
+
+    Returns:
+        List of (loss, params) tuples, best first, params as Python lists.
+    """
+    # Max-heap on loss via negation: heap[0] is the worst of the kept candidates
+    heap = []
+    counter = 0
+
+    def push(losses, block):
+        nonlocal counter
+        for i in np.argsort(losses)[:top_k]:
+            item = (-float(losses[i]), -counter, block[i].tolist())
+            counter += 1
+            if len(heap) < top_k:
+                heapq.heappush(heap, item)
+            elif item[0] > heap[0][0]:
+                heapq.heapreplace(heap, item)
+            else:
+                break  # block is sorted: nothing better follows
+
+    baseline = np.asarray(baseline, dtype=float)[None, :]
+    push(np.asarray(population_loss(baseline)), baseline)
+    for block in candidate_blocks(bounds, baseline[0], num_trials, block_size, sampler, seed=seed):
+        push(np.asarray(population_loss(block)), block)
+
+    return [(-neg_loss, params) for neg_loss, _, params in sorted(heap, reverse=True)]
+
+
+PATTERN_MULTS = (1.0, 0.5, 0.2, 0.05, 0.01, 0.002)
+
+
+def _stencil(x, free, lo, hi, step, mults, start=0):
+    """
+    Single-coordinate moves around x in the scripts' loop order (parameter -> step
+    multiplier -> +/- direction), from move number `start` on. Moves clipped back onto x
+    are dropped. Returns the (M, P) candidate array and the move number of each row.
+    """
+    j = np.repeat(free, 2 * len(mults))
+    s = np.tile(np.repeat(np.asarray(mults) * step, 2) * np.tile([1.0, -1.0], len(mults)), len(free))
+    trial = np.clip(x[j] + s * (hi[j] - lo[j]), lo[j], hi[j])
+    keep = np.flatnonzero(np.abs(trial - x[j]) >= 1e-12)
+    keep = keep[keep >= start]
+    cand = np.repeat(x[None, :], len(keep), axis=0)
+    cand[np.arange(len(keep)), j[keep]] = trial[keep]
+    return cand, keep
+
+
+def pattern_search(population_loss, x0, bounds, mode="greedy", step=0.05, mults=PATTERN_MULTS,
+                   max_outer=3000, min_step=1e-8, improve_tol=1e-10):
+    """
+    Multi-resolution adaptive pattern search with a batched stencil.
+
+    Each outer iteration scores the stencil of moves around the current point. If no move
+    improves the loss by more than improve_tol, the step is halved; the search stops once
+    the step drops below min_step (or after max_outer iterations).
+
+    Args:
+        population_loss: Function mapping an (S, P) population to an (S,) array of losses.
+        x0: Starting parameter vector.
+        bounds: Parameter bounds [(lo, hi), ...]; fixed parameters (lo == hi) are not moved.
+        mode: "greedy" (sequential first-improvement, same moves as the scalar loop) or
+              "best" (best move of the stencil per outer iteration).
+        step, mults: Initial step (fraction of bound width) and per-stencil step multipliers.
+        max_outer, min_step, improve_tol: Termination and acceptance thresholds.
+
+    Returns:
+        (best_params as a list, best_loss).
+    """
+    if mode not in ("greedy", "best"):
+        raise ValueError(f"Unknown acceptance mode: {mode}")
+
+    lo, hi = np.array(bounds, dtype=float).T
+    free = np.flatnonzero(lo != hi)
+    x = np.asarray(x0, dtype=float).copy()
+    best_loss = float(np.asarray(population_loss(x[None, :]))[0])
+
+    for outer in range(max_outer):
+        improved = False
+        cand, moves = _stencil(x, free, lo, hi, step, mults)
+
+        while len(cand):
+            losses = np.asarray(population_loss(cand))
+            if mode == "best":
+                i = int(np.argmin(losses))
+                if losses[i] < best_loss - improve_tol:
+                    x, best_loss, improved = cand[i].copy(), float(losses[i]), True
+                break
+
+            hits = np.flatnonzero(losses < best_loss - improve_tol)
+            if not len(hits):
+                break
+            i = hits[0]
+            x, best_loss, improved = cand[i].copy(), float(losses[i]), True
+            # Finish the sweep from the next move, rebuilt around the accepted point
+            cand, moves = _stencil(x, free, lo, hi, step, mults, start=moves[i] + 1)
+
+        if not improved:
+            step *= 0.5
+            if step < min_step:
+                break
+
+    return x.tolist(), best_loss
@@ -0,0 +1,176 @@
+"""
+Bootstrap Confidence Intervals for Method C Parameters
+------------------------------------------------------
+Resamples the 44-device audited benchmark (recalibrate_with_corrected_data) with replacement,
+refits the 5-parameter clamped rational model (eta_low, C0_single, C0_dual, k, p) on every
+resample and reports:
+
+- per-parameter percentile intervals,
+- the induced interval on every device's predicted duration T_C and Strategy 2 score S_C.
+
+Refits run across a process pool (sweep_runner.run_sweep) in chunks of resamples and use
+either path of the study:
+
+- "lsq": scipy.optimize.least_squares with the Huber loss (f_scale = delta) and the analytic
+         Jacobian (method_c_batch.jacobian_rational);
+- "de":  vectorized differential_evolution on the same loss.
+
+"auto" (the default) picks "de" for delta = 0: the near-L1 least-squares loss has almost no
+curvature, and warm-started least-squares refits then mostly stop at the start point, which
+would collapse the intervals.
+
+With warm=True every refit starts from the full-data optimum (least-squares initial point,
+or a DE population clustered around it), which keeps 1000+ resamples affordable; warm=False
+gives the cold reference (bounds midpoint / Latin-hypercube DE).
+
+Usage:
+    python bootstrap.py    (1000 warm-started resamples at delta = 0.0, Pure MAE)
+"""
+
+import time
+
+import numpy as np
+from scipy.optimize import differential_evolution, least_squares
+
+from method_c_batch import (make_columns, take_columns, predict_rational_clamped, jacobian_rational,
+                            batch_loss, map_score)
+from sweep_runner import run_sweep, warm_population
+
+PARAM_NAMES = ["eta_low", "C0_single", "C0_dual", "k", "p"]
+
+
+def fit_lsq(cols, x0, bounds, delta):
+    """Huber least-squares refit with the analytic Jacobian (delta = 0 -> near-L1 f_scale)."""
+    lo, hi = np.array(bounds, dtype=float).T
+    x0 = np.clip(x0, lo + 1e-9 * (hi - lo), hi - 1e-9 * (hi - lo))
+    res = least_squares(
+        lambda x: predict_rational_clamped(cols, x)["t_pred"] - cols["T_A"],
+        x0,
+        jac=lambda x: jacobian_rational(cols, x, clamped=True),
+        bounds=(lo, hi),
+        loss='huber',
+        f_scale=delta if delta > 0 else 1e-5
+    )
+    return res.x, res.nfev
+
+
+def fit_de(cols, x0, bounds, delta, seed):
+    """Vectorized DE refit; x0=None gives the cold Latin-hypercube start."""
+    loss_type = "huber" if delta > 0 else "mae"
+
+    def population_loss(pop):
+        return batch_loss(predict_rational_clamped(cols, pop.T)["t_pred"] - cols["T_A"], loss_type, delta)
+
+    init = 'latinhypercube' if x0 is None else warm_population(x0, bounds, 10 * len(bounds), seed=seed)
+    res = differential_evolution(population_loss, bounds, maxiter=1000, popsize=10, seed=seed, init=init,
+                                 updating='deferred', vectorized=True)
+    return res.x, res.nfev
+
+
+def _fit_chunk(task):
+    """Refits one chunk of resamples (module level so it can run in pool workers)."""
+    cols, resamples, x0, bounds, delta, method, warm, seed = task
+    t0 = time.time()
+    params, nfev = [], 0
+    for b, idx in enumerate(resamples):
+        sub = take_columns(cols, idx)
+        if method == "lsq":
+            start = x0 if warm else np.mean(bounds, axis=1)
+            x, n = fit_lsq(sub, start, bounds, delta)
+        elif method == "de":
+            x, n = fit_de(sub, x0 if warm else None, bounds, delta, seed + b)
+        else:
+            raise ValueError(f"Unknown refit method: {method}")
+        params.append(x)
+        nfev += n
+    return np.array(params), nfev, time.time() - t0
+
+
+def bootstrap(cols, x_full, bounds, delta, n_resamples=1000, method="auto", warm=True, level=0.95,
+              chunk_size=50, seed=42, workers=None):
+    """
+    Bootstrap refits of the clamped rational model.
+
+    Args:
+        cols: Column table of the full dataset (make_columns).
+        x_full: Full-data optimum (warm-start point and the reported point estimate).
+        bounds: Parameter bounds.
+        delta: Huber threshold (0.0 = Pure MAE).
+        n_resamples: Number of bootstrap resamples.
+        method: "lsq", "de" or "auto" (DE for delta = 0, least squares otherwise).
+        warm: Start each refit from x_full.
+        level: Percentile interval coverage.
+        chunk_size: Resamples per pool task.
+        seed: Seed of the resampling (and of the DE refits).
+        workers: Process count (see sweep_runner.run_sweep).
+
+    Returns:
+        Dict with the (B, 5) parameter samples, per-parameter (low, high) intervals, (N, 2)
+        T_C and S_C intervals, point predictions, total evaluations and wall time.
+    """
+    if method == "auto":
+        method = "de" if delta == 0 else "lsq"
+    n = len(cols["T_A"])
+    rng = np.random.default_rng(seed)
+    resamples = rng.integers(0, n, size=(n_resamples, n))
+
+    tasks = [(cols, resamples[i:i + chunk_size], np.asarray(x_full, dtype=float), bounds, delta, method, warm,
+              seed + i) for i in range(0, n_resamples, chunk_size)]
+    t0 = time.time()
+    chunks = run_sweep(_fit_chunk, tasks, workers)
+    samples = np.concatenate([c[0] for c in chunks])
+
+    q = [50.0 * (1.0 - level), 50.0 * (1.0 + level)]
+    t_samples = predict_rational_clamped(cols, samples)["t_pred"]  # (B, N) on the full device set
+    t_point = predict_rational_clamped(cols, x_full)["t_pred"]
+
+    return {
+        "samples": samples,
+        "param_intervals": {name: tuple(np.percentile(samples[:, j], q)) for j, name in enumerate(PARAM_NAMES)},
+        "t_point": t_point,
+        "t_intervals": np.percentile(t_samples, q, axis=0).T,
+        "s_point": map_score(t_point),
+        "s_intervals": np.percentile(map_score(t_samples), q, axis=0).T,
+        "nfev": sum(c[1] for c in chunks),
+        "elapsed_sec": time.time() - t0,
+    }
+
+
+def print_report(cols, x_full, report, level=0.95):
+    pct = f"{100 * level:.0f}%"
+    print(f"\n=== BOOTSTRAP {pct} PERCENTILE INTERVALS ({len(report['samples'])} resamples, "
+          f"{report['nfev']} evaluations, {report['elapsed_sec']:.1f} s) ===")
+    print("| Parameter   | Full-Data Estimate | Bootstrap Median | Interval Low | Interval High |")
+    print("| :---------- | :----------------: | :--------------: | :----------: | :-----------: |")
+    for j, name in enumerate(PARAM_NAMES):
+        lo, hi = report["param_intervals"][name]
+        med = np.median(report["samples"][:, j])
+        print(f"| {'`' + name + '`':<11} | `{x_full[j]:.4f}`           | `{med:.4f}`         | `{lo:.4f}`     | `{hi:.4f}`      |")
+
+    print(f"\n=== INDUCED {pct} INTERVALS ON PREDICTED DURATION AND STRATEGY 2 SCORE ===")
+    print(f"| {'Device':<26} | T_A (m) | T_C (m) | T_C Interval (m)  | S_C   | S_C Interval   |")
+    print(f"| {':---':<26} | :-----: | :-----: | :---------------: | :---: | :------------: |")
+    for i, name in enumerate(cols["name"]):
+        t_lo, t_hi = report["t_intervals"][i]
+        s_lo, s_hi = report["s_intervals"][i]
+        print(f"| {name:<26} | {cols['T_A'][i]:>7.1f} | {report['t_point'][i]:>7.1f} | "
+              f"[{t_lo:>6.1f}, {t_hi:>6.1f}] | {report['s_point'][i]:>5.2f} | [{s_lo:>5.2f}, {s_hi:>5.2f}] |")
+
+
+def main(delta=0.0, n_resamples=1000, method="auto", workers=None):
+    import recalibrate_with_corrected_data as recal
+
+    dataset = recal.parse_and_correct_dataset()
+    cols = make_columns(dataset, "recalibrated")
+    x_full, _, _ = recal.calibrate_delta((dataset, delta))
+    bounds = recal.SEARCH_BOUNDS
+
+    print(f"Full-data optimum (delta = {delta:.1f}): " +
+          ", ".join(f"{name} = {val:.4f}" for name, val in zip(PARAM_NAMES, x_full)))
+    report = bootstrap(cols, x_full, bounds, delta, n_resamples=n_resamples, method=method, workers=workers)
+    print_report(cols, x_full, report)
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Cross-Validation of the Method C Calibration
+--------------------------------------------
+Out-of-sample check of the sweeps' in-sample MAE_T / RMSE_T numbers. The devices are split into
+K folds (K = N gives leave-one-out); for every fold the model is refitted on the other devices
+and scored on the held-out ones, so each device gets exactly one out-of-sample prediction.
+
+Supported calibrations:
+
+- "rational_5p":     recalibrate_with_corrected_data.objective_function
+                     (clamped rational, 44 audited devices)
+- "exponential_11p": run_clean_11param_optimization.loss_evaluator
+                     (stretched exponential, 44 GSMArena benchmark devices)
+- "efficiency_12p_<name>": sync_all_study_data 12-parameter efficiency model with any
+                     method_c_batch.THERMAL_DECAYS formulation (model_selection.py)
+
+Each fold refit is a vectorized differential_evolution whose population is initialised
+around the full-data optimum (sweep_runner.warm_population), which makes LOO cost a fraction
+of N cold sweeps. Folds run in parallel across the sweep_runner process pool.
+
+The report lists the out-of-sample duration and Strategy 2 score error of every device next
+to its in-sample error, plus a per-fold timing breakdown.
+
+Usage:
+    python cross_validation.py    (LOO on both calibrations)
+"""
+
+import sys
+import time
+from functools import partial
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+from method_c_batch import (ALTERNATE_STUDY_DIR, THERMAL_DECAYS, make_columns, take_columns,
+                            predict_rational_clamped, predict_exponential_11p, predict_efficiency_12p,
+                            batch_loss, map_score, actual_scores)
+from sweep_runner import run_sweep, warm_population
+
+PREDICTORS = {
+    "rational_5p": predict_rational_clamped,
+    "exponential_11p": predict_exponential_11p,
+}
+PREDICTORS.update({f"efficiency_12p_{name}": partial(predict_efficiency_12p, formulation=name)
+                   for name in THERMAL_DECAYS})
+
+
+def make_folds(n, k=None, seed=42):
+    """Test-index arrays of K shuffled folds; k=None (or k=n) is leave-one-out."""
+    if k is None or k >= n:
+        return [np.array([i]) for i in range(n)]
+    order = np.random.default_rng(seed).permutation(n)
+    return [np.sort(f) for f in np.array_split(order, k)]
+
+
+def _fit_fold(task):
+    """Refits one fold on its training devices and predicts its held-out devices."""
+    model, cols, test_idx, x_full, bounds, loss_type, delta, seed = task
+    t0 = time.time()
+    predict = PREDICTORS[model]
+    train = take_columns(cols, np.setdiff1d(np.arange(len(cols["T_A"])), test_idx))
+
+    def population_loss(pop):
+        return batch_loss(predict(train, pop.T)["t_pred"] - train["T_A"], loss_type, delta)
+
+    res = differential_evolution(
+        population_loss, bounds, maxiter=1000, popsize=10, tol=1e-7, seed=seed,
+        init=warm_population(x_full, bounds, 10 * len(bounds), seed=seed),
+        updating='deferred', vectorized=True
+    )
+    t_test = predict(take_columns(cols, test_idx), res.x)["t_pred"]
+    return test_idx, t_test, res.x, res.nfev, time.time() - t0
+
+
+def cross_validate(model, cols, x_full, bounds, loss_type="huber", delta=10.0, k=None, seed=42, workers=None):
+    """
+    K-fold / LOO cross-validation of one calibration.
+
+    Args:
+        model: Key of PREDICTORS.
+        cols: Column table of the dataset (make_columns).
+        x_full: Full-data optimum (warm start of every fold, and the in-sample reference).
+        bounds: Parameter bounds.
+        loss_type, delta: Calibration loss (see method_c_batch.batch_loss).
+        k: Number of folds; None for leave-one-out.
+        workers: Process count (see sweep_runner.run_sweep).
+
+    Returns:
+        Dict with per-device in-sample and out-of-sample T_C and S_C, summary metrics and
+        per-fold (test devices, evaluations, seconds) timing rows.
+    """
+    n = len(cols["T_A"])
+    folds = make_folds(n, k, seed)
+    tasks = [(model, cols, f, np.asarray(x_full, dtype=float), bounds, loss_type, delta, seed + i)
+             for i, f in enumerate(folds)]
+
+    t0 = time.time()
+    results = run_sweep(_fit_fold, tasks, workers)
+    wall = time.time() - t0
+
+    t_oos = np.empty(n)
+    timing = []
+    for fold, (test_idx, t_test, _, nfev, elapsed) in enumerate(results):
+        t_oos[test_idx] = t_test
+        timing.append({"fold": fold, "n_test": len(test_idx), "nfev": nfev, "elapsed_sec": elapsed})
+
+    t_in = PREDICTORS[model](cols, x_full)["t_pred"]
+    t_a = cols["T_A"]
+    s_a = actual_scores(cols)
+
+    def summary(t_c):
+        dT = t_a - t_c
+        dS = s_a - map_score(t_c)
+        return {"MAE_T": np.mean(np.abs(dT)), "RMSE_T": np.sqrt(np.mean(dT ** 2)), "Mean_dT": np.mean(dT),
+                "MAE_S": np.mean(np.abs(dS)), "RMSE_S": np.sqrt(np.mean(dS ** 2))}
+
+    return {
+        "t_in": t_in, "t_oos": t_oos,
+        "s_a": s_a, "s_in": map_score(t_in), "s_oos": map_score(t_oos),
+        "in_sample": summary(t_in), "out_of_sample": summary(t_oos),
+        "timing": timing, "wall_sec": wall,
+    }
+
+
+def print_report(title, cols, report):
+    print(f"\n=== {title}: {len(report['timing'])}-FOLD CROSS-VALIDATION ===")
+    print("| Metric   | In-Sample  | Out-of-Sample |")
+    print("| :------- | :--------: | :-----------: |")
+    for key in ["MAE_T", "RMSE_T", "Mean_dT", "MAE_S", "RMSE_S"]:
+        print(f"| {key:<8} | {report['in_sample'][key]:>10.4f} | {report['out_of_sample'][key]:>13.4f} |")
+
+    print(f"\n| {'Device':<26} | T_A (m) | T_C in (m) | T_C out (m) | dT out (m) | S_A   | S_C out | dS out |")
+    print(f"| {':---':<26} | :-----: | :--------: | :---------: | :--------: | :---: | :-----: | :----: |")
+    for i, name in enumerate(cols["name"]):
+        t_a = cols["T_A"][i]
+        print(f"| {name:<26} | {t_a:>7.1f} | {report['t_in'][i]:>10.1f} | {report['t_oos'][i]:>11.1f} | "
+              f"{t_a - report['t_oos'][i]:>+10.1f} | {report['s_a'][i]:>5.2f} | {report['s_oos'][i]:>7.2f} | "
+              f"{report['s_a'][i] - report['s_oos'][i]:>+6.2f} |")
+
+    total = sum(row["elapsed_sec"] for row in report["timing"])
+    print(f"\nPer-fold timing (wall {report['wall_sec']:.1f} s, summed fold time {total:.1f} s):")
+    print("| Fold | Test Devices | Evaluations | Seconds |")
+    print("| :--: | :----------: | :---------: | :-----: |")
+    for row in report["timing"]:
+        print(f"| {row['fold']:>4} | {row['n_test']:>12} | {row['nfev']:>11} | {row['elapsed_sec']:>7.2f} |")
+
+
+def main(k=None, workers=None):
+    import recalibrate_with_corrected_data as recal
+    sys.path.insert(0, ALTERNATE_STUDY_DIR)
+    import run_clean_11param_optimization as clean
+    from benchmark_devices import BENCHMARK_DEVICES
+    x_clean = clean.cached_run_opt("huber", 10.0, 42)["raw_params"]
+
+    # 1. Clamped rational model, Pure MAE (the study's primary configuration)
+    dataset = recal.parse_and_correct_dataset()
+    cols = make_columns(dataset, "recalibrated")
+    x_full, _, _ = recal.calibrate_delta((dataset, 0.0))
+    report = cross_validate("rational_5p", cols, x_full, recal.SEARCH_BOUNDS, "mae", 0.0, k=k, workers=workers)
+    print_report("5-PARAMETER CLAMPED RATIONAL (delta = 0.0, Pure MAE)", cols, report)
+
+    # 2. 11-parameter stretched exponential, Huber delta = 10
+    cols = make_columns(BENCHMARK_DEVICES, "benchmark")
+    report = cross_validate("exponential_11p", cols, x_clean, clean.PARAM_BOUNDS, "huber", 10.0, k=k,
+                            workers=workers)
+    print_report("11-PARAMETER STRETCHED EXPONENTIAL (Huber delta = 10.0)", cols, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,749 @@
+"""
+Method C Batch Evaluator
+------------------------
+Vectorized forward model for every Method C wired-charging formulation used by the
+calibration scripts of this study and of the alternate MSE/Huber study:
+
+- predict_rational            -> sweep_huber_delta_fine.predict_charging_time (5 params)
+- predict_rational_clamped    -> recalibrate_with_corrected_data.objective_function (5 params)
+- predict_exponential_11p     -> run_clean_11param_optimization.predict_single (11 params)
+- predict_multiplier_12p      -> optimize_method_c.predict_duration (12 params)
+- predict_efficiency_12p      -> sync_all_study_data.predict_duration (12 params)
+
+jacobian_rational() gives the exact dT/dparams of the two 5-parameter rational models for
+local refinements (least_squares(jac=...), Gauss-Newton, IRLS).
+
+log_score() is the vectorized 0-10 log-normalization kernel behind map_score (Strategy 2,
+fixed [9, 241] bounds) and map_score_s1 (Strategy 1, per-row model bounds). space_residuals()
+lets any calibration fit the clipped score S_C - S_A instead of T_C - T_A, and
+space_jacobian() chains a duration Jacobian through the score (zero where clipped).
+
+The device list is compiled once by make_columns() into a frozen FeatureTable of read-only
+arrays: integer-coded arch / protocol and every parameter-independent feature (C_rate, onset
+coupling power_ratio x skin_headroom, ...), so the predictors do no dict access, string
+comparison or repeated per-device math inside a loss call. Parameters are either a single
+vector of shape (P,) or a whole population matrix of shape (S, P); every returned array then
+has shape (N,) or (S, N).
+Each predictor returns the predicted duration together with its intermediate factors
+(C_rate, F_system, eta_thermal, P_eff, ...) from one vectorized pass.
+
+Running this file checks every predictor against its scalar reference to 1e-12 and the
+Jacobian against central finite differences.
+"""
+
+import os
+import sys
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+from robust_losses import mean_loss
+
+T_HANDSHAKE = 0.5  # Fixed physical protocol handshake intercept (mins)
+
+# Strategy 2 (benchmark-aligned) score normalization bounds (mins)
+T_MIN_SCORE = 9.0
+T_MAX_SCORE = 241.0
+
+ALTERNATE_STUDY_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "..", "NOT_USED",
+    "alternate_section_8_2_method_c_mse_huber_optimization_study",
+    "working_files"
+)
+
+# Integer codes used in the column arrays
+ARCH_SINGLE = 0
+ARCH_DUAL = 1
+
+PROTOCOLS = ["charge_pump", "pps", "fixed_pd", "legacy_5v", "apple_legacy"]
+PROTOCOL_CODES = {name: idx for idx, name in enumerate(PROTOCOLS)}
+PROTO_OTHER = len(PROTOCOLS)  # Unlisted protocol -> formulation-specific default efficiency
+
+# Adapters from this rating up ship a vendor boost mode (67W MIUI boost, 120W Boost Mode, 125W
+# TurboPower; generate_corrected_master_tables.master_devices) unless a record sets "boost" itself
+BOOST_MIN_POWER_W = 65.0
+
+# Thermal-decay formulations eta_thermal(diff, k, p) above the onset (diff = C_rate - C_threshold > 0).
+# All of them fill the same (k, p) slots of a parameter schema, so any formulation can be fitted
+# with the bounds of another (predict_efficiency_12p, model_selection.py). Register new shapes here.
+THERMAL_DECAYS = {
+    # 1 / (1 + k diff^p): sync_all_study_data "rational", section 8.2 and 8.3 rational curves
+    "rational": lambda diff, k, p: 1.0 / (1.0 + k * diff ** p),
+    # exp(-k diff^p): sync_all_study_data "exponential", run_clean stretched exponential
+    "exponential": lambda diff, k, p: np.exp(-k * diff ** p),
+}
+
+# Field -> record key for every device record format used across the studies.
+# Tuple records (optimize_method_c.BENCHMARK_DEVICES) are addressed by position.
+RECORD_LAYOUTS = {
+    # sweep_huber_delta_fine.devices / audit_all_deltas.devices
+    "sweep": {
+        "name": "name", "E_supply": "E_supply", "P_peak": "P_peak", "arch": "arch",
+        "T_A": "T_A", "stability_pct": "stability_pct", "vendor_T_limit": "vendor_T_limit",
+    },
+    # recalibrate_with_corrected_data.parse_and_correct_dataset()
+    "recalibrated": {
+        "name": "name", "E_supply": "battery_wh", "P_peak": "p_peak", "arch": "arch", "T_A": "t_a",
+    },
+    # benchmark_devices.BENCHMARK_DEVICES
+    "benchmark": {
+        "name": "name", "E_supply": "battery_wh", "P_peak": "peak_power_w", "arch": "architecture",
+        "protocol": "protocol", "T_A": "t_actual_min", "S_A": "s_actual",
+    },
+    # optimize_method_c.BENCHMARK_DEVICES: (Wh, P_peak_W, arch_type, protocol, T_A_mins, S_A, name, url)
+    "tuple": {
+        "name": 6, "E_supply": 0, "P_peak": 1, "arch": 2, "protocol": 3, "T_A": 4, "S_A": 5,
+    },
+}
+
+
+@dataclass(frozen=True)
+class FeatureTable:
+    """
+    Frozen per-device feature table consumed by every predictor. Fields are read-only
+    arrays of length N (names a tuple) and are also reachable as table["field"].
+    """
+    name: tuple
+    E_supply: np.ndarray
+    P_peak: np.ndarray
+    arch: np.ndarray            # ARCH_SINGLE / ARCH_DUAL
+    dual: np.ndarray            # arch == ARCH_DUAL
+    protocol: np.ndarray        # PROTOCOL_CODES, PROTO_OTHER when unlisted
+    T_A: np.ndarray
+    S_A: np.ndarray             # NaN when absent
+    power_ratio: np.ndarray     # 1.0 when absent
+    skin_headroom: np.ndarray   # 1.0 when absent
+    onset_coupling: np.ndarray  # power_ratio * skin_headroom
+    C_rate: np.ndarray          # P_peak / E_supply
+    C_rate_safe: np.ndarray     # P_peak / max(0.01, E_supply) (12-parameter models)
+    boost: np.ndarray           # vendor boost mode (throttles late in the charge)
+
+    def __post_init__(self):
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+
+    def __setstate__(self, state):
+        # Unpickled arrays (process-pool tasks) come back writable: freeze them again
+        self.__dict__.update(state)
+        self.__post_init__()
+
+    def __getitem__(self, key):
+        return getattr(self, key)
+
+    def __len__(self):
+        return len(self.T_A)
+
+    def items(self):
+        return ((f.name, getattr(self, f.name)) for f in fields(self))
+
+
+def make_columns(records, layout):
+    """
+    Compiles a list of device records into the FeatureTable consumed by the predictors.
+
+    Args:
+        records: Device dicts or tuples in one of the RECORD_LAYOUTS formats.
+        layout: Key of RECORD_LAYOUTS describing the record format.
+
+    Returns:
+        FeatureTable (see its fields).
+    """
+    keys = RECORD_LAYOUTS[layout]
+    n = len(records)
+
+    def numeric(field):
+        return np.array([r[keys[field]] for r in records], dtype=float)
+
+    arch = np.array(
+        [ARCH_DUAL if str(r[keys["arch"]]).lower() == "dual" else ARCH_SINGLE for r in records],
+        dtype=np.int64
+    )
+    if "protocol" in keys:
+        protocol = np.array(
+            [PROTOCOL_CODES.get(r[keys["protocol"]], PROTO_OTHER) for r in records], dtype=np.int64
+        )
+    else:
+        protocol = np.full(n, PROTO_OTHER, dtype=np.int64)
+
+    # Section 8.2 thermal coupling of the onset C-rate (sweep dataset only)
+    if "stability_pct" in keys:
+        power_ratio = (numeric("stability_pct") / 100.0) ** 3
+        skin_headroom = ((numeric("vendor_T_limit") - 25.0) / 15.0) ** 0.5
+    else:
+        power_ratio = np.ones(n)
+        skin_headroom = np.ones(n)
+
+    E_supply = numeric("E_supply")
+    P_peak = numeric("P_peak")
+    if "boost" in keys:
+        boost = np.array([bool(r[keys["boost"]]) for r in records], dtype=bool)
+    else:
+        boost = P_peak >= BOOST_MIN_POWER_W
+    return FeatureTable(
+        name=tuple(r[keys["name"]] for r in records),
+        E_supply=E_supply,
+        P_peak=P_peak,
+        arch=arch,
+        dual=arch == ARCH_DUAL,
+        protocol=protocol,
+        T_A=numeric("T_A"),
+        S_A=numeric("S_A") if "S_A" in keys else np.full(n, np.nan),
+        power_ratio=power_ratio,
+        skin_headroom=skin_headroom,
+        onset_coupling=power_ratio * skin_headroom,
+        C_rate=P_peak / E_supply,
+        C_rate_safe=P_peak / np.maximum(0.01, E_supply),
+        boost=boost,
+    )
+
+
+def take_columns(cols, idx):
+    """Rows idx of a feature table (subset, fold or bootstrap resample with repeats)."""
+    idx = np.asarray(idx)
+    return FeatureTable(**{key: (tuple(val[i] for i in idx) if key == "name" else val[idx])
+                           for key, val in cols.items()})
+
+
+def log_score(t_pred, t_min, t_max, clip=True):
+    """
+    Log normalization 10 ln(t_max / t) / ln(t_max / t_min) of durations to the 0-10 speed
+    score, for any array shape. t_min / t_max may be arrays broadcasting against t_pred
+    (per-row bounds of a population). clip=True floors durations at 1 min and clips the
+    score to [0, 10], as every published table does.
+    """
+    t = np.asarray(t_pred, dtype=float)
+    log_max = np.log(t_max)
+    score = 10.0 * (log_max - np.log(np.maximum(1.0, t) if clip else t)) / (log_max - np.log(t_min))
+    return np.clip(score, 0.0, 10.0) if clip else score
+
+
+def strategy1_bounds(t_pred):
+    """
+    Strategy 1 (dynamic model bounds) normalization range of each row of predictions:
+    (max(1, min T_C), max(2, max T_C)), as (..., 1) arrays. A degenerate range (all
+    durations equal) is widened to one log unit, as in optimize_method_c.map_score_s1.
+    """
+    t = np.asarray(t_pred, dtype=float)
+    t_min = np.maximum(1.0, np.min(t, axis=-1, keepdims=True))
+    t_max = np.maximum(2.0, np.max(t, axis=-1, keepdims=True))
+    return np.where(t_min < t_max, t_min, t_max / np.e), t_max
+
+
+def map_score(t_pred, t_min=T_MIN_SCORE, t_max=T_MAX_SCORE):
+    """
+    Strategy 2 log normalization of durations to the 0-10 speed score
+    (optimize_method_c.map_score_s2), for any array shape.
+    """
+    return log_score(t_pred, t_min, t_max)
+
+
+def map_score_s1(t_pred):
+    """Strategy 1 log normalization (optimize_method_c.map_score_s1), per row of (N,) or (S, N) durations."""
+    return log_score(t_pred, *strategy1_bounds(t_pred))
+
+
+def actual_scores(cols):
+    """Benchmark score S_A of every device; Strategy 2 score of T_A where the dataset has none."""
+    return np.where(np.isfinite(cols["S_A"]), cols["S_A"], map_score(cols["T_A"]))
+
+
+# Calibration spaces: durations, or Strategy 1 / Strategy 2 scores
+SPACES = ["T", "S1", "S2"]
+
+
+def space_residuals(t_pred, cols, space="T"):
+    """
+    Calibration residuals of (N,) or (S, N) predictions: T_C - T_A in duration space, or
+    S_C - S_A with the Strategy 1 ("S1") or Strategy 2 ("S2") score.
+    """
+    if space == "T":
+        return t_pred - cols["T_A"]
+    if space == "S1":
+        return map_score_s1(t_pred) - actual_scores(cols)
+    if space == "S2":
+        return map_score(t_pred) - actual_scores(cols)
+    raise ValueError(f"Unknown calibration space: {space}")
+
+
+def space_jacobian(t_pred, jac_t, space="T"):
+    """
+    Jacobian of space_residuals for one parameter vector from the (N, P) duration Jacobian
+    (e.g. jacobian_rational). Where the score is clipped (S = 0 or 10, or T below the 1 min
+    floor) it does not move with the parameters, so those rows are zero; at the clip edge the
+    one-sided derivative from the saturated side is used. For Strategy 1 the normalization
+    range moves with the shortest / longest predicted duration, which adds their rows.
+    """
+    t = np.asarray(t_pred, dtype=float)
+    J = np.asarray(jac_t, dtype=float)
+    if space == "T":
+        return J
+    if space == "S1":
+        t_min, t_max = (b[0] for b in strategy1_bounds(t))
+    elif space == "S2":
+        t_min, t_max = T_MIN_SCORE, T_MAX_SCORE
+    else:
+        raise ValueError(f"Unknown calibration space: {space}")
+
+    log_t = np.log(np.maximum(1.0, t))
+    log_min, log_max = np.log(t_min), np.log(t_max)
+    span = log_max - log_min
+    raw = 10.0 * (log_max - log_t) / span
+    inside = (raw > 0.0) & (raw < 10.0)
+
+    dS_dt = np.where(inside & (t > 1.0), -10.0 / (span * t), 0.0)
+    grad = dS_dt[:, None] * J
+    if space == "S1":
+        # d/d ln t_max and d/d ln t_min of 10 (ln t_max - ln t) / (ln t_max - ln t_min)
+        dS_dmax = np.where(inside, 10.0 * (log_t - log_min) / span ** 2, 0.0)
+        dS_dmin = np.where(inside, 10.0 * (log_max - log_t) / span ** 2, 0.0)
+        i_max, i_min = int(np.argmax(t)), int(np.argmin(t))
+        if t[i_max] > 2.0:
+            grad += dS_dmax[:, None] * (J[i_max] / t[i_max])[None, :]
+        if 1.0 < t[i_min] < t_max:
+            grad += dS_dmin[:, None] * (J[i_min] / t[i_min])[None, :]
+    return grad
+
+
+def _population(params):
+    """Returns params as an (S, P) matrix and whether a single vector was passed."""
+    P = np.asarray(params, dtype=float)
+    return np.atleast_2d(P), P.ndim == 1
+
+
+def _finish(out, single):
+    """Broadcasts every output to (S, N), or strips the population axis for a single vector."""
+    shape = out["t_pred"].shape  # t_pred always depends on both parameters and devices
+    out = {key: val if val.shape == shape else np.broadcast_to(val, shape) for key, val in out.items()}
+    if single:
+        return {key: val[0] for key, val in out.items()}
+    return out
+
+
+def _protocol_factor(P, first_col, default, protocol):
+    """Gathers the per-device protocol factor from columns first_col..first_col+4 of P."""
+    S = P.shape[0]
+    table = np.concatenate([P[:, first_col:first_col + len(PROTOCOLS)], np.full((S, 1), default)], axis=1)
+    return table[:, protocol]
+
+
+def _rational_core(cols, params, clamped, t_handshake):
+    P, single = _population(params)
+    eta_low, C0_single, C0_dual, k, p = (P[:, j:j + 1] for j in range(5))
+
+    E_supply = cols["E_supply"]
+    P_peak = cols["P_peak"]
+    C_rate = cols["C_rate"]
+
+    C0_effective = np.where(cols["dual"], C0_dual, C0_single) * cols["onset_coupling"]
+
+    if clamped:
+        diff = np.maximum(0.0, C_rate - C0_effective)
+        denom = 1.0 + k * (diff ** p)
+        F_system = np.minimum(1.0, np.maximum(0.01, eta_low / denom))
+    else:
+        above = C_rate > C0_effective
+        diff = np.where(above, C_rate - C0_effective, 0.0)
+        denom = 1.0 + k * (diff ** p)
+        F_system = np.where(above, np.minimum(1.0, eta_low / denom), eta_low)
+
+    P_effective = P_peak * F_system
+    T_predicted = (E_supply / P_effective) * 60.0 + t_handshake
+
+    return _finish({
+        "t_pred": T_predicted,
+        "C_rate": C_rate,
+        "C0_effective": C0_effective,
+        "eta_thermal": 1.0 / denom,
+        "F_system": F_system,
+        "p_eff": P_effective,
+    }, single)
+
+
+def predict_rational(cols, params, t_handshake=T_HANDSHAKE):
+    """
+    Section 8.2 rational model with thermally-coupled onset (sweep_huber_delta_fine).
+    params: (eta_low, C0_single_base, C0_dual_base, k, p).
+    """
+    return _rational_core(cols, params, False, t_handshake)
+
+
+def predict_rational_clamped(cols, params, t_handshake=T_HANDSHAKE):
+    """
+    Section 8.2 rational model with F_system clamped to [0.01, 1.0]
+    (recalibrate_with_corrected_data). params: (eta_low, c0_single, c0_dual, k, p).
+    """
+    return _rational_core(cols, params, True, t_handshake)
+
+
+def predict_exponential_11p(cols, params, t_handshake=T_HANDSHAKE):
+    """
+    11-parameter stretched-exponential model (run_clean_11param_optimization).
+    params: (eta_CCCV, C_thresh, s_low, eta_arch_single, eta_cp, eta_pps, eta_pd,
+             eta_5v, eta_apple, k, p).
+    """
+    P, single = _population(params)
+    eta_CCCV, C_thresh, s_low, eta_arch_single = (P[:, j:j + 1] for j in range(4))
+    k, p = P[:, 9:10], P[:, 10:11]
+
+    wh = cols["E_supply"]
+    p_peak = cols["P_peak"]
+    C_rate = cols["C_rate"]
+    low = C_rate <= C_thresh
+
+    # 1. CC/CV efficiency
+    eff_eta_CCCV = np.where(low, eta_CCCV + s_low * (C_thresh - C_rate), eta_CCCV)
+    eff_eta_CCCV = np.maximum(0.05, np.minimum(1.00, eff_eta_CCCV))
+
+    # 2. Architecture efficiency
+    eta_arch = np.where(cols["dual"], 1.0, eta_arch_single)
+
+    # 3. Protocol efficiency
+    eta_proto = _protocol_factor(P, 4, 0.70, cols["protocol"])
+
+    # 4. Thermal decay kinetics (stretched exponential)
+    diff = np.where(low, 0.0, C_rate - C_thresh)
+    eta_thermal = np.where(low, 1.0, np.exp(-k * (diff ** p)))
+    eta_thermal = np.maximum(0.05, np.minimum(1.00, eta_thermal))
+
+    # 5. Effective power
+    p_eff = p_peak * eff_eta_CCCV * eta_arch * eta_proto * eta_thermal
+    p_eff = np.maximum(0.1, np.minimum(p_peak, p_eff))
+
+    # 6. Duration
+    t_pred = (wh / p_eff) * 60.0 + t_handshake
+
+    return _finish({
+        "t_pred": t_pred,
+        "C_rate": C_rate,
+        "eff_eta_CCCV": eff_eta_CCCV,
+        "eta_arch": eta_arch,
+        "eta_proto": eta_proto,
+        "eta_thermal": eta_thermal,
+        "F_system": p_eff / p_peak,
+        "p_eff": p_eff,
+    }, single)
+
+
+def predict_multiplier_12p(cols, params):
+    """
+    12-parameter relative-multiplier model (optimize_method_c). The handshake is parameter 5.
+    params: (C_threshold, k, p, eta_base, s_low, T_handshake, F_charge_pump, F_pps,
+             F_fixed_pd, F_legacy_5v, F_apple, F_arch).
+    """
+    P, single = _population(params)
+    C_thresh, k, p, eta_base, s_low, T_handshake = (P[:, j:j + 1] for j in range(6))
+    F_arch = P[:, 11:12]
+
+    E_supply = cols["E_supply"]
+    p_peak_w = cols["P_peak"]
+    C_rate = cols["C_rate_safe"]
+
+    F_a = np.where(cols["dual"], F_arch, 1.0)
+    F_proto = _protocol_factor(P, 6, 1.0, cols["protocol"])
+
+    above = C_rate > C_thresh
+    F_Crate = np.where(above, 1.0 / (1.0 + k * np.maximum(1e-9, C_rate - C_thresh) ** p), 1.0)
+    eff_eta = np.where(above, eta_base, eta_base + s_low * (C_thresh - C_rate))
+    eff_eta = np.maximum(0.15, np.minimum(0.95, eff_eta))
+
+    P_effective = np.maximum(0.1, p_peak_w * eff_eta * F_a * F_proto * F_Crate)
+    T_predicted = (E_supply / P_effective) * 60.0 + T_handshake
+
+    return _finish({
+        "t_pred": T_predicted,
+        "C_rate": C_rate,
+        "eff_eta": eff_eta,
+        "F_arch": F_a,
+        "F_proto": F_proto,
+        "eta_thermal": F_Crate,
+        "F_system": P_effective / p_peak_w,
+        "p_eff": P_effective,
+    }, single)
+
+
+def predict_efficiency_12p(cols, params, formulation="exponential"):
+    """
+    12-parameter absolute-efficiency model (sync_all_study_data) with any THERMAL_DECAYS
+    formulation. The handshake is parameter 5.
+    params: (eta_CCCV, C_threshold, k, p, s_low, T_handshake, eta_arch_single,
+             eta_proto_cp, eta_proto_pps, eta_proto_fpd, eta_proto_5v, eta_proto_app).
+    """
+    P, single = _population(params)
+    eta_CCCV, C_thresh, k, p, s_low, T_handshake, eta_arch_s = (P[:, j:j + 1] for j in range(7))
+
+    E_supply = cols["E_supply"]
+    p_peak_w = cols["P_peak"]
+    C_rate = cols["C_rate_safe"]
+
+    eta_a = np.where(cols["dual"], 1.00, eta_arch_s)
+    eta_proto = _protocol_factor(P, 7, 0.90, cols["protocol"])
+
+    if formulation not in THERMAL_DECAYS:
+        raise ValueError(f"Unknown formulation: {formulation}")
+    above = C_rate > C_thresh
+    eta_thermal = np.where(above, THERMAL_DECAYS[formulation](np.maximum(1e-9, C_rate - C_thresh), k, p), 1.0)
+    eff_eta_CCCV = np.where(above, eta_CCCV, eta_CCCV + s_low * (C_thresh - C_rate))
+
+    eff_eta_CCCV = np.maximum(0.15, np.minimum(0.95, eff_eta_CCCV))
+    P_effective = np.maximum(0.1, p_peak_w * eff_eta_CCCV * eta_a * eta_proto * eta_thermal)
+    T_predicted = (E_supply / P_effective) * 60.0 + T_handshake
+
+    return _finish({
+        "t_pred": T_predicted,
+        "C_rate": C_rate,
+        "eff_eta_CCCV": eff_eta_CCCV,
+        "eta_arch": eta_a,
+        "eta_proto": eta_proto,
+        "eta_thermal": eta_thermal,
+        "F_system": P_effective / p_peak_w,
+        "p_eff": P_effective,
+    }, single)
+
+
+def jacobian_rational(cols, params, clamped=False):
+    """
+    Closed-form Jacobian dT_pred/dparams of predict_rational / predict_rational_clamped.
+
+    Where F_system is not clamped, T = 60 E / P * denom / eta_low + T_handshake with
+    denom = 1 + k * diff^p and diff = C_rate - C0_base * power_ratio * skin_headroom.
+    Below the onset (diff = 0) only eta_low acts; at the kink the one-sided (below-onset)
+    derivative is used. Devices whose F_system sits on a clamp have a zero row.
+
+    Args:
+        cols: FeatureTable from make_columns().
+        params: Single vector (eta_low, C0_single, C0_dual, k, p).
+        clamped: True for the recalibrate_with_corrected_data variant.
+
+    Returns:
+        (N, 5) array, row i = dT_i / d(eta_low, C0_single, C0_dual, k, p).
+    """
+    eta_low, C0_single, C0_dual, k, p = np.asarray(params, dtype=float)
+
+    E_supply = cols["E_supply"]
+    P_peak = cols["P_peak"]
+    C_rate = cols["C_rate"]
+    dual = cols["dual"]
+    coupling = cols["onset_coupling"]
+    C0_effective = np.where(dual, C0_dual, C0_single) * coupling
+
+    above = C_rate > C0_effective
+    diff = np.where(above, C_rate - C0_effective, 1.0)  # 1.0 keeps log/pow finite below onset
+    diff_p = np.where(above, diff ** p, 0.0)
+    denom = 1.0 + k * diff_p
+    F_raw = eta_low / denom
+    if clamped:
+        active = (F_raw > 0.01) & (F_raw < 1.0)
+    else:
+        active = ~above | (F_raw < 1.0)
+
+    A = 60.0 * E_supply / P_peak
+    d_eta = -A * denom / eta_low ** 2
+    d_k = A * diff_p / eta_low
+    d_p = np.where(above, A * k * diff_p * np.log(diff) / eta_low, 0.0)
+    d_C0 = np.where(above, -A * k * p * diff_p / diff * coupling / eta_low, 0.0)
+
+    J = np.column_stack([
+        d_eta,
+        np.where(dual, 0.0, d_C0),
+        np.where(dual, d_C0, 0.0),
+        d_k,
+        d_p,
+    ])
+    return np.where(active[:, None], J, 0.0)
+
+
+def batch_loss(residuals, loss_type="mse", delta=10.0, tau=0.5):
+    """
+    Mean loss over the device axis (last axis) of a residual array.
+
+    Args:
+        residuals: (N,) residuals for one parameter vector or (S, N) for a population.
+        loss_type: Any robust_losses.LOSS_TYPES name ("mse", "mae", "huber", ...).
+        delta: Scale of the Huber-type losses (mins).
+        tau: Quantile level of the "quantile" loss.
+
+    Returns:
+        Scalar loss for (N,) input, or an (S,) array of losses for (S, N) input.
+    """
+    return mean_loss(residuals, loss_type, delta, tau)
+
+
+def _sample_population(bounds, size, rng):
+    lo = np.array([b[0] for b in bounds])
+    hi = np.array([b[1] for b in bounds])
+    return lo + rng.random((size, len(bounds))) * (hi - lo)
+
+
+def verify_against_scalar_models(population_size=200, tol=1e-12, seed=0):
+    """
+    Evaluates random parameter populations through the batch predictors and the original
+    per-device scalar functions, and reports the largest duration difference relative to
+    max(1, |T|) (random draws reach clamped durations of several thousand minutes, where
+    a single ulp of the libm/SIMD exp and pow already exceeds 1e-12 absolute).
+    """
+    sys.path.insert(0, ALTERNATE_STUDY_DIR)
+    import sweep_huber_delta_fine as sweep
+    import recalibrate_with_corrected_data as recal
+    import run_clean_11param_optimization as clean
+    import optimize_method_c as omc
+    import sync_all_study_data as sync
+    from benchmark_devices import BENCHMARK_DEVICES
+
+    rng = np.random.default_rng(seed)
+    report = {}
+
+    def compare(label, batch_t, scalar_t):
+        scalar_t = np.asarray(scalar_t)
+        abs_diff = np.abs(np.asarray(batch_t) - scalar_t)
+        rel_diff = float(np.max(abs_diff / np.maximum(1.0, np.abs(scalar_t))))
+        report[label] = rel_diff
+        status = "OK" if rel_diff <= tol else "MISMATCH"
+        print(f"{label:<38} | max |dT| = {np.max(abs_diff):.3e} mins | max rel = {rel_diff:.3e} | {status}")
+
+    # 1. sweep_huber_delta_fine.predict_charging_time
+    cols = make_columns(sweep.devices, "sweep")
+    pop = _sample_population(sweep.bounds, population_size, rng)
+    batch = predict_rational(cols, pop)["t_pred"]
+    scalar = [[sweep.predict_charging_time(d, *x) for d in sweep.devices] for x in pop]
+    compare("predict_rational", batch, scalar)
+
+    # 2. recalibrate_with_corrected_data.predict_device
+    dataset = recal.parse_and_correct_dataset()
+    cols = make_columns(dataset, "recalibrated")
+    recal_bounds = [(0.50, 1.00), (0.00, 15.00), (0.00, 15.00), (0.00, 10.00), (0.01, 5.00)]
+    pop = _sample_population(recal_bounds, population_size, rng)
+    batch = predict_rational_clamped(cols, pop)["t_pred"]
+    scalar = [[recal.predict_device(x, d) for d in dataset] for x in pop]
+    compare("predict_rational_clamped", batch, scalar)
+
+    # 3. run_clean_11param_optimization.predict_single
+    cols = make_columns(BENCHMARK_DEVICES, "benchmark")
+    pop = _sample_population(clean.PARAM_BOUNDS, population_size, rng)
+    batch = predict_exponential_11p(cols, pop)["t_pred"]
+    scalar = [[clean.predict_single(d, x)["t_pred"] for d in BENCHMARK_DEVICES] for x in pop]
+    compare("predict_exponential_11p", batch, scalar)
+
+    # 4. optimize_method_c.predict_duration
+    cols = make_columns(omc.BENCHMARK_DEVICES, "tuple")
+    pop = _sample_population(omc.PARAM_BOUNDS, population_size, rng)
+    batch = predict_multiplier_12p(cols, pop)["t_pred"]
+    scalar = [omc.predict_all(list(x)) for x in pop]
+    compare("predict_multiplier_12p", batch, scalar)
+
+    # 5. sync_all_study_data.predict_duration (both formulations)
+    for formulation in ["rational", "exponential"]:
+        pop = _sample_population(sync.PARAM_BOUNDS_LOSS, population_size, rng)
+        batch = predict_efficiency_12p(cols, pop, formulation)["t_pred"]
+        scalar = [sync.predict_all(list(x), formulation) for x in pop]
+        compare(f"predict_efficiency_12p ({formulation})", batch, scalar)
+
+    return report
+
+
+def verify_jacobians(samples=200, tol=1e-6, seed=0):
+    """
+    Compares jacobian_rational against central finite differences on random parameter
+    vectors of both rational variants. Devices within the step of a kink or clamp are
+    skipped, since finite differences straddle the discontinuity there.
+    Returns the largest relative difference per variant.
+    """
+    import sweep_huber_delta_fine as sweep
+    import recalibrate_with_corrected_data as recal
+
+    rng = np.random.default_rng(seed)
+    recal_bounds = [(0.50, 1.00), (0.00, 15.00), (0.00, 15.00), (0.00, 10.00), (0.01, 5.00)]
+    cases = [
+        ("predict_rational", make_columns(sweep.devices, "sweep"), sweep.bounds, False),
+        ("predict_rational_clamped", make_columns(recal.parse_and_correct_dataset(), "recalibrated"),
+         recal_bounds, True),
+    ]
+    report = {}
+    for label, cols, bounds, clamped in cases:
+        predict = predict_rational_clamped if clamped else predict_rational
+        worst = 0.0
+        for x in _sample_population(bounds, samples, rng):
+            J = jacobian_rational(cols, x, clamped)
+            h = 1e-6 * np.maximum(1.0, np.abs(x))
+            fd = np.empty_like(J)
+            smooth = np.ones(len(cols["T_A"]), dtype=bool)
+            for j in range(len(x)):
+                up, dn = x.copy(), x.copy()
+                up[j] += h[j]
+                dn[j] -= h[j]
+                out_up, out_dn = predict(cols, up), predict(cols, dn)
+                fd[:, j] = (out_up["t_pred"] - out_dn["t_pred"]) / (2.0 * h[j])
+                # Same branch (onset and clamp) on both sides of the step
+                smooth &= (out_up["C_rate"] > out_up["C0_effective"]) == (out_dn["C_rate"] > out_dn["C0_effective"])
+                smooth &= (out_up["F_system"] < 1.0) == (out_dn["F_system"] < 1.0)
+                smooth &= (out_up["F_system"] > 0.01) == (out_dn["F_system"] > 0.01)
+            scale = np.maximum(1.0, np.abs(fd))
+            worst = max(worst, float(np.max((np.abs(J - fd) / scale)[smooth])))
+        report[label] = worst
+        status = "OK" if worst <= tol else "MISMATCH"
+        print(f"jacobian_rational ({label:<24}) | max rel vs finite differences = {worst:.3e} | {status}")
+    return report
+
+
+def verify_space_jacobians(samples=200, tol=1e-6, seed=0):
+    """
+    Compares space_jacobian (Strategy 1 and 2 scores of the clamped rational model) against
+    central finite differences of space_residuals. Devices whose score clip or whose
+    Strategy 1 range end (shortest / longest duration) changes within the step are skipped.
+    """
+    import recalibrate_with_corrected_data as recal
+
+    rng = np.random.default_rng(seed)
+    cols = make_columns(recal.parse_and_correct_dataset(), "recalibrated")
+    report = {}
+    for space in ["S1", "S2"]:
+        worst = 0.0
+        for x in _sample_population(recal.SEARCH_BOUNDS, samples, rng):
+            t = predict_rational_clamped(cols, x)["t_pred"]
+            J = space_jacobian(t, jacobian_rational(cols, x, clamped=True), space)
+            h = 1e-6 * np.maximum(1.0, np.abs(x))
+            fd = np.empty_like(J)
+            smooth = np.ones(len(t), dtype=bool)
+            for j in range(len(x)):
+                up, dn = x.copy(), x.copy()
+                up[j] += h[j]
+                dn[j] -= h[j]
+                t_pair = np.stack([predict_rational_clamped(cols, up)["t_pred"],
+                                   predict_rational_clamped(cols, dn)["t_pred"]])
+                s_pair = space_residuals(t_pair, cols, space)
+                fd[:, j] = (s_pair[0] - s_pair[1]) / (2.0 * h[j])
+                smooth &= np.argmax(t_pair[0]) == np.argmax(t_pair[1])
+                smooth &= np.argmin(t_pair[0]) == np.argmin(t_pair[1])
+                # Same clip state on both sides of the step
+                bounds = strategy1_bounds(t_pair) if space == "S1" else (T_MIN_SCORE, T_MAX_SCORE)
+                raw = log_score(t_pair, *bounds, clip=False)
+                inside = (raw > 0) & (raw < 10) & (t_pair > 1)
+                smooth &= inside[0] == inside[1]
+            scale = np.maximum(1.0, np.abs(fd))
+            worst = max(worst, float(np.max((np.abs(J - fd) / scale)[smooth], initial=0.0)))
+        report[space] = worst
+        status = "OK" if worst <= tol else "MISMATCH"
+        print(f"space_jacobian ({space}, clamped rational)     | max rel vs finite differences = {worst:.3e} | {status}")
+    return report
+
+
+if __name__ == "__main__":
+    print("=== METHOD C BATCH EVALUATOR vs SCALAR REFERENCE MODELS ===")
+    results = verify_against_scalar_models()
+    failed = [label for label, rel_diff in results.items() if rel_diff > 1e-12]
+    print("\nAll batch predictors match their scalar references." if not failed
+          else f"\nMismatch in: {', '.join(failed)}")
+
+    print("\n=== ANALYTIC JACOBIAN vs FINITE DIFFERENCES ===")
+    jac_results = verify_jacobians()
+    jac_failed = [label for label, rel_diff in jac_results.items() if rel_diff > 1e-6]
+    print("\nJacobians match finite differences." if not jac_failed
+          else f"\nJacobian mismatch in: {', '.join(jac_failed)}")
+
+    print("\n=== SCORE-SPACE JACOBIAN vs FINITE DIFFERENCES ===")
+    space_results = verify_space_jacobians()
+    space_failed = [label for label, rel_diff in space_results.items() if rel_diff > 1e-6]
+    print("\nScore-space Jacobians match finite differences." if not space_failed
+          else f"\nScore-space Jacobian mismatch in: {', '.join(space_failed)}")
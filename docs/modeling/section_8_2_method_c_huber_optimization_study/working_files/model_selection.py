@@ -0,0 +1,147 @@
+"""
+Model Selection Across Thermal-Decay Formulations
+-------------------------------------------------
+Fits every registered thermal-decay formulation (method_c_batch.THERMAL_DECAYS) under every
+calibration loss on the same precomputed device table and reports, per fit:
+
+- the calibration loss, MAE_T and RMSE_T,
+- information criteria on the in-sample residuals under the likelihood the loss maximizes,
+
+      AIC = -2 ln L + 2 k,    BIC = -2 ln L + k ln(n),
+
+  with -2 ln L = n ln(RSS / n) for MSE (Gaussian) and 2 n ln(sum |r| / n) for Pure MAE
+  (Laplace, as in profile_likelihood.py), up to constants, and k the number of free
+  parameters (bounds with lo == hi, e.g. the fixed handshake, are not counted). Huber fits
+  have no such likelihood with a fitted scale and get no criteria. The criteria of different
+  losses are not comparable, so dBIC is taken against the best fit of the same loss,
+- K-fold out-of-sample MAE_T / RMSE_T (cross_validation.cross_validate),
+- the wall time of the fit and of the cross-validation.
+
+All formulations share the 12-parameter efficiency schema of sync_all_study_data
+(PARAM_KEYS_LOSS / PARAM_BOUNDS_LOSS); only the shape of eta_thermal(C_rate - C_threshold)
+changes, so adding a formulation to THERMAL_DECAYS adds it to this table without further edits.
+The "rational" entry is the curve of the 8.2 / 8.3 rational models and "exponential" is the
+stretched exponential of run_clean_11param_optimization.
+
+Every (formulation, loss) fit is one task of the sweep_runner process pool: a cold vectorized
+differential_evolution followed by its cross-validation (run serially inside the task).
+
+Usage:
+    python model_selection.py    (44 GSMArena benchmark devices, 5-fold CV)
+"""
+
+import sys
+import time
+
+import numpy as np
+from scipy.optimize import differential_evolution
+
+from method_c_batch import ALTERNATE_STUDY_DIR, THERMAL_DECAYS, predict_efficiency_12p, batch_loss
+from cross_validation import cross_validate
+from sweep_runner import run_sweep
+
+# (loss_type, delta) pairs fitted for every formulation
+LOSSES = [("mse", 10.0), ("mae", 0.0), ("huber", 10.0)]
+
+
+def information_criteria(residuals, n_params, loss_type="mse", delta=0.0):
+    """
+    (AIC, BIC) of a fit with n_params free parameters under the likelihood matched to its
+    loss: Gaussian for mse, Laplace for mae (huber with delta 0). (None, None) for Huber.
+    """
+    r = np.asarray(residuals)
+    n = len(r)
+    if loss_type == "mse":
+        deviance = n * np.log(np.sum(r ** 2) / n)
+    elif loss_type == "mae" or (loss_type == "huber" and delta == 0):
+        deviance = 2 * n * np.log(np.sum(np.abs(r)) / n)
+    else:
+        return None, None
+    return deviance + 2 * n_params, deviance + n_params * np.log(n)
+
+
+def _fit_model(task):
+    """Fits one (formulation, loss) pair and cross-validates it (module level for pool workers)."""
+    formulation, loss_type, delta, cols, bounds, k_folds, seed = task
+    model = f"efficiency_12p_{formulation}"
+
+    t0 = time.time()
+    res = differential_evolution(
+        lambda pop: batch_loss(predict_efficiency_12p(cols, pop.T, formulation)["t_pred"] - cols["T_A"],
+                               loss_type, delta),
+        bounds, maxiter=1000, popsize=15, tol=1e-7, seed=seed, updating='deferred', vectorized=True
+    )
+    fit_sec = time.time() - t0
+
+    cv = cross_validate(model, cols, res.x, bounds, loss_type, delta, k=k_folds, seed=seed, workers=1)
+    n_params = sum(lo < hi for lo, hi in bounds)
+    aic, bic = information_criteria(cv["t_in"] - cols["T_A"], n_params, loss_type, delta)
+    return {
+        "formulation": formulation, "loss_type": loss_type, "delta": delta, "x": res.x, "loss": res.fun,
+        "n_params": n_params, "AIC": aic, "BIC": bic,
+        "in_sample": cv["in_sample"], "out_of_sample": cv["out_of_sample"],
+        "fit_sec": fit_sec, "cv_sec": cv["wall_sec"],
+    }
+
+
+def select_models(cols, bounds, formulations=None, losses=LOSSES, k_folds=5, seed=42, workers=None):
+    """
+    Fits formulations x losses concurrently.
+
+    Args:
+        cols: Column table of the dataset (make_columns), shared by every fit.
+        bounds: 12-parameter bounds of the efficiency schema.
+        formulations: THERMAL_DECAYS names (default: all registered).
+        losses: (loss_type, delta) pairs.
+        k_folds: Cross-validation folds per fit (None for leave-one-out).
+        workers: Process count (see sweep_runner.run_sweep).
+
+    Returns:
+        (list of per-fit result dicts in formulation x loss order, total wall seconds).
+    """
+    formulations = list(THERMAL_DECAYS) if formulations is None else formulations
+    tasks = [(name, loss_type, delta, cols, bounds, k_folds, seed)
+             for name in formulations for loss_type, delta in losses]
+    t0 = time.time()
+    results = run_sweep(_fit_model, tasks, workers)
+    return results, time.time() - t0
+
+
+def _criterion(value, width):
+    return f"{value:>{width}.2f}" if value is not None else f"{'-':>{width}}"
+
+
+def print_table(results, wall_sec, k_folds):
+    best_bic = {}
+    for r in results:
+        if r["BIC"] is not None:
+            best_bic[r["loss_type"]] = min(r["BIC"], best_bic.get(r["loss_type"], np.inf))
+    print(f"\n=== MODEL SELECTION: {len(results)} FITS, {k_folds}-FOLD CV (wall {wall_sec:.1f} s) ===")
+    print("| Formulation | Loss          | k  | Loss Value | MAE_T  | RMSE_T | AIC     | BIC     | dBIC   "
+          "| CV MAE_T | CV RMSE_T | Fit (s) | CV (s) |")
+    print("| :---------- | :------------ | :: | :--------: | :----: | :----: | :-----: | :-----: | :----: "
+          "| :------: | :-------: | :-----: | :----: |")
+    for r in results:
+        loss = "Pure MAE" if r["loss_type"] == "mae" else (
+            f"Huber d={r['delta']:.1f}" if r["loss_type"] == "huber" else r["loss_type"].upper())
+        ins, oos = r["in_sample"], r["out_of_sample"]
+        print(f"| {r['formulation']:<11} | {loss:<13} | {r['n_params']:>2} | {r['loss']:>10.4f} | "
+              f"{ins['MAE_T']:>6.2f} | {ins['RMSE_T']:>6.2f} | {_criterion(r['AIC'], 7)} | "
+              f"{_criterion(r['BIC'], 7)} | "
+              f"{_criterion(None if r['BIC'] is None else r['BIC'] - best_bic[r['loss_type']], 6)} | "
+              f"{oos['MAE_T']:>8.2f} | {oos['RMSE_T']:>9.2f} | "
+              f"{r['fit_sec']:>7.1f} | {r['cv_sec']:>6.1f} |")
+
+
+def main(k_folds=5, workers=None):
+    sys.path.insert(0, ALTERNATE_STUDY_DIR)
+    from optimize_method_c import BENCHMARK_COLUMNS
+    from sync_all_study_data import PARAM_BOUNDS_LOSS
+
+    results, wall = select_models(BENCHMARK_COLUMNS, PARAM_BOUNDS_LOSS, k_folds=k_folds, workers=workers)
+    print_table(results, wall, k_folds)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Pareto-Front Calibration of Method C
+------------------------------------
+The Huber delta sweep trades MAE_T against RMSE_T and the worst-case error by re-running a
+full optimization per delta. This module computes the trade-off directly: one population-based
+run (NSGA-II selection with DE/rand/1/bin variation) approximates the Pareto front over
+
+    (MAE_T, RMSE_T, max |dT|, |Mean_dT|)
+
+and front_sweep() then reads every delta of a sweep off that front: the front member with the
+lowest Huber loss at that delta (Pure MAE at delta = 0), optionally polished with the batched
+pattern search (batch_search.pattern_search) on the same loss. A Huber optimum need not lie
+exactly on this four-objective front, so the polish step closes the remaining gap locally.
+
+Objectives and losses are evaluated for the whole population in one vectorized call through
+a residual function mapping an (S, P) population to (S, N) residuals T_C - T_A, e.g.
+
+    cols = make_columns(devices, "sweep")
+    residuals = lambda pop: predict_rational(cols, pop)["t_pred"] - cols["T_A"]
+
+Usage:
+    python pareto.py    (front of the 5-parameter rational model on the fine-sweep devices)
+"""
+
+import time
+
+import numpy as np
+from scipy.stats import qmc
+
+from batch_search import pattern_search
+from method_c_batch import batch_loss
+
+OBJECTIVES = ["MAE_T", "RMSE_T", "Max_Err", "|Mean_dT|"]
+
+
+def front_objectives(residuals):
+    """(S, N) residuals -> (S, 4) objectives in OBJECTIVES order."""
+    r = np.atleast_2d(residuals)
+    return np.column_stack([
+        np.mean(np.abs(r), axis=1),
+        np.sqrt(np.mean(r ** 2, axis=1)),
+        np.max(np.abs(r), axis=1),
+        np.abs(np.mean(r, axis=1)),
+    ])
+
+
+def dominance(A, B):
+    """(len(A), len(B)) boolean matrix: entry [i, j] is True if row A[i] Pareto-dominates B[j]."""
+    le = np.ones((len(A), len(B)), dtype=bool)
+    lt = np.zeros((len(A), len(B)), dtype=bool)
+    for j in range(A.shape[1]):
+        a, b = A[:, j, None], B[None, :, j]
+        le &= a <= b
+        lt |= a < b
+    return le & lt
+
+
+def non_dominated_ranks(F):
+    """Pareto rank of every row of F (0 = non-dominated), by repeated peeling of the front."""
+    dominates = dominance(F, F)
+
+    ranks = np.full(len(F), -1)
+    remaining = np.ones(len(F), dtype=bool)
+    rank = 0
+    while remaining.any():
+        dominated = dominates[remaining][:, remaining].any(axis=0)
+        current = np.flatnonzero(remaining)[~dominated]
+        ranks[current] = rank
+        remaining[current] = False
+        rank += 1
+    return ranks
+
+
+def crowding_distance(F):
+    """NSGA-II crowding distance within one front; boundary points get infinity."""
+    n, m = F.shape
+    dist = np.zeros(n)
+    if n <= 2:
+        return np.full(n, np.inf)
+    for j in range(m):
+        order = np.argsort(F[:, j])
+        span = F[order[-1], j] - F[order[0], j]
+        dist[order[[0, -1]]] = np.inf
+        if span > 0:
+            dist[order[1:-1]] += (F[order[2:], j] - F[order[:-2], j]) / span
+    return dist
+
+
+def _select(F, size):
+    """Indices of the `size` survivors: lowest rank first, ties broken by larger crowding distance."""
+    ranks = non_dominated_ranks(F)
+    keep = []
+    for rank in range(ranks.max() + 1):
+        members = np.flatnonzero(ranks == rank)
+        if len(keep) + len(members) <= size:
+            keep.extend(members)
+        else:
+            crowd = crowding_distance(F[members])
+            keep.extend(members[np.argsort(-crowd)[:size - len(keep)]])
+            break
+    return np.array(keep)
+
+
+def pareto_front(residual_fn, bounds, pop_size=200, generations=400, mutation=0.5, crossover=0.9,
+                 archive_size=1000, seed=42):
+    """
+    Approximates the (MAE_T, RMSE_T, max |dT|, |Mean_dT|) Pareto front in one run.
+
+    Args:
+        residual_fn: Function mapping an (S, P) population to (S, N) residuals.
+        bounds: Parameter bounds [(lo, hi), ...].
+        pop_size, generations: Population size and number of generations.
+        mutation, crossover: DE/rand/1/bin differential weight and crossover probability.
+        archive_size: Cap of the external archive of non-dominated solutions.
+        seed: Seed of the Latin-hypercube start and the variation operators.
+
+    Returns:
+        Dict with the archived front "x" (K, P) and "f" (K, 4), plus "nfev" and "elapsed_sec".
+    """
+    t0 = time.time()
+    rng = np.random.default_rng(seed)
+    lo, hi = np.array(bounds, dtype=float).T
+    dim = len(lo)
+
+    X = qmc.scale(qmc.LatinHypercube(dim, seed=seed).random(pop_size), lo, hi)
+    F = front_objectives(residual_fn(X))
+    archive_x, archive_f = X[non_dominated_ranks(F) == 0], F[non_dominated_ranks(F) == 0]
+    nfev = pop_size
+
+    for _ in range(generations):
+        # DE/rand/1/bin offspring, one per parent
+        draw = rng.random((pop_size, pop_size))
+        np.fill_diagonal(draw, 2.0)  # never pick the parent itself
+        r = np.argpartition(draw, 2, axis=1)[:, :3]
+        mutant = X[r[:, 0]] + mutation * (X[r[:, 1]] - X[r[:, 2]])
+        cross = rng.random((pop_size, dim)) < crossover
+        cross[np.arange(pop_size), rng.integers(0, dim, pop_size)] = True
+        child = np.where(cross, mutant, X)
+        # Out-of-bounds coordinates are re-drawn between the parent and the violated bound
+        low, high = child < lo, child > hi
+        child[low] = (lo + rng.random((pop_size, dim)) * (X - lo))[low]
+        child[high] = (hi - rng.random((pop_size, dim)) * (hi - X))[high]
+
+        child_f = front_objectives(residual_fn(child))
+        nfev += pop_size
+
+        # Elitist (mu + lambda) survival on rank and crowding
+        X_all, F_all = np.vstack([X, child]), np.vstack([F, child_f])
+        keep = _select(F_all, pop_size)
+        X, F = X_all[keep], F_all[keep]
+
+        # Archive: non-dominated set of everything seen, thinned by crowding when over the cap.
+        # Archive members never dominate each other, so only pairs involving a child are tested.
+        new = ~dominance(child_f, child_f).any(axis=0)
+        new &= ~dominance(archive_f, child_f).any(axis=0)
+        old = ~dominance(child_f[new], archive_f).any(axis=0)
+        archive_x = np.vstack([archive_x[old], child[new]])
+        archive_f = np.vstack([archive_f[old], child_f[new]])
+        if len(archive_x) > archive_size:
+            keep = np.argsort(-crowding_distance(archive_f))[:archive_size]
+            archive_x, archive_f = archive_x[keep], archive_f[keep]
+
+    return {"x": archive_x, "f": archive_f, "nfev": nfev, "elapsed_sec": time.time() - t0}
+
+
+def front_sweep(residual_fn, front, bounds, deltas, polish=True):
+    """
+    Reads a Huber delta sweep off a Pareto front.
+
+    Args:
+        residual_fn: Same residual function the front was computed with.
+        front: Result of pareto_front().
+        bounds: Parameter bounds (for the polish step).
+        deltas: Huber thresholds; 0.0 selects Pure MAE.
+        polish: Refine each pick with the batched pattern search on its delta's loss.
+
+    Returns:
+        List of parameter vectors, one per delta.
+    """
+    optima = []
+    for delta in deltas:
+        loss_type = "huber" if delta > 0 else "mae"
+
+        def population_loss(pop, loss_type=loss_type, delta=delta):
+            return batch_loss(residual_fn(np.atleast_2d(pop)), loss_type, delta)
+
+        x = front["x"][int(np.argmin(population_loss(front["x"])))]
+        if polish:
+            x, _ = pattern_search(population_loss, x, bounds, mode="best", step=0.01)
+        optima.append(np.asarray(x))
+    return optima
+
+
+def print_front(front, max_rows=25):
+    """Markdown table of the front, sorted by MAE_T and thinned to at most max_rows rows."""
+    order = np.argsort(front["f"][:, 0])
+    rows = order[np.unique(np.linspace(0, len(order) - 1, min(max_rows, len(order))).astype(int))]
+    print(f"\n=== PARETO FRONT ({len(order)} non-dominated solutions, {front['nfev']} evaluations, "
+          f"{front['elapsed_sec']:.1f} s) ===")
+    print("| " + " | ".join(f"`{name}`" for name in OBJECTIVES) + " |")
+    print("| " + " | ".join(":---:" for _ in OBJECTIVES) + " |")
+    for i in rows:
+        print("| " + " | ".join(f"`{v:.2f}`" for v in front["f"][i]) + " |")
+
+
+if __name__ == "__main__":
+    import sweep_huber_delta_fine
+
+    sweep_huber_delta_fine.main(pareto_mode=True)
@@ -20,6 +20,9 @@ import re
 import numpy as np
 from scipy.optimize import differential_evolution
 
+from sweep_runner import run_sweep
+from method_c_batch import FeatureTable, make_columns, predict_rational_clamped, batch_loss
+
 def parse_and_correct_dataset():
     filepath = os.path.join(
         os.path.dirname(__file__),
@@ -82,41 +85,156 @@ def parse_and_correct_dataset():
 
     return list(devices.values())
 
-def huber_loss(error, delta):
-    abs_err = np.abs(error)
-    if delta == 0:
-        return abs_err
-    return np.where(abs_err <= delta, 0.5 * error**2, delta * abs_err - 0.5 * delta**2)
-
-def objective_function(params, dataset, delta):
+def predict_device(params, d):
+    """Per-device reference of the clamped rational model (checked by method_c_batch)."""
     eta_low, c0_single, c0_dual, k, p = params
     t_handshake = 0.5
     
-    total_loss = 0
-    for d in dataset:
-        e_supply = d['battery_wh']
-        p_peak = d['p_peak']
-        c_rate = p_peak / e_supply
-        arch = d['arch']
-        t_a = d['t_a']
-        
-        c0 = c0_dual if arch == 'dual' else c0_single
+    e_supply = d['battery_wh']
+    p_peak = d['p_peak']
+    c_rate = p_peak / e_supply
+    
+    c0 = c0_dual if d['arch'] == 'dual' else c0_single
+    
+    diff = max(0.0, c_rate - c0)
+    f_system = eta_low / (1.0 + k * (diff ** p))
+    f_system = min(1.0, max(0.01, f_system))
+    
+    p_effective = p_peak * f_system
+    return (e_supply / p_effective) * 60.0 + t_handshake
+
+def compile_dataset(dataset):
+    """Frozen feature table of the audited dataset, compiled once per calibration."""
+    return dataset if isinstance(dataset, FeatureTable) else make_columns(dataset, "recalibrated")
+
+def objective_function(params, table, delta, loss_type="huber"):
+    # Huber with delta = 0 is the MAE (robust_losses)
+    errors = predict_rational_clamped(table, params)["t_pred"] - table["T_A"]
+    return float(batch_loss(errors, loss_type, delta))
+
+# Search bounds with room for expansion
+SEARCH_BOUNDS = [
+    (0.50, 1.00),   # eta_low
+    (0.00, 15.00),  # c0_single
+    (0.00, 15.00),  # c0_dual
+    (0.00, 10.00),  # k
+    (0.01, 5.00)    # p
+]
+PARAM_NAMES = ["eta_low", "c0_single", "c0_dual", "k", "p"]
+
+def saturated_dims(p_val, bounds):
+    return [idx for idx, (val, (b_low, b_high)) in enumerate(zip(p_val, bounds))
+            if abs(val - b_low) < 1e-3 or abs(val - b_high) < 1e-3]
+
+def expand_bound(idx, b_low, b_high):
+    range_width = b_high - b_low
+    new_low = max(0.0, b_low - range_width * 0.5) if idx != 0 else max(0.5, b_low - 0.1)
+    new_high = b_high + range_width * 1.5
+    return (new_low, new_high)
+
+def calibrate_delta(task, bounds=None):
+    """
+    Restart mode: a fresh DE solve per expansion, up to 5 full solves.
+    Returns (p_val, hit_boundary, log) with one log entry per solve.
+    """
+    dataset, delta = task
+    table = compile_dataset(dataset)
+    current_bounds = list(bounds or SEARCH_BOUNDS)
+    log = []
+    
+    for attempt in range(5):
+        res = differential_evolution(
+            objective_function,
+            current_bounds,
+            args=(table, delta),
+            strategy='best1bin',
+            maxiter=4000,
+            popsize=40,
+            seed=42
+        )
         
-        diff = max(0.0, c_rate - c0)
-        f_system = eta_low / (1.0 + k * (diff ** p))
-        f_system = min(1.0, max(0.01, f_system))
+        p_val = res.x
+        dims = saturated_dims(p_val, current_bounds)
+        hit_boundary = bool(dims)
+        widened = {}
+        for idx in dims:
+            widened[PARAM_NAMES[idx]] = (current_bounds[idx], expand_bound(idx, *current_bounds[idx]))
+            current_bounds[idx] = widened[PARAM_NAMES[idx]][1]
+        log.append({"solve": attempt, "nfev": res.nfev, "widened": widened})
         
-        p_effective = p_peak * f_system
-        t_c = (e_supply / p_effective) * 60.0 + t_handshake
+        if not hit_boundary:
+            break
+
+    return p_val, hit_boundary, log
+
+def calibrate_delta_continued(task, bounds=None, max_expansions=4, maxiter=4000):
+    """
+    Population-seeded restart mode: on a boundary hit only the saturated dimensions are
+    widened, and a new DE solve (seed 42 + segment) starts from the final population of the
+    previous one instead of a fresh Latin hypercube. All segments share one maxiter budget
+    (one extended solve instead of up to 5 full ones). SciPy cannot resume a finished solve,
+    so only the population carries over, not the solver's random stream or iteration state.
+
+    The population has usually contracted against the old bound by then, so for each
+    widened dimension the worse half of the members re-draw that coordinate uniformly over
+    the new range; the better half and all other coordinates are kept as they are.
+    Returns (p_val, hit_boundary, log) with one log entry per solve segment.
+    """
+    dataset, delta = task
+    table = compile_dataset(dataset)
+    current_bounds = list(bounds or SEARCH_BOUNDS)
+    rng = np.random.default_rng(42)
+    init = 'latinhypercube'
+    iters_left = maxiter
+    log = []
+    
+    for segment in range(max_expansions + 1):
+        res = differential_evolution(
+            objective_function,
+            current_bounds,
+            args=(table, delta),
+            strategy='best1bin',
+            maxiter=iters_left,
+            popsize=40,
+            seed=42 + segment,
+            init=init
+        )
+        iters_left -= res.nit
         
-        error = t_c - t_a
-        total_loss += np.sum(huber_loss(error, delta))
+        p_val = res.x
+        dims = saturated_dims(p_val, current_bounds)
+        hit_boundary = bool(dims)
+        if not hit_boundary or segment == max_expansions or iters_left <= 0:
+            log.append({"solve": segment, "nfev": res.nfev, "widened": {}})
+            break
         
-    return total_loss / len(dataset)
+        population = res.population.copy()
+        worse = np.argsort(res.population_energies)[len(population) // 2:]
+        widened = {}
+        for idx in dims:
+            widened[PARAM_NAMES[idx]] = (current_bounds[idx], expand_bound(idx, *current_bounds[idx]))
+            current_bounds[idx] = widened[PARAM_NAMES[idx]][1]
+            population[worse, idx] = rng.uniform(*current_bounds[idx], size=len(worse))
+        log.append({"solve": segment, "nfev": res.nfev, "widened": widened})
+        init = population
+
+    return p_val, hit_boundary, log
 
-def run_corrected_sweep():
+def print_expansion_log(delta_values, calibrations):
+    print("\n--- BOUND EXPANSION LOG ---")
+    for delta, (_, _, log) in zip(delta_values, calibrations):
+        total = sum(entry["nfev"] for entry in log)
+        print(f"delta = {delta:<5.1f}: {len(log)} solve segment(s), {total} loss evaluations")
+        for entry in log:
+            for name, ((lo0, hi0), (lo1, hi1)) in entry["widened"].items():
+                print(f"    after segment {entry['solve']} ({entry['nfev']} evals): "
+                      f"{name} [{lo0:.3f}, {hi0:.3f}] -> [{lo1:.3f}, {hi1:.3f}]")
+
+def run_corrected_sweep(workers=None, expansion="restart"):
+    # expansion: "restart" (fresh DE per widening, calibrate_delta) or "continue"
+    # (population-seeded restart within one budget, calibrate_delta_continued)
     dataset = parse_and_correct_dataset()
-    print(f"Loaded {len(dataset)} verified devices.")
+    print(f"Loaded {len(dataset)} verified devices (bound expansion: {expansion}).")
     
     max_c_rate = max(d['p_peak'] / d['battery_wh'] for d in dataset)
     print(f"Max C_rate in dataset: {max_c_rate:.2f} h^-1")
@@ -127,59 +245,13 @@ def run_corrected_sweep():
     print(f"{'Delta':<8} | {'eta_low':<8} | {'C0_sing':<8} | {'C0_dual':<8} | {'k':<8} | {'p':<8} | {'MAE_T':<8} | {'RMSE_T':<8} | {'Max_Err':<8} | {'Boundary Status':<15}")
     print("-" * 115)
     
+    calibrate = {"restart": calibrate_delta, "continue": calibrate_delta_continued}[expansion]
+    calibrations = run_sweep(calibrate, [(dataset, delta) for delta in delta_values], workers)
+
+    table = compile_dataset(dataset)
     results = []
-    for delta in delta_values:
-        # Search bounds with room for expansion
-        current_bounds = [
-            (0.50, 1.00),   # eta_low
-            (0.00, 15.00),  # c0_single
-            (0.00, 15.00),  # c0_dual
-            (0.00, 10.00),  # k
-            (0.01, 5.00)    # p
-        ]
-        
-        for attempt in range(5):
-            res = differential_evolution(
-                objective_function,
-                current_bounds,
-                args=(dataset, delta),
-                strategy='best1bin',
-                maxiter=4000,
-                popsize=40,
-                seed=42
-            )
-            
-            p_val = res.x
-            hit_boundary = False
-            
-            for idx, (val, (b_low, b_high)) in enumerate(zip(p_val, current_bounds)):
-                if abs(val - b_low) < 1e-3 or abs(val - b_high) < 1e-3:
-                    hit_boundary = True
-                    range_width = b_high - b_low
-                    new_low = max(0.0, b_low - range_width * 0.5) if idx != 0 else max(0.5, b_low - 0.1)
-                    new_high = b_high + range_width * 1.5
-                    current_bounds[idx] = (new_low, new_high)
-            
-            if not hit_boundary:
-                break
-                
-        errors = []
-        for d in dataset:
-            e_supply = d['battery_wh']
-            p_peak = d['p_peak']
-            c_rate = p_peak / e_supply
-            arch = d['arch']
-            t_a = d['t_a']
-            
-            c0 = p_val[2] if arch == 'dual' else p_val[1]
-            diff = max(0.0, c_rate - c0)
-            f_system = p_val[0] / (1.0 + p_val[3] * (diff ** p_val[4]))
-            f_system = min(1.0, max(0.01, f_system))
-            p_effective = p_peak * f_system
-            t_c = (e_supply / p_effective) * 60.0 + 0.5
-            errors.append(t_c - t_a)
-            
-        errors = np.array(errors)
+    for delta, (p_val, hit_boundary, _) in zip(delta_values, calibrations):
+        errors = predict_rational_clamped(table, p_val)["t_pred"] - table["T_A"]
         mae = np.mean(np.abs(errors))
         rmse = np.sqrt(np.mean(errors**2))
         max_err = np.max(np.abs(errors))
@@ -189,8 +261,15 @@ def run_corrected_sweep():
         print(f"{delta:<8.1f} | {p_val[0]:<8.4f} | {p_val[1]:<8.4f} | {p_val[2]:<8.4f} | {p_val[3]:<8.4f} | {p_val[4]:<8.4f} | {mae:<8.2f} | {rmse:<8.2f} | {max_err:<8.2f} | {b_status:<15}")
         
         results.append((delta, p_val, mae, rmse, max_err, errors))
+    
+    if any(entry["widened"] for _, _, log in calibrations for entry in log):
+        print_expansion_log(delta_values, calibrations)
         
     return dataset, results
 
+def main(workers=None, expansion="continue"):
+    # Deltas that never reach a bound solve identically in both expansion modes
+    return run_corrected_sweep(workers, expansion)
+
 if __name__ == "__main__":
-    run_corrected_sweep()
+    main()
@@ -0,0 +1,154 @@
+"""
+Calibration Result Cache
+------------------------
+Content-addressed store for calibration results. Every entry is keyed by the SHA-256 of a
+canonical JSON encoding of everything that determines the result:
+
+    model tag, device dataset, bounds, loss type, delta, formulation, optimizer settings, seed,
+    code version
+
+and stored as one JSON file, <cache_dir>/<key>.json. A repeated request loads the stored
+parameters and metrics instead of re-solving; changing any single input produces a new key,
+so only the affected entries are recomputed while all others keep hitting.
+
+The code version is a hash of the source of the functions that compute the result: the
+callables the caller passes as `code` (its predictor, loss function and metrics) plus the
+robust_losses path that evaluates `loss_type`. Editing one of them re-keys only the entries
+that use it; edits elsewhere in a script or in other predictors / losses keep every key.
+
+The cache directory is anchored to this file (working_files/scratch/result_cache), so every
+script shares one cache whatever the working directory. Scripts that only publish results
+(document updaters) use require(), which raises on a miss instead of re-solving.
+
+Usage:
+    inputs = cache_inputs("exponential_11p", BENCHMARK_DEVICES, PARAM_BOUNDS,
+                          loss_type="huber", delta=10.0, settings=DE_SETTINGS, seed=42,
+                          code=[loss_evaluator_population, predict_exponential_11p])
+    result = cached(inputs, lambda: run_opt("huber", 10.0, 42))   # solves on a miss
+    result = require(inputs)                                      # raises LookupError on a miss
+"""
+
+import hashlib
+import inspect
+import json
+import os
+
+import numpy as np
+
+import robust_losses
+
+WORKING_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(WORKING_DIR, "scratch", "result_cache")
+# Loss evaluation shared by every loss type (method_c_batch.batch_loss -> robust_losses)
+LOSS_PATH = [robust_losses._lookup, robust_losses.loss_value, robust_losses.mean_loss]
+
+
+def _canonical(obj):
+    """Reduces inputs to JSON-stable primitives (tuples -> lists, NumPy -> Python)."""
+    if isinstance(obj, dict):
+        return {str(k): _canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_canonical(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return _canonical(obj.tolist())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, float):
+        return float(repr(obj)) if np.isfinite(obj) else repr(obj)
+    return obj
+
+
+def loss_sources(loss_type, delta=None):
+    """The robust_losses callables that evaluate loss_type (huber with delta 0 is mae)."""
+    if loss_type == "huber" and delta == 0:
+        loss_type = "mae"
+    return LOSS_PATH + list(robust_losses._LOSSES.get(loss_type, ()))
+
+
+def code_version(code=()):
+    """SHA-256 (16 hex digits) of the source text of the given functions, in order."""
+    digest = hashlib.sha256()
+    for fn in code:
+        digest.update(inspect.getsource(fn).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def cache_inputs(model, dataset, bounds, loss_type, delta=None, formulation=None, settings=None, seed=None,
+                 code=()):
+    """
+    Bundles the inputs that determine one calibration result.
+    delta is dropped for non-Huber losses, where it does not affect the result.
+    code: the functions that compute the result (the caller's predictor, loss and metrics);
+    the robust_losses path of loss_type is added to them.
+    """
+    return {
+        "model": model,
+        "dataset": dataset,
+        "bounds": bounds,
+        "loss_type": loss_type,
+        "delta": delta if loss_type == "huber" else None,
+        "formulation": formulation,
+        "settings": settings or {},
+        "seed": seed,
+        "code_version": code_version(list(code) + loss_sources(loss_type, delta)),
+    }
+
+
+def cache_key(inputs):
+    """SHA-256 hex digest of the canonical JSON encoding of the inputs."""
+    blob = json.dumps(_canonical(inputs), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def load(inputs, cache_dir=DEFAULT_CACHE_DIR):
+    """Returns the stored result for these inputs, or None on a miss."""
+    path = os.path.join(cache_dir, cache_key(inputs) + ".json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)["result"]
+
+
+def require(inputs, cache_dir=DEFAULT_CACHE_DIR):
+    """Returns the stored result for these inputs; raises LookupError on a miss (never solves)."""
+    result = load(inputs, cache_dir)
+    if result is None:
+        raise LookupError(
+            f"No cached result for model {inputs['model']!r}, loss {inputs['loss_type']!r}, "
+            f"delta {inputs['delta']}, seed {inputs['seed']} (key {cache_key(inputs)[:12]} in {cache_dir}); "
+            f"run the calibration script that solves it first"
+        )
+    return result
+
+
+def store(inputs, result, cache_dir=DEFAULT_CACHE_DIR):
+    """Writes a result atomically (temp file + rename), so parallel workers never see partial entries."""
+    os.makedirs(cache_dir, exist_ok=True)
+    key = cache_key(inputs)
+    path = os.path.join(cache_dir, key + ".json")
+    tmp = f"{path}.{os.getpid()}.tmp"
+    summary = {k: v for k, v in _canonical(inputs).items() if k != "dataset"}
+    summary["dataset_size"] = len(inputs["dataset"])
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "inputs": summary, "result": _canonical(result)}, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def cached(inputs, solve, cache_dir=DEFAULT_CACHE_DIR, refresh=False):
+    """
+    Returns the cached result for `inputs`, or runs solve() and stores its result.
+
+    Args:
+        inputs: Dict from cache_inputs().
+        solve: Zero-argument function producing a JSON-serializable result.
+        cache_dir: Cache directory.
+        refresh: Re-solve and overwrite even on a hit.
+    """
+    if not refresh:
+        result = load(inputs, cache_dir)
+        if result is not None:
+            return result
+    result = _canonical(solve())
+    store(inputs, result, cache_dir)
+    return result
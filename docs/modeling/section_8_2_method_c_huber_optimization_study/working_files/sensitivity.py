@@ -0,0 +1,177 @@
+"""
+Global Sensitivity Analysis (Sobol Indices) of the Method C Charging Models
+---------------------------------------------------------------------------
+Saltelli-design Sobol indices of the batch predictors over their parameter bounds:
+which of the calibrated constants actually move the predictions, alone (first order, S1)
+and including all their interactions (total order, ST).
+
+Design: a scrambled Sobol sequence in 2d dimensions gives the base matrices A and B
+(N x d each); AB_i is A with column i taken from B. The model is evaluated on A, B and
+every AB_i, i.e. N (d + 2) parameter points x all devices, with the estimators
+
+    S1_i = mean(f(B) (f(AB_i) - f(A))) / V        (Saltelli 2010)
+    ST_i = mean((f(A) - f(AB_i))^2) / (2 V)       (Jansen 1999)
+
+where V is the variance of f over A and B. Outputs are every device's T_C and Strategy 2
+score S_C, and the dataset-level MAE_T and MAE_S. Per-device indices are aggregated
+over devices weighted by their output variance.
+
+The design is consumed in chunks of base points: each chunk returns only running sums
+(count, mean, M2 and the two estimator numerators), so memory is bounded by the chunk
+size regardless of N, and chunks run in parallel across the sweep_runner process pool.
+Parameters with lo == hi (e.g. the fixed handshake of the 12-parameter model) are held
+at that value and reported with zero indices.
+
+Usage:
+    python sensitivity.py    (11- and 12-parameter models, 2^15 base points each:
+                              425,984 / 425,984 evaluations)
+"""
+
+import sys
+import time
+from functools import partial
+
+import numpy as np
+from scipy.stats import qmc
+
+from method_c_batch import (ALTERNATE_STUDY_DIR, make_columns, predict_exponential_11p, predict_efficiency_12p,
+                            map_score, actual_scores)
+from sweep_runner import run_sweep
+
+
+def _outputs(predict, cols, pop, s_a):
+    """(S, 2N + 2) outputs of a population: T_C per device, S_C per device, MAE_T, MAE_S."""
+    t_c = predict(cols, pop)["t_pred"]
+    s_c = map_score(t_c)
+    mae_t = np.mean(np.abs(cols["T_A"] - t_c), axis=1, keepdims=True)
+    mae_s = np.mean(np.abs(s_a - s_c), axis=1, keepdims=True)
+    return np.hstack([t_c, s_c, mae_t, mae_s])
+
+
+def _design_chunk(task):
+    """Evaluates base points [start, start + count) of the design and returns their sums."""
+    predict, cols, bounds, start, count, seed = task
+    lo, hi = np.array(bounds, dtype=float).T
+    free = np.flatnonzero(lo < hi)
+    d = len(free)
+    s_a = actual_scores(cols)
+
+    sampler = qmc.Sobol(2 * d, scramble=True, seed=seed)
+    if start:
+        sampler.fast_forward(start)
+    u = sampler.random(count)
+    A = np.tile(lo, (count, 1))
+    B = A.copy()
+    A[:, free] = qmc.scale(u[:, :d], lo[free], hi[free])
+    B[:, free] = qmc.scale(u[:, d:], lo[free], hi[free])
+
+    f_a = _outputs(predict, cols, A, s_a)
+    f_b = _outputs(predict, cols, B, s_a)
+    first = np.zeros((len(lo), f_a.shape[1]))
+    total = np.zeros((len(lo), f_a.shape[1]))
+    for i in free:
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        f_ab = _outputs(predict, cols, AB, s_a)
+        first[i] = np.sum(f_b * (f_ab - f_a), axis=0)
+        total[i] = np.sum((f_a - f_ab) ** 2, axis=0)
+
+    both = np.vstack([f_a, f_b])
+    mean = both.mean(axis=0)
+    return len(both), mean, np.sum((both - mean) ** 2, axis=0), first, total
+
+
+def _merge(chunks):
+    """Combines chunk sums (Chan et al. parallel variance) into (n_base, variance, first, total)."""
+    n, mean, m2 = 0, 0.0, 0.0
+    for count, c_mean, c_m2, _, _ in chunks:
+        delta = c_mean - mean
+        mean = mean + delta * count / (n + count)
+        m2 = m2 + c_m2 + delta ** 2 * n * count / (n + count)
+        n += count
+    first = sum(c[3] for c in chunks)
+    total = sum(c[4] for c in chunks)
+    return n // 2, m2 / n, first, total
+
+
+def sobol_indices(predict, cols, bounds, n_base=2 ** 15, chunk_size=2 ** 12, seed=42, workers=None):
+    """
+    First- and total-order Sobol indices of one batch predictor.
+
+    Args:
+        predict: Batch predictor f(cols, (S, P) population) (method_c_batch), picklable.
+        cols: Column table of the dataset (make_columns).
+        bounds: Parameter bounds; the sampling box of the analysis.
+        n_base: Base points N (power of two); the model is evaluated N (d + 2) times.
+        chunk_size: Base points per pool task (power of two, divides n_base).
+        seed: Seed of the scrambled Sobol sequence.
+        workers: Process count (see sweep_runner.run_sweep).
+
+    Returns:
+        Dict with "S1" / "ST" per output ("T_C" and "S_C" as (P, N) per-device arrays,
+        "MAE_T" and "MAE_S" as (P,) arrays), the variance-weighted device aggregates
+        "T_C_agg" / "S_C_agg", the output variances, evaluation count and wall time.
+    """
+    chunk_size = min(chunk_size, n_base)
+    tasks = [(predict, cols, bounds, start, chunk_size, seed) for start in range(0, n_base, chunk_size)]
+    t0 = time.time()
+    n, var, first, total = _merge(run_sweep(_design_chunk, tasks, workers))
+    elapsed = time.time() - t0
+
+    safe_var = np.where(var > 0, var, np.inf)
+    S1, ST = first / n / safe_var, total / (2 * n) / safe_var
+    n_dev = len(cols["T_A"])
+    d = sum(lo < hi for lo, hi in bounds)
+
+    def split(S):
+        return {"T_C": S[:, :n_dev], "S_C": S[:, n_dev:2 * n_dev], "MAE_T": S[:, -2], "MAE_S": S[:, -1]}
+
+    def aggregate(S, v):
+        return S @ v / np.sum(v)
+
+    S1, ST = split(S1), split(ST)
+    for key, sl in [("T_C", slice(0, n_dev)), ("S_C", slice(n_dev, 2 * n_dev))]:
+        S1[key + "_agg"] = aggregate(S1[key], var[sl])
+        ST[key + "_agg"] = aggregate(ST[key], var[sl])
+    return {"S1": S1, "ST": ST, "variance": var, "n_base": n, "nfev": n * (d + 2), "elapsed_sec": elapsed}
+
+
+def print_report(title, names, report):
+    print(f"\n=== SOBOL INDICES: {title} ({report['n_base']} base points, {report['nfev']} evaluations, "
+          f"{report['elapsed_sec']:.1f} s) ===")
+    print("| Parameter         | S1 MAE_T | ST MAE_T | S1 MAE_S | ST MAE_S | S1 T_C  | ST T_C  | S1 S_C  | ST S_C  |")
+    print("| :---------------- | :------: | :------: | :------: | :------: | :-----: | :-----: | :-----: | :-----: |")
+    S1, ST = report["S1"], report["ST"]
+    cols = [(S1["MAE_T"], ST["MAE_T"]), (S1["MAE_S"], ST["MAE_S"]), (S1["T_C_agg"], ST["T_C_agg"]),
+            (S1["S_C_agg"], ST["S_C_agg"])]
+    order = np.argsort(-ST["MAE_T"])
+    for j in order:
+        cells = " | ".join(f"{s1[j]:>8.4f} | {st[j]:>8.4f}" if k < 2 else f"{s1[j]:>7.4f} | {st[j]:>7.4f}"
+                           for k, (s1, st) in enumerate(cols))
+        print(f"| {'`' + names[j] + '`':<17} | {cells} |")
+    sums = " | ".join(f"{np.sum(s1):>8.4f} | {'':>8}" if k < 2 else f"{np.sum(s1):>7.4f} | {'':>7}"
+                      for k, (s1, _) in enumerate(cols))
+    print(f"| {'Sum S1':<17} | {sums} |")
+    print("\nT_C / S_C columns: per-device indices averaged over devices, weighted by output variance. "
+          "Sum S1 < 1 measures the share of variance from interactions.")
+
+
+def main(n_base=2 ** 15, workers=None):
+    sys.path.insert(0, ALTERNATE_STUDY_DIR)
+    from benchmark_devices import BENCHMARK_DEVICES
+    from run_clean_11param_optimization import PARAM_BOUNDS, PARAM_NAMES
+    from optimize_method_c import BENCHMARK_COLUMNS
+    from sync_all_study_data import PARAM_BOUNDS_LOSS, PARAM_KEYS_LOSS
+
+    # 1. 11-parameter stretched exponential (run_clean_11param_optimization)
+    cols = make_columns(BENCHMARK_DEVICES, "benchmark")
+    report = sobol_indices(predict_exponential_11p, cols, PARAM_BOUNDS, n_base=n_base, workers=workers)
+    print_report("11-PARAMETER STRETCHED EXPONENTIAL OVER PARAM_BOUNDS", PARAM_NAMES, report)
+
+    # 2. 12-parameter efficiency model (sync_all_study_data, exponential decay, fixed handshake)
+    report = sobol_indices(partial(predict_efficiency_12p, formulation="exponential"), BENCHMARK_COLUMNS,
+                           PARAM_BOUNDS_LOSS, n_base=n_base, workers=workers)
+    print_report("12-PARAMETER EFFICIENCY MODEL OVER PARAM_BOUNDS_LOSS", PARAM_KEYS_LOSS, report)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,11 @@ import numpy as np
 from scipy.optimize import differential_evolution
 import sys
 
+from sweep_runner import run_sweep, run_continuation, print_continuation_report, warm_population
+from method_c_batch import make_columns, predict_rational, jacobian_rational, batch_loss
+from irls import irls_multistart, de_seeds
+import pareto
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 devices = [
@@ -99,55 +104,104 @@ bounds = [
 
 deltas = [0.0, 0.5, 1.0, 2.5, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 50.0, 100.0]
 
-print("=== HUBER LOSS THRESHOLD (delta) FINE SENSITIVITY SWEEP ===")
-print("| Huber Threshold (`delta`) | eta_low  | C0_single (h^-1) | C0_dual (h^-1) | `k`      | `p`      | `MAE_T` (mins) | `RMSE_T` (mins) | Max Error (mins) | Boundary Status |")
-print("| :-----------------------: | :------: | :--------------: | :------------: | :------: | :------: | :------------: | :-------------: | :--------------: | :-------------: |")
+# Compiled once: the loss functions below read only this frozen feature table
+# (predict_charging_time stays as the per-device reference, see method_c_batch)
+device_cols = make_columns(devices, "sweep")
 
-for delta in deltas:
-    def loss_func(params):
-        eta_low, C0_single_base, C0_dual_base, k, p = params
-        errors = []
-        for d in devices:
-            T_pred = predict_charging_time(d, eta_low, C0_single_base, C0_dual_base, k, p)
-            err = d["T_A"] - T_pred
-            errors.append(err)
-        errors = np.array(errors)
-        abs_err = np.abs(errors)
-        
-        if delta == 0.0:
-            loss = abs_err
-        else:
-            loss = np.where(abs_err <= delta, 0.5 * (errors ** 2), delta * abs_err - 0.5 * (delta ** 2))
-        return np.mean(loss)
-
-    res = differential_evolution(loss_func, bounds, seed=42, popsize=20, maxiter=800)
-    eta_low_opt, C0_single_opt, C0_dual_opt, k_opt, p_opt = res.x
+def loss_func(params, delta, loss_type="huber"):
+    errors = predict_rational(device_cols, params)["t_pred"] - device_cols["T_A"]
+    # Huber with delta = 0.0 is Pure MAE (robust_losses convention)
+    return batch_loss(errors, loss_type, delta)
+
+def solve_delta(delta):
+    return solve_delta_from(delta)[0]
+
+WARM_POPSIZE = 5  # population multiplier of a warm start (cold: 20)
+
+def solve_delta_from(delta, x0=None):
+    # Warm start: a smaller population initialised around the neighbouring optimum, which no
+    # longer has to cover the whole box (run_continuation checks it against the cold solve)
+    if x0 is None:
+        popsize, init = 20, 'latinhypercube'
+    else:
+        popsize, init = WARM_POPSIZE, warm_population(x0, bounds, WARM_POPSIZE * len(bounds), seed=42)
+    res = differential_evolution(loss_func, bounds, args=(delta,), seed=42, popsize=popsize, maxiter=800, init=init)
+    return res.x, res.fun, res.nfev
+
+def population_residuals(population):
+    return predict_rational(device_cols, population)["t_pred"] - device_cols["T_A"]
+
+def residual_jacobian(params):
+    return jacobian_rational(device_cols, params)
+
+def solve_irls(delta):
+    return solve_irls_from(delta)[0]
+
+def solve_irls_from(delta, x0=None):
+    # IRLS from the best members of a short DE run (cold) or from the neighbouring optimum (warm)
+    loss_type = "huber" if delta > 0 else "mae"
+    if x0 is None:
+        seeds, seed_nfev = de_seeds(lambda pop: batch_loss(population_residuals(pop), loss_type, delta), bounds)
+    else:
+        seeds, seed_nfev = [x0], 0
+    res = irls_multistart(population_residuals, residual_jacobian, seeds, bounds, loss_type, delta)
+    return res.x, res.fun, res.nfev + seed_nfev
+
+def main(workers=None, continuation=False, pareto_mode=False, irls_mode=False, check="all"):
+    # pareto_mode: one multi-objective run replaces the per-delta DE solves (see pareto.py)
+    # irls_mode: DE-seeded IRLS (see irls.py) replaces the full DE solve of each delta
+    # check: cold-start references for continuation mode ("all" by default; "sample" / "none" opt in
+    #        to fewer reference solves, see sweep_runner)
+    if pareto_mode:
+        front = pareto.pareto_front(population_residuals, bounds)
+        optima = pareto.front_sweep(population_residuals, front, bounds, deltas)
+        pareto.print_front(front)
+        print()
+    elif continuation:
+        steps = run_continuation(solve_irls_from if irls_mode else solve_delta_from, deltas, bounds,
+                                 workers=workers, check=check)
+        optima = [s["x"] for s in steps]
+    else:
+        optima = run_sweep(solve_irls if irls_mode else solve_delta, deltas, workers)
+
+    print("=== HUBER LOSS THRESHOLD (delta) FINE SENSITIVITY SWEEP ===")
+    print("| Huber Threshold (`delta`) | eta_low  | C0_single (h^-1) | C0_dual (h^-1) | `k`      | `p`      | `MAE_T` (mins) | `RMSE_T` (mins) | Max Error (mins) | Boundary Status |")
+    print("| :-----------------------: | :------: | :--------------: | :------------: | :------: | :------: | :------------: | :-------------: | :--------------: | :-------------: |")
+
+    for delta, x_opt in zip(deltas, optima):
+        eta_low_opt, C0_single_opt, C0_dual_opt, k_opt, p_opt = x_opt
     
-    # Eval errors
-    maes = []
-    sq_errs = []
-    for d in devices:
-        tp = predict_charging_time(d, eta_low_opt, C0_single_opt, C0_dual_opt, k_opt, p_opt)
-        e = abs(tp - d["T_A"])
-        maes.append(e)
-        sq_errs.append(e ** 2)
+        # Eval errors
+        maes = []
+        sq_errs = []
+        for d in devices:
+            tp = predict_charging_time(d, eta_low_opt, C0_single_opt, C0_dual_opt, k_opt, p_opt)
+            e = abs(tp - d["T_A"])
+            maes.append(e)
+            sq_errs.append(e ** 2)
     
-    mae_val = np.mean(maes)
-    rmse_val = np.sqrt(np.mean(sq_errs))
-    max_err_val = np.max(maes)
+        mae_val = np.mean(maes)
+        rmse_val = np.sqrt(np.mean(sq_errs))
+        max_err_val = np.max(maes)
     
-    # Boundary check
-    is_interior = (
-        0.8501 < eta_low_opt < 0.9899 and
-        0.1001 < C0_single_opt < 1.999 and
-        1.0001 < C0_dual_opt < 7.999 and
-        0.1001 < k_opt < 4.999 and
-        0.0501 < p_opt < 1.499
-    )
-    status = "OK (Interior)" if is_interior else "Boundary"
+        # Boundary check
+        is_interior = (
+            0.8501 < eta_low_opt < 0.9899 and
+            0.1001 < C0_single_opt < 1.999 and
+            1.0001 < C0_dual_opt < 7.999 and
+            0.1001 < k_opt < 4.999 and
+            0.0501 < p_opt < 1.499
+        )
+        status = "OK (Interior)" if is_interior else "Boundary"
     
-    label = f"**`{delta:.1f}`**" if delta > 0 else "**`0.0` (Pure MAE)**"
-    if delta == 100.0: label = "**`100.0` (MSE-like)**"
+        label = f"**`{delta:.1f}`**" if delta > 0 else "**`0.0` (Pure MAE)**"
+        if delta == 100.0: label = "**`100.0` (MSE-like)**"
     
-    print(f"| {label:25s} | `{eta_low_opt:.4f}` | `{C0_single_opt:.4f}`         | `{C0_dual_opt:.4f}`       | `{k_opt:.4f}` | `{p_opt:.4f}` | **`{mae_val:.2f}`**     | `{rmse_val:.2f}`         | `{max_err_val:.2f}`          | {status:15s} |")
+        print(f"| {label:25s} | `{eta_low_opt:.4f}` | `{C0_single_opt:.4f}`         | `{C0_dual_opt:.4f}`       | `{k_opt:.4f}` | `{p_opt:.4f}` | **`{mae_val:.2f}`**     | `{rmse_val:.2f}`         | `{max_err_val:.2f}`          | {status:15s} |")
+
+    if continuation:
+        print_continuation_report(steps)
+
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Parallel Sweep Runner
+---------------------
+Fans independent calibration tasks (one Huber delta, loss type or formulation per task)
+across a process pool sized to the machine and returns the results in input order.
+
+Every task carries its own seed, so a parallel sweep reproduces the serial sweep exactly;
+callers keep printing their Markdown / text tables from the ordered results, which keeps
+the console output byte-identical to the serial scripts.
+
+The solve function must be defined at module level so it can be sent to worker
+processes, and the calling script must keep its `if __name__ == "__main__":` guard
+(worker processes re-import it on Windows).
+
+Continuation mode (run_continuation) walks the deltas in order instead and seeds each
+solve with the previous optimum. By default (check="all") every delta is also solved cold,
+so each step records the cold nfev its savings are measured against and is checked for a
+warm-started optimum that drifted away from the cold-start one. check="sample" / "none" are
+explicit opt-ins that skip most of those reference solves and report only what they cover.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+
+def default_workers(num_tasks):
+    """Pool size: one process per core, never more processes than tasks."""
+    return max(1, min(num_tasks, os.cpu_count() or 1))
+
+
+def run_sweep(solve, tasks, workers=None):
+    """
+    Runs solve(task) for every task and returns the results in the order of `tasks`.
+
+    Args:
+        solve: Module-level function taking one task and returning a picklable result.
+        tasks: Iterable of picklable task descriptions (e.g. (loss_type, delta, seed) tuples).
+        workers: Process count. None sizes the pool to the cores; 1 runs serially in-process.
+
+    Returns:
+        List of results, result[i] belonging to tasks[i].
+    """
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    workers = default_workers(len(tasks)) if workers is None else max(1, min(workers, len(tasks)))
+
+    if workers == 1:
+        return [solve(task) for task in tasks]
+
+    # chunksize=1: each task is a full optimization, so load balancing beats batching
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(solve, tasks, chunksize=1))
+
+
+def warm_population(x0, bounds, size, spread=0.05, seed=None):
+    """
+    DE initial population clustered around a previous optimum.
+
+    Row 0 is x0 itself; the other rows scatter it by `spread` x bound width
+    (Gaussian), clipped into the bounds. Pass the result as differential_evolution(init=...).
+    """
+    lo, hi = np.array(bounds, dtype=float).T
+    rng = np.random.default_rng(seed)
+    pop = np.asarray(x0, dtype=float) + rng.normal(0.0, spread, (size, len(lo))) * (hi - lo)
+    pop[0] = x0
+    return np.clip(pop, lo, hi)
+
+
+def _check_indices(n, check, samples):
+    """Deltas solved cold as a drift reference; index 0 is always cold (it starts the walk)."""
+    if check == "all":
+        return list(range(n))
+    if check == "sample":
+        return sorted(set(np.linspace(0, n - 1, min(n, samples + 1)).round().astype(int).tolist()))
+    if check == "none":
+        return [0] if n else []
+    raise ValueError(f"check must be 'none', 'sample' or 'all', got {check!r}")
+
+
+def run_continuation(solve, deltas, bounds, tol=1e-3, workers=None, check="all", samples=2):
+    """
+    Warm-started delta sweep, optionally checked against cold-start solves.
+
+    Args:
+        solve: Module-level function solve(delta, x0=None) -> (x, fun, nfev).
+               x0=None must give the usual cold-start solve.
+        deltas: Deltas in sweep order (neighbours should have neighbouring optima).
+        bounds: Parameter bounds, used to scale the drift.
+        tol: Largest accepted drift, max |x_warm - x_cold| / bound width.
+        workers: Process count for the cold reference solves (see run_sweep).
+        check: Which deltas get a cold reference solve: "all" (default; every step reports
+               its savings and drift, at the cost of the full cold sweep on top of the walk),
+               or the opt-ins "sample" (`samples` evenly spaced deltas, always including the
+               last) and "none" (only the first delta, which is the cold solve the walk
+               starts from). Unchecked steps report neither savings nor drift.
+
+    Returns:
+        List of per-delta dicts: delta, x, fun, nfev, checked, tol, cold_x, cold_fun, cold_nfev,
+        saved (cold_nfev - nfev), drift, flagged. x is the warm-started optimum; the cold_*,
+        saved and drift entries are None for deltas without a cold reference.
+    """
+    deltas = list(deltas)
+    checked = _check_indices(len(deltas), check, samples)
+    cold = dict(zip(checked, run_sweep(partial(solve, x0=None), [deltas[i] for i in checked], workers)))
+    width = np.ptp(np.array(bounds, dtype=float), axis=1)
+
+    steps = []
+    x_prev = None
+    for i, delta in enumerate(deltas):
+        if x_prev is None:
+            # Nothing to continue from: the first delta is the cold solve
+            x, fun, nfev = cold[i]
+        else:
+            x, fun, nfev = solve(delta, x0=x_prev)
+        step = {"delta": delta, "x": x, "fun": fun, "nfev": nfev, "checked": i in cold, "tol": tol,
+                "cold_x": None, "cold_fun": None, "cold_nfev": None, "saved": None, "drift": None,
+                "flagged": False}
+        if i in cold:
+            cold_x, cold_fun, cold_nfev = cold[i]
+            drift = float(np.max(np.abs(np.asarray(x) - np.asarray(cold_x)) / width))
+            step.update(cold_x=cold_x, cold_fun=cold_fun, cold_nfev=cold_nfev, saved=cold_nfev - nfev,
+                        drift=drift, flagged=drift > tol)
+        steps.append(step)
+        x_prev = x
+    return steps
+
+
+def print_continuation_report(steps):
+    """Prints the evaluations saved per checked delta and warns about drifted optima."""
+    print("\n=== WARM-STARTED CONTINUATION vs COLD START ===")
+    print("| delta  | Cold nfev | Warm nfev | Saved  | Cold Loss    | Warm Loss    | Drift (x / width) |")
+    print("| :----: | :-------: | :-------: | :----: | :----------: | :----------: | :---------------: |")
+    for s in steps:
+        if not s["checked"]:
+            print(f"| {s['delta']:6.1f} | {'-':>9s} | {s['nfev']:9d} | {'-':>6s} | {'-':>12s} | "
+                  f"{s['fun']:12.6f} | {'-':>13s}     |")
+            continue
+        mark = " (!)" if s["flagged"] else ""
+        print(f"| {s['delta']:6.1f} | {s['cold_nfev']:9d} | {s['nfev']:9d} | {s['saved']:6d} | "
+              f"{s['cold_fun']:12.6f} | {s['fun']:12.6f} | {s['drift']:13.2e}{mark:4s} |")
+
+    # Savings over the deltas that have a cold reference (the first delta saves nothing)
+    checked = [s for s in steps if s["checked"]]
+    total_cold = sum(s["cold_nfev"] for s in checked)
+    total_warm = sum(s["nfev"] for s in checked)
+    print(f"\nLoss evaluations over {len(checked)} checked deltas: cold {total_cold}, warm {total_warm} "
+          f"(saved {total_cold - total_warm}, {100.0 * (total_cold - total_warm) / max(total_cold, 1):.1f}%); "
+          f"warm walk total {sum(s['nfev'] for s in steps)}")
+
+    flagged = [s for s in steps if s["flagged"]]
+    if flagged:
+        for s in flagged:
+            print(f"WARNING: delta = {s['delta']:.1f} warm-started optimum differs from the cold start "
+                  f"(drift {s['drift']:.2e} > tol {s['tol']:.0e}; loss warm {s['fun']:.6f} vs cold {s['cold_fun']:.6f})")
+    elif len(checked) > 1:
+        print(f"All {len(checked) - 1} checked warm-started optima within tol {checked[0]['tol']:.0e} "
+              f"of the cold-start optima.")
+    else:
+        print("No warm-started delta was checked against a cold start (check='none').")
@@ -1,7 +1,14 @@
+import os
+import sys
+
 import numpy as np
-from scipy.optimize import least_squares
+from thermal_jacobian import residuals_jacobian
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                "section_8_2_method_c_huber_optimization_study", "working_files"))
+from irls import irls
+
 data = [
     {'name': 'Xiaomi 14 Ultra', 'cap': 5000, 'p_max': 80, 'f_tr': 0.83, 'actual': 46},
     {'name': 'OnePlus 12', 'cap': 5400, 'p_max': 50, 'f_tr': 0.83, 'actual': 55},
@@ -26,7 +33,7 @@ def residuals(params, c_rate, e_supply, p_max, f_trans, actual):
     return t_pred - actual
 
 initial_guess = [0.35, 0.70, 0.80]
-bounds = ([0.0, 0.1, 0.1], [5.0, 2.0, 1.0])
+bounds = [(0.0, 5.0), (0.1, 2.0), (0.1, 1.0)]
 
 deltas = [0.0, 2.5, 5.0, 7.5, 10.0, 12.5, 15.0, 17.5, 20.0, 22.5, 25.0]
 
@@ -34,11 +41,11 @@ print("| Huber Delta | `k`    | `p`    | `c0`   | Bias (mins) | MAE (mins) | RMS
 print("| :---------- | :----- | :----- | :----- | :---------- | :--------- | :---------- | :------------- |")
 
 for d in deltas:
-    f_scale = d if d > 0 else 1e-5
-    res = least_squares(
-        residuals, initial_guess, bounds=bounds,
-        args=(df['c_rate'].values, df['e_supply'].values, df['p_max'].values, df['f_tr'].values, df['actual'].values),
-        loss='huber', f_scale=f_scale
+    # IRLS handles d = 0 as a true L1 fit (no f_scale = 1e-5 approximation)
+    args = (df['c_rate'].values, df['e_supply'].values, df['p_max'].values, df['f_tr'].values, df['actual'].values)
+    res = irls(
+        lambda x: residuals(x, *args), lambda x: residuals_jacobian(x, *args), initial_guess, bounds,
+        loss_type='huber' if d > 0 else 'mae', delta=d
     )
     k_opt, p_opt, c0_opt = res.x
     
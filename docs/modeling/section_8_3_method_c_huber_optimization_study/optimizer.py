@@ -1,5 +1,6 @@
 import numpy as np
 from scipy.optimize import least_squares
+from thermal_jacobian import residuals_jacobian
 import matplotlib.pyplot as plt
 import pandas as pd
 
@@ -89,6 +90,7 @@ bounds = ([0.0, 0.1, 0.1], [5.0, 2.0, 1.0])
 result = least_squares(
     residuals, 
     initial_guess, 
+    jac=residuals_jacobian,
     bounds=bounds,
     args=(df['c_rate'].values, df['e_supply_wh'].values, df['p_wireless_max'].values, df['f_transfer'].values, df['actual_time_mins'].values),
     loss='huber',
@@ -0,0 +1,96 @@
+"""
+Analytic Jacobian of the wireless thermal-curve model
+------------------------------------------------------
+Closed-form derivatives of
+
+    T = 60 * e_supply / (p_max * f_trans * f_thermal),   f_thermal = 1 / (1 + k * base^p),
+    base = max(0, c_rate - c0)
+
+with respect to (k, p, c0), for use as least_squares(..., jac=residuals_jacobian) in
+optimizer.py and delta_study.py. Writing A = 60 * e_supply / (p_max * f_trans), the model is
+T = A * (1 + k * base^p), so
+
+    dT/dk  = A * base^p
+    dT/dp  = A * k * base^p * ln(base)
+    dT/dc0 = -A * k * p * base^(p - 1)
+
+for base > 0 and all zero for base = 0 (the below-onset side of the max(0, .) kink), which
+avoids the finite-difference noise SciPy picks up when a step straddles the kink.
+
+Running this file checks the Jacobian against central finite differences.
+"""
+
+import numpy as np
+
+
+def predict_time(c_rate, e_supply, p_max, f_trans, k, p, c0):
+    """Same model as delta_study.predict_time (vectorized over devices)."""
+    base = np.maximum(0, c_rate - c0)
+    f_th = 1.0 / (1.0 + k * (base ** p))
+    return 60.0 * (e_supply / (p_max * f_trans * f_th))
+
+
+def time_jacobian(c_rate, e_supply, p_max, f_trans, k, p, c0):
+    """
+    dT/d(k, p, c0) for every device.
+
+    Returns:
+        (N, 3) array, row i = dT_i / d(k, p, c0).
+    """
+    c_rate = np.asarray(c_rate, dtype=float)
+    A = 60.0 * np.asarray(e_supply, dtype=float) / (np.asarray(p_max, dtype=float) * np.asarray(f_trans, dtype=float))
+
+    above = c_rate > c0
+    base = np.where(above, c_rate - c0, 1.0)  # 1.0 keeps log/pow finite below onset
+    base_p = np.where(above, base ** p, 0.0)
+
+    d_k = A * base_p
+    d_p = np.where(above, A * k * base_p * np.log(base), 0.0)
+    d_c0 = np.where(above, -A * k * p * base_p / base, 0.0)
+    return np.column_stack([d_k, d_p, d_c0])
+
+
+def residuals_jacobian(params, c_rate, e_supply, p_max, f_trans, actual_time):
+    """Jacobian of optimizer.residuals / delta_study.residuals (same call signature)."""
+    k, p, c0 = params
+    return time_jacobian(c_rate, e_supply, p_max, f_trans, k, p, c0)
+
+
+def check_against_finite_differences(samples=500, tol=1e-6, seed=0):
+    """
+    Compares time_jacobian with central finite differences on random (k, p, c0) draws
+    within the optimizer bounds, over the section 8.3 validation devices. Devices within
+    one step of the c0 kink are skipped. Returns the largest relative difference.
+    """
+    cap = np.array([5000, 5400, 4422, 5000, 5050], dtype=float)
+    p_max = np.array([80, 50, 15, 15, 23], dtype=float)
+    f_trans = np.array([0.83, 0.83, 0.82, 0.78, 0.83])
+    e_supply = cap * 3.85 / 1000.0
+    c_rate = p_max / e_supply
+
+    lo = np.array([0.0, 0.1, 0.1])
+    hi = np.array([5.0, 2.0, 1.0])
+    rng = np.random.default_rng(seed)
+
+    worst = 0.0
+    for x in lo + rng.random((samples, 3)) * (hi - lo):
+        J = time_jacobian(c_rate, e_supply, p_max, f_trans, *x)
+        h = 1e-6 * np.maximum(1.0, np.abs(x))
+        fd = np.empty_like(J)
+        for j in range(3):
+            up, dn = x.copy(), x.copy()
+            up[j] += h[j]
+            dn[j] -= h[j]
+            fd[:, j] = (predict_time(c_rate, e_supply, p_max, f_trans, *up)
+                        - predict_time(c_rate, e_supply, p_max, f_trans, *dn)) / (2.0 * h[j])
+        smooth = np.abs(c_rate - x[2]) > 2.0 * h[2]
+        rel = np.abs(J - fd) / np.maximum(1.0, np.abs(fd))
+        worst = max(worst, float(np.max(rel[smooth])))
+
+    status = "OK" if worst <= tol else "MISMATCH"
+    print(f"time_jacobian | max rel vs finite differences = {worst:.3e} | {status}")
+    return worst
+
+
+if __name__ == "__main__":
+    check_against_finite_differences()
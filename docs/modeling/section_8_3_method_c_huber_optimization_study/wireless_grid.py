@@ -0,0 +1,298 @@
+"""
+Precomputed Wireless-Charging Lookup Table (Section 8.3.1)
+----------------------------------------------------------
+Grid engine and lookup API for the Section 8.3 wireless Method C model
+
+    E_supply = Capacity_mAh * V_nominal / 1000,   C_rate = P_wireless_max / E_supply,
+    F_therm  = 1 / (1 + k_w * max(0, C_rate - C0_w)^p_w),
+    T_pred   = 60 * E_supply / (P_wireless_max * F_transfer * F_therm),
+
+with the calibrated constants of scoring_rules.md (k_w = 1.1232, p_w = 0.2194, C0_w = 0.7778,
+the same values as minmax_study.py and calc_table_human.py).
+
+build_table() evaluates T_pred and F_therm over a dense capacity x P_wireless_max x F_transfer
+lattice in one broadcast call. The power axis is laid out as C_rate = P_wireless_max / E_supply,
+so each capacity row spans P = C_rate x E_supply. The thermal onset is a diagonal kink in
+(capacity, P), but in C_rate it falls on one grid line. The lattice coordinates are
+
+    log(capacity),    g = sign(C_rate - C0_w) |C_rate - C0_w|^p_w,    log(F_transfer),
+
+each sampled uniformly, with g = 0 (the onset) on a node. The table stores log(T_pred). The
+lookup interpolates log(T_pred x C_rate) = log 60 - log F_transfer + log(1 + k_w max(0, g)),
+which is constant below the onset, smooth in g above it (log(1 + k_w g)) and linear in
+log(F_transfer). It does not depend on capacity at all. The steep base^p_w rise just past
+the onset, which a (capacity, P) lattice cannot resolve, is linear in g. The table is saved
+as float32 arrays plus its axes and constants in one .npz file (scratch/wireless_grid.npz).
+
+lookup() interpolates T_pred, F_therm and S_speed for a batch of devices. The cell index is
+computed arithmetically from the uniform coordinates, so every device costs O(1) with no search.
+Devices outside the table's box fall back to the exact formula and are flagged. load_table()
+rebuilds the file when it is missing or was built with different constants or axes.
+
+error_bounds() reports the interpolation error against the exact formula at every cell centre
+(the worst point of a linear interpolant in each cell) and on random in-box draws.
+
+Usage:
+    python wireless_grid.py    (builds the table, reports error bounds, scores the
+                                minmax_study scenarios and the validation devices)
+"""
+
+import os
+import time
+
+import numpy as np
+
+# Section 8.3.1 calibration constants (scoring_rules.md) and scoring anchors (scoring_constants.md)
+K_W = 1.1232
+P_W = 0.2194
+C0_W = 0.7778
+V_NOMINAL = 3.85
+T_MIN_MINS = 30.0
+T_MAX_MINS = 360.0
+
+# (lo, hi, points) of the lattice axes
+CAPACITY_AXIS = (1000.0, 12000.0, 45)    # mAh, uniform in log
+C_RATE_AXIS = (0.02, 32.0, 401)          # h^-1 (P_wireless_max / E_supply), uniform in g, onset on a node
+TRANSFER_AXIS = (0.60, 0.90, 5)          # F_transfer (0.72 - 0.83 in the framework classes), uniform in log
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scratch", "wireless_grid.npz")
+
+
+def predict_exact(capacity_mah, p_max, f_trans, k=K_W, p=P_W, c0=C0_W, v_nom=V_NOMINAL):
+    """Closed-form (T_pred mins, F_therm) of the wireless model, broadcast over the inputs."""
+    e_supply = np.asarray(capacity_mah, dtype=float) * v_nom / 1000.0
+    p_max = np.asarray(p_max, dtype=float)
+    base = np.maximum(0.0, p_max / e_supply - c0)
+    f_therm = 1.0 / (1.0 + k * base ** p)
+    return 60.0 * e_supply / (p_max * np.asarray(f_trans, dtype=float) * f_therm), f_therm
+
+
+def s_speed(t_pred):
+    """Logarithmic-utility S_speed (0 - 10) of predicted wireless durations."""
+    span = np.log(T_MAX_MINS) - np.log(T_MIN_MINS)
+    return np.clip(10.0 * (np.log(T_MAX_MINS) - np.log(t_pred)) / span, 0.0, 10.0)
+
+
+def _coordinates(capacity_mah, c_rate, f_trans, p, c0):
+    """Lattice coordinates (log capacity, g, log F_transfer) in which the axes are uniform."""
+    shifted = np.asarray(c_rate, dtype=float) - c0
+    return np.log(capacity_mah), np.sign(shifted) * np.abs(shifted) ** p, np.log(f_trans)
+
+
+def _from_g(g, p, c0):
+    """C_rate of a g coordinate (inverse of the middle coordinate of _coordinates)."""
+    return c0 + np.sign(g) * np.abs(g) ** (1.0 / p)
+
+
+def _uniform(lo, hi, n, anchor=None):
+    """n uniform nodes from lo to about hi; with an anchor the nodes are shifted so it is one of them."""
+    step = (hi - lo) / (n - 1)
+    if anchor is not None:
+        lo = anchor - np.ceil((anchor - lo) / step) * step
+    return lo + step * np.arange(n)
+
+
+def build_table(capacity_axis=CAPACITY_AXIS, c_rate_axis=C_RATE_AXIS, transfer_axis=TRANSFER_AXIS,
+                k=K_W, p=P_W, c0=C0_W, v_nom=V_NOMINAL):
+    """
+    Evaluates the model over the full lattice in one vectorized call.
+
+    Returns:
+        Dict with the float32 tables "log_t" and "f_therm" of shape
+        (n_capacity, n_c_rate, n_transfer), the lattice nodes ("capacity", "c_rate",
+        "f_trans"; P_wireless_max = c_rate x E_supply), the constants and the build time.
+    """
+    t0 = time.time()
+    (cap_lo, g_lo, f_lo), (cap_hi, g_hi, f_hi) = (
+        _coordinates(capacity_axis[i], c_rate_axis[i], transfer_axis[i], p, c0) for i in (0, 1))
+    cap = np.exp(_uniform(cap_lo, cap_hi, capacity_axis[2]))
+    c_rate = _from_g(_uniform(g_lo, g_hi, c_rate_axis[2], anchor=0.0), p, c0)
+    f_trans = np.exp(_uniform(f_lo, f_hi, transfer_axis[2]))
+
+    e_supply = cap[:, None, None] * v_nom / 1000.0
+    t_pred, f_therm = predict_exact(cap[:, None, None], c_rate[None, :, None] * e_supply, f_trans[None, None, :],
+                                    k, p, c0, v_nom)
+    return _with_log_tc({
+        "log_t": np.log(t_pred).astype(np.float32),
+        "f_therm": np.broadcast_to(f_therm, t_pred.shape).astype(np.float32),
+        "capacity": cap, "c_rate": c_rate, "f_trans": f_trans,
+        "constants": np.array([k, p, c0, v_nom]),
+        "axes": np.array([*capacity_axis, *c_rate_axis, *transfer_axis], dtype=float),
+        "build_sec": time.time() - t0,
+    })
+
+
+TABLE_KEYS = ["log_t", "f_therm", "capacity", "c_rate", "f_trans", "constants", "axes"]
+
+
+def _with_log_tc(table):
+    """Adds "log_tc" = log(T_pred x C_rate), the quantity lookup() interpolates (derived, not saved)."""
+    table["log_tc"] = table["log_t"] + np.log(table["c_rate"])[None, :, None]
+    return table
+
+
+def save_table(table, path=TABLE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    np.savez(path, **{name: table[name] for name in TABLE_KEYS})
+    return path
+
+
+def load_table(path=TABLE_PATH, rebuild=True):
+    """
+    Loads the table, (re)building it when the file is missing or its constants or lattice axes
+    differ from the module's. With rebuild=False a missing or stale file raises ValueError.
+    """
+    expected = {"constants": np.array([K_W, P_W, C0_W, V_NOMINAL]),
+                "axes": np.array([*CAPACITY_AXIS, *C_RATE_AXIS, *TRANSFER_AXIS], dtype=float)}
+    if os.path.exists(path):
+        with np.load(path) as f:
+            table = {name: f[name] for name in TABLE_KEYS if name in f.files}
+        stale = [name for name, value in expected.items()
+                 if name not in table or not np.array_equal(table[name], value)]
+        if not stale:
+            return _with_log_tc(table)
+        if not rebuild:
+            raise ValueError(f"{path} is stale: " + ", ".join(
+                f"{name} {table[name].tolist() if name in table else None}, expected {expected[name].tolist()}"
+                for name in stale))
+    elif not rebuild:
+        raise ValueError(f"No wireless lookup table at {path}; run build_table() / save_table() first")
+    table = build_table()
+    save_table(table, path)
+    return table
+
+
+def lookup(table, capacity_mah, p_max, f_trans):
+    """
+    Interpolated wireless predictions for a batch of devices.
+
+    Args:
+        table: Table from build_table() or load_table().
+        capacity_mah, p_max, f_trans: Per-device inputs (broadcast together).
+
+    Returns:
+        Dict with "T_pred", "F_therm", "S_speed" and the boolean "in_grid" (False rows are
+        outside the table's box and were computed with the exact formula).
+
+    Raises:
+        ValueError: if a capacity, P_wireless_max or F_transfer is not positive.
+    """
+    cap, p_max, f_trans = (v.ravel() for v in np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (capacity_mah, p_max, f_trans))))
+    shape = np.broadcast(capacity_mah, p_max, f_trans).shape
+    for name, values in [("capacity_mah", cap), ("p_max", p_max), ("f_trans", f_trans)]:
+        if not np.all(values > 0.0):
+            raise ValueError(f"{name} must be positive, got {values[~(values > 0.0)][:5].tolist()}")
+    k, p, c0, v_nom = table["constants"]
+    c_rate = p_max / (cap * v_nom / 1000.0)
+    x = _coordinates(cap, c_rate, f_trans, p, c0)
+    nodes = _coordinates(table["capacity"], table["c_rate"], table["f_trans"], p, c0)
+
+    in_grid = np.ones(len(cap), dtype=bool)
+    idx, frac = [], []
+    for d in range(3):
+        first, step, n = nodes[d][0], nodes[d][1] - nodes[d][0], len(nodes[d])
+        u = (x[d] - first) / step
+        in_grid &= (u >= -1e-9) & (u <= n - 1 + 1e-9)
+        u = np.clip(u, 0.0, n - 1)
+        i = np.minimum(u.astype(int), n - 2)
+        idx.append(i)
+        frac.append(u - i)
+
+    def interpolate(values):
+        out = 0.0
+        for corner in range(8):
+            bits = [(corner >> d) & 1 for d in range(3)]
+            weight = np.prod([f if b else 1.0 - f for f, b in zip(frac, bits)], axis=0)
+            out = out + weight * values(idx[0] + bits[0], idx[1] + bits[1], idx[2] + bits[2])
+        return out
+
+    # log(T x C_rate) is independent of capacity and smooth in g; T follows from the device's own C_rate
+    t_pred = np.exp(interpolate(lambda i, j, l: table["log_tc"][i, j, l])) / c_rate
+    f_therm = interpolate(lambda i, j, l: table["f_therm"][i, j, l])
+    if not np.all(in_grid):
+        t_out, f_out = predict_exact(cap[~in_grid], p_max[~in_grid], f_trans[~in_grid], k, p, c0, v_nom)
+        t_pred[~in_grid], f_therm[~in_grid] = t_out, f_out
+    return {"T_pred": t_pred.reshape(shape), "F_therm": f_therm.reshape(shape),
+            "S_speed": s_speed(t_pred).reshape(shape), "in_grid": in_grid.reshape(shape)}
+
+
+def error_bounds(table, samples=1_000_000, seed=0):
+    """
+    Interpolation error against predict_exact at every cell centre (midpoint of the lattice
+    coordinates) and on random draws, uniform in log(capacity), log(P_wireless_max) over
+    2.5 - 120 W and log(F_transfer), that fall inside the table's box.
+
+    Returns:
+        {probe: {"T_rel": (max, p99), "F_abs": (max, p99), "S_abs": (max, p99), "points": n}}.
+    """
+    k, p, c0, v_nom = table["constants"]
+    nodes = _coordinates(table["capacity"], table["c_rate"], table["f_trans"], p, c0)
+    cap, g, log_f = np.meshgrid(*((u[1:] + u[:-1]) / 2 for u in nodes), indexing="ij")
+    cap = np.exp(cap)
+    centres = (cap, _from_g(g, p, c0) * cap * v_nom / 1000.0, np.exp(log_f))
+
+    rng = np.random.default_rng(seed)
+    bounds = [(table["capacity"][0], table["capacity"][-1]), (2.5, 120.0), (table["f_trans"][0], table["f_trans"][-1])]
+    draws = [np.exp(np.log(lo) + rng.random(samples) * np.log(hi / lo)) for lo, hi in bounds]
+    inside = lookup(table, *draws)["in_grid"]
+    draws = [v[inside] for v in draws]
+
+    report = {}
+    for probe, (cap, power, f_trans) in [("cell centres", centres), ("random draws", draws)]:
+        cap, power, f_trans = (v.ravel() for v in (cap, power, f_trans))
+        t_exact, f_exact = predict_exact(cap, power, f_trans, k, p, c0, v_nom)
+        approx = lookup(table, cap, power, f_trans)
+        errors = {"T_rel": np.abs(approx["T_pred"] - t_exact) / t_exact,
+                  "F_abs": np.abs(approx["F_therm"] - f_exact),
+                  "S_abs": np.abs(approx["S_speed"] - s_speed(t_exact))}
+        report[probe] = {key: (float(np.max(e)), float(np.percentile(e, 99))) for key, e in errors.items()}
+        report[probe]["points"] = len(cap)
+    return report
+
+
+def main():
+    table = build_table()
+    path = save_table(table)
+    cells = table["log_t"].size
+    print(f"\n=== WIRELESS LOOKUP TABLE: {' x '.join(str(s) for s in table['log_t'].shape)} lattice "
+          f"({cells} points) in {table['build_sec'] * 1000:.1f} ms, "
+          f"{os.path.getsize(path) / 1e6:.2f} MB at {path} ===")
+
+    print("\n=== INTERPOLATION ERROR BOUNDS (vs exact formula) ===")
+    print("| Probe        | Points    | Max T_pred rel | p99 T_pred rel | Max F_therm abs | Max S_speed abs | p99 S_speed abs |")
+    print("| :----------- | :-------: | :------------: | :------------: | :-------------: | :-------------: | :-------------: |")
+    for probe, r in error_bounds(table).items():
+        print(f"| {probe:<12} | {r['points']:>9} | {r['T_rel'][0]:>14.2e} | {r['T_rel'][1]:>14.2e} | "
+              f"{r['F_abs'][0]:>15.2e} | {r['S_abs'][0]:>15.2e} | {r['S_abs'][1]:>15.2e} |")
+
+    n = 1_000_000
+    rng = np.random.default_rng(1)
+    batch = (rng.uniform(2000, 10000, n), rng.uniform(5, 100, n), rng.choice([0.72, 0.78, 0.82, 0.83], n))
+    t0 = time.time()
+    lookup(table, *batch)
+    print(f"\nLookup of {n} devices: {(time.time() - t0) * 1000:.0f} ms")
+
+    print("\n=== SCENARIOS (minmax_study.py and calc_table_human.py devices) ===")
+    print("| Scenario                                 | Cap (mAh) | P_max (W) | F_trans | Lookup T (m) | Exact T (m) | F_therm | S_speed |")
+    print("| :--------------------------------------- | :-------- | :-------- | :------ | :----------- | :---------- | :------ | :------ |")
+    scenarios = [
+        ("Ultra-Fast Concept (Fan)", 4000, 100, 0.83),
+        ("Fastest Reality (Xiaomi 14 Ultra, Fan)", 5000, 80, 0.83),
+        ("OnePlus 12 (Fan)", 5400, 50, 0.83),
+        ("Google Pixel 8 Pro", 5050, 23, 0.83),
+        ("iPhone 15 Pro Max (MagSafe)", 4422, 15, 0.82),
+        ("Samsung Galaxy S24 Ultra", 5000, 15, 0.78),
+        ("Slowest Reality (6000mAh, 5W, No Fan)", 6000, 5, 0.72),
+        ("Absolute Worst (10000mAh, 5W, No Fan)", 10000, 5, 0.72),
+    ]
+    cap, power, f_trans = (np.array(v, dtype=float) for v in list(zip(*scenarios))[1:])
+    approx = lookup(table, cap, power, f_trans)
+    exact, _ = predict_exact(cap, power, f_trans)
+    for i, (name, *_) in enumerate(scenarios):
+        print(f"| {name:<40} | {cap[i]:<9.0f} | {power[i]:<9.0f} | {f_trans[i]:<7.2f} | {approx['T_pred'][i]:<12.2f} | "
+              f"{exact[i]:<11.2f} | {approx['F_therm'][i]:<7.4f} | {approx['S_speed'][i]:<7.2f} |")
+
+
+if __name__ == "__main__":
+    main()
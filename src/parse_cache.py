@@ -0,0 +1,223 @@
+"""
+Incremental Per-Phone Parse Cache
+---------------------------------
+Keeps the parsed numeric features (spec_parser fields) and the spec-derived subscores of every
+phone in data/parse_cache.json, so that adding one phone to phones_db.json re-parses and
+re-scores only that phone. An entry is served from the cache only when its whole key matches:
+
+    (url, sha256 of the phone's `specs` block, spec_parser.PARSER_VERSION, constants version)
+
+The constants version is SUBSCORE_FORMULA_VERSION plus a hash of the values read from
+docs/scoring_constants.md, so editing a range there (or a formula here, with a version bump)
+invalidates every entry, while edits to the prose around the constants do not. This is what
+lets the "Fast Method" of docs/BATTERY_SCORING_PROCESS.md skip unchanged phones without
+serving scores computed under stale rules.
+
+Subscores (0-10, NaN when the input is missing) follow docs/scoring_rules.md:
+    1.4 thickness (linear) + width (quadratic), 1.5 weight (linear), 2.2 HBM / peak brightness
+    (log, 70/30, HBM = Peak / 1.5 fallback), 2.5 PPI, 2.6 refresh rate, 6.6 RAM and 6.8 storage
+    (log, scored on the largest variant).
+
+Usage:
+    python src/parse_cache.py    (updates the cache and reports hits / misses)
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from spec_parser import FIELDS, PARSER_VERSION, load_phones, parse_batch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHONES_DB_PATH = os.path.join(ROOT_DIR, "data", "phones_db.json")
+CONSTANTS_PATH = os.path.join(ROOT_DIR, "docs", "scoring_constants.md")
+CACHE_PATH = os.path.join(ROOT_DIR, "data", "parse_cache.json")
+SUBSCORE_FORMULA_VERSION = 1  # bump whenever compute_subscores() changes
+SUBSCORES = ["1.4", "1.5", "2.2", "2.5", "2.6", "6.6", "6.8"]
+
+CONSTANT_RE = re.compile(r"`(\w+)` = (-?\d+(?:\.\d+)?)")
+
+
+def load_scoring_constants(path=CONSTANTS_PATH):
+    """{name: value} for every `Name` = value entry of scoring_constants.md."""
+    with open(path, encoding="utf-8") as f:
+        return {name: float(value) for name, value in CONSTANT_RE.findall(f.read())}
+
+
+def constants_version(constants):
+    payload = json.dumps(sorted(constants.items())).encode("utf-8")
+    return f"{SUBSCORE_FORMULA_VERSION}-{hashlib.sha256(payload).hexdigest()[:16]}"
+
+
+def specs_hash(phone):
+    """sha256 of the phone's specs block, independent of key order and whitespace in the JSON."""
+    payload = json.dumps(phone.get("specs") or {}, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def phone_key(phone):
+    return phone.get("url") or f"{phone.get('brand', '')}|{phone.get('model_name', '')}"
+
+
+def _linear_down(value, lo, hi):
+    return np.clip(10 * (hi - value) / (hi - lo), 0, 10)
+
+
+def _log_up(value, lo, hi):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.clip(10 * (np.log(value) - np.log(lo)) / (np.log(hi) - np.log(lo)), 0, 10)
+
+
+def compute_subscores(features, constants):
+    """
+    Spec-derived subscores for a batch.
+
+    Args:
+        features: {field: float64 array (N,)} as returned by spec_parser.parse_batch
+        constants: load_scoring_constants() output
+    Returns:
+        {rule: float64 array (N,)} for every rule in SUBSCORES, NaN where an input is missing
+    """
+    c = constants
+    thickness = _linear_down(features["thickness_mm"], c["Thickness_mm_Min"], c["Thickness_mm_Max"])
+    width_frac = np.clip((features["width_mm"] - c["Width_mm_Min"]) / (c["Width_mm_Max"] - c["Width_mm_Min"]), 0, 1)
+    width = np.clip(10 * (1 - width_frac ** 2), 0, 10)
+
+    # 2.2 fallback: HBM_Nits = Peak_Nits / 1.5 (applied in reverse when only HBM is published)
+    peak, hbm = features["peak_nits"], features["hbm_nits"]
+    hbm_in = np.where(np.isnan(hbm), peak / 1.5, hbm)
+    peak_in = np.where(np.isnan(peak), hbm * 1.5, peak)
+    brightness = (0.7 * _log_up(hbm_in, c["Display_HBM_Nits_Min"], c["Display_HBM_Nits_Max"])
+                  + 0.3 * _log_up(peak_in, c["Display_Brightness_Nits_Min"], c["Display_Brightness_Nits_Max"]))
+    return {
+        "1.4": 0.5 * thickness + 0.5 * width,
+        "1.5": _linear_down(features["weight_g"], c["Weight_g_Min"], c["Weight_g_Max"]),
+        "2.2": brightness,
+        "2.5": _log_up(features["ppi"], c["Display_PPI_Min"], c["Display_PPI_Max"]),
+        "2.6": _log_up(features["max_refresh_hz"], c["Display_Refresh_Rate_Hz_Min"],
+                       c["Display_Refresh_Rate_Hz_Max"]),
+        "6.6": _log_up(features["ram_gb_max"], c["RAM_GB_Min"], c["RAM_GB_Max"]),
+        "6.8": _log_up(features["storage_gb_max"], c["Storage_GB_Min"], c["Storage_GB_Max"]),
+    }
+
+
+def _to_json(values):
+    return {k: (None if v != v else v) for k, v in values.items()}
+
+
+def _from_json(values):
+    return {k: (np.nan if v is None else v) for k, v in values.items()}
+
+
+class ParseCache:
+    """
+    url -> {"specs_hash", "parser_version", "constants_version", "features", "subscores"},
+    persisted as JSON. featurize() serves hits, recomputes misses in one batch and records
+    hit / miss statistics for the last call in self.stats.
+    """
+
+    def __init__(self, path=CACHE_PATH, constants=None):
+        self.path = path
+        self.constants = constants if constants is not None else load_scoring_constants()
+        self.constants_version = constants_version(self.constants)
+        self.entries = {}
+        self.stats = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    def _miss_reason(self, entry, digest):
+        if entry is None:
+            return "new"
+        if entry["specs_hash"] != digest:
+            return "changed"
+        if entry["parser_version"] != PARSER_VERSION or entry["constants_version"] != self.constants_version:
+            return "stale"
+        return None
+
+    def featurize(self, phones):
+        """
+        Features and subscores for every phone, recomputing only cache misses.
+
+        Returns:
+            features: {field: float64 array (N,)}
+            subscores: {rule: float64 array (N,)}
+        """
+        t0 = time.time()
+        n = len(phones)
+        features = {field: np.full(n, np.nan) for field in FIELDS}
+        subscores = {rule: np.full(n, np.nan) for rule in SUBSCORES}
+        stats = {"hits": 0, "new": 0, "changed": 0, "stale": 0}
+        keys = [phone_key(p) for p in phones]
+        digests = [specs_hash(p) for p in phones]
+
+        misses = []
+        for i, (key, digest) in enumerate(zip(keys, digests)):
+            reason = self._miss_reason(self.entries.get(key), digest)
+            if reason is not None:
+                stats[reason] += 1
+                misses.append(i)
+                continue
+            stats["hits"] += 1
+            entry = self.entries[key]
+            for field, value in _from_json(entry["features"]).items():
+                features[field][i] = value
+            for rule, value in _from_json(entry["subscores"]).items():
+                subscores[rule][i] = value
+
+        if misses:
+            parsed, _ = parse_batch([phones[i] for i in misses])
+            scored = compute_subscores(parsed, self.constants)
+            for j, i in enumerate(misses):
+                row_features = {field: float(parsed[field][j]) for field in FIELDS}
+                row_subscores = {rule: float(scored[rule][j]) for rule in SUBSCORES}
+                for field, value in row_features.items():
+                    features[field][i] = value
+                for rule, value in row_subscores.items():
+                    subscores[rule][i] = value
+                self.entries[keys[i]] = {"specs_hash": digests[i], "parser_version": PARSER_VERSION,
+                                         "constants_version": self.constants_version,
+                                         "features": _to_json(row_features), "subscores": _to_json(row_subscores)}
+
+        # Phones removed from the database no longer need an entry
+        live = set(keys)
+        evicted = [key for key in self.entries if key not in live]
+        for key in evicted:
+            del self.entries[key]
+        stats.update(misses=len(misses), evicted=len(evicted), seconds=time.time() - t0)
+        self.stats = stats
+        return features, subscores
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"parser_version": PARSER_VERSION, "constants_version": self.constants_version,
+                       "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+
+def main(db_path=PHONES_DB_PATH, cache_path=CACHE_PATH):
+    phones = load_phones(db_path)
+    cache = ParseCache(cache_path)
+    _, subscores = cache.featurize(phones)
+    cache.save()
+    s = cache.stats
+    print(f"\n=== PARSE CACHE: {len(phones)} phones (parser v{PARSER_VERSION}, constants {cache.constants_version}) ===")
+    print(f"Hits {s['hits']}, misses {s['misses']} (new {s['new']}, changed specs {s['changed']}, "
+          f"stale versions {s['stale']}), evicted {s['evicted']}, {s['seconds'] * 1000:.1f} ms")
+
+    print("\n| Model                          | " + " | ".join(f"{rule:>4}" for rule in SUBSCORES) + " |")
+    print("| :----------------------------- | " + " | ".join(":--:" for _ in SUBSCORES) + " |")
+    for i, phone in enumerate(phones):
+        cells = " | ".join(f"{subscores[rule][i]:4.1f}" if not np.isnan(subscores[rule][i]) else "   -"
+                           for rule in SUBSCORES)
+        print(f"| {phone.get('model_name', '')[:30]:<30} | {cells} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Columnar Snapshot of phones_db.json
+-----------------------------------
+Compiles data/phones_db.json (nested dicts of free-text GSMArena strings) into a columnar
+snapshot that scorers can open in milliseconds and read column by column:
+
+- numeric columns: float64 arrays of every spec_parser field (dimensions, weight, brightness,
+  display size / resolution / density / refresh rate, RAM / storage, battery capacity,
+  charging power, announcement year), NaN where the spec is missing,
+- categorical columns: int32 codes into a per-column dictionary (brand, chipset, OS, OS skin,
+  front / back / frame build material, form factor), -1 where missing,
+- string columns: fixed-width unicode arrays (model name, URL).
+
+On disk (data/snapshot/ by default) every column is one .npy file, opened with
+np.load(mmap_mode="r") so only the pages of the columns actually read are loaded. A
+manifest.json holds the column kinds, dtypes, dictionaries and the sha256 of the JSON the
+snapshot was compiled from. open_snapshot() hashes phones_db.json and recompiles when the hash
+or spec_parser.PARSER_VERSION differs. Column files carry the hash in their name and the
+manifest is replaced atomically last, so a reader never pairs a manifest with columns of
+another build.
+
+Usage:
+    python src/phone_snapshot.py    (compiles if stale, then reports columns and open / read timings)
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+from spec_parser import FIELDS, PARSER_VERSION, parse_batch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHONES_DB_PATH = os.path.join(ROOT_DIR, "data", "phones_db.json")
+SNAPSHOT_DIR = os.path.join(ROOT_DIR, "data", "snapshot")
+MANIFEST_NAME = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 3
+
+# Build-string keyword -> material category. Parenthesised text is dropped first, since it names
+# the product ("Glass front (Ceramic Shield 2)"), and the keyword closest before the part wins
+MATERIAL_KEYWORDS = [
+    ("aluminum", "Aluminum"), ("aluminium", "Aluminum"), ("stainless steel", "Stainless Steel"),
+    ("titanium", "Titanium"), ("ceramic", "Ceramic"), ("sapphire", "Sapphire"), ("glass", "Glass"),
+    ("leather", "Leather"), ("polymer", "Polymer"), ("plastic", "Plastic"),
+]
+PAREN_RE = re.compile(r"\([^()]*\)")
+# (build string, part, expected material) regressions for _material(); checked by main()
+MATERIAL_CHECKS = [
+    ("Glass front (Ceramic Shield 2), aluminum alloy frame, aluminum alloy back/ glass back (Ceramic Shield)",
+     "front", "Glass"),
+    ("Glass front (Ceramic Shield 2), titanium frame (grade 5), glass back (Ceramic Shield)", "front", "Glass"),
+    ("Glass front (Ceramic Shield 2), titanium frame (grade 5), glass back (Ceramic Shield)", "back", "Glass"),
+    ("Glass front (Gorilla Glass Victus Ceramic 2) (folded), plastic front (unfolded), "
+     "ceramic-glass fiber-reinforced polymer back, aluminum frame, titanium hinge housing", "front", "Glass"),
+    ("Glass front (Gorilla Glass Victus Ceramic 2) (folded), plastic front (unfolded), "
+     "ceramic-glass fiber-reinforced polymer back, aluminum frame, titanium hinge housing", "back", "Polymer"),
+]
+CATEGORICAL_COLUMNS = ["brand", "chipset", "os", "os_skin", "front_material", "back_material", "frame_material",
+                       "form_factor"]
+STRING_COLUMNS = ["model_name", "url"]
+
+
+def _spec(specs, section, key):
+    return (specs.get(section) or {}).get(key) or ""
+
+
+def _material(build, part):
+    for phrase in PAREN_RE.sub("", build.lower()).split(","):
+        if part in phrase:
+            head = phrase[:phrase.index(part)]
+            found = [(head.rfind(keyword), name) for keyword, name in MATERIAL_KEYWORDS if keyword in head]
+            if found:
+                return max(found)[1]
+            return next((name for keyword, name in MATERIAL_KEYWORDS if keyword in phrase), None)
+    return None
+
+
+def extract_row(phone):
+    """Categorical and string values of one phone record ({column: str | None})."""
+    specs = phone.get("specs") or {}
+    os_parts = [p.strip() for p in _spec(specs, "Platform", "OS").split(",") if p.strip()]
+    skins = [p for p in os_parts[1:] if not p.lower().startswith(("up", "upgradable"))]
+    build = _spec(specs, "Body", "Build")
+    name = phone.get("model_name") or ""
+    return {
+        "brand": phone.get("brand") or None,
+        "chipset": re.sub(r"\s*\(\d+ nm\)", "", _spec(specs, "Platform", "Chipset")).strip() or None,
+        "os": os_parts[0] if os_parts else None,
+        "os_skin": skins[-1] if skins else None,
+        "front_material": _material(build, "front"),
+        "back_material": _material(build, "back"),
+        "frame_material": _material(build, "frame"),
+        "form_factor": "watch" if " watch." in name else ("tablet" if " tablet." in name else "phone"),
+        "model_name": name,
+        "url": phone.get("url") or "",
+    }
+
+
+def source_hash(path=PHONES_DB_PATH):
+    """sha256 hex digest of the database file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def compile_snapshot(db_path=PHONES_DB_PATH, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Parses the database once and writes the columnar snapshot.
+
+    Returns:
+        The manifest dict (also written to <snapshot_dir>/manifest.json).
+    """
+    t0 = time.time()
+    digest = source_hash(db_path)
+    with open(db_path, encoding="utf-8") as f:
+        phones = json.load(f).get("phones", [])
+    numeric, _ = parse_batch(phones)
+    rows = [extract_row(p) for p in phones]
+
+    os.makedirs(snapshot_dir, exist_ok=True)
+    prefix = digest[:16]
+    columns = {}
+
+    def write(column, array, **meta):
+        file_name = f"{prefix}_{column}.npy"
+        np.save(os.path.join(snapshot_dir, file_name), array)
+        columns[column] = dict(meta, file=file_name, dtype=array.dtype.str)
+
+    for column in FIELDS:
+        write(column, numeric[column], kind="numeric")
+    for column in CATEGORICAL_COLUMNS:
+        values = [r[column] for r in rows]
+        dictionary = sorted({v for v in values if v is not None})
+        index = {v: i for i, v in enumerate(dictionary)}
+        codes = np.array([index.get(v, -1) for v in values], dtype=np.int32)
+        write(column, codes, kind="categorical", dictionary=dictionary)
+    for column in STRING_COLUMNS:
+        write(column, np.array([r[column] for r in rows], dtype=str), kind="string")
+
+    manifest = {"format_version": SNAPSHOT_FORMAT_VERSION, "source": os.path.basename(db_path),
+                "source_sha256": digest, "parser_version": PARSER_VERSION, "rows": len(rows), "columns": columns,
+                "compile_sec": time.time() - t0}
+    tmp = os.path.join(snapshot_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(snapshot_dir, MANIFEST_NAME))
+
+    # Column files of earlier builds are unreachable once the new manifest is in place
+    for name in os.listdir(snapshot_dir):
+        if name.endswith(".npy") and not name.startswith(prefix + "_"):
+            os.remove(os.path.join(snapshot_dir, name))
+    return manifest
+
+
+class PhoneSnapshot:
+    """Read-only view of a compiled snapshot; columns are memory-mapped on first access."""
+
+    def __init__(self, snapshot_dir, manifest):
+        self.snapshot_dir = snapshot_dir
+        self.manifest = manifest
+        self._cache = {}
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    def __getitem__(self, column):
+        """Raw column: float64 values, int32 category codes or unicode strings."""
+        if column not in self._cache:
+            meta = self.manifest["columns"][column]
+            self._cache[column] = np.load(os.path.join(self.snapshot_dir, meta["file"]), mmap_mode="r")
+        return self._cache[column]
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    def kind(self, column):
+        return self.manifest["columns"][column]["kind"]
+
+    def dictionary(self, column):
+        return self.manifest["columns"][column]["dictionary"]
+
+    def decode(self, column):
+        """Categorical column as an object array of strings (None where missing)."""
+        lookup = np.array(self.dictionary(column) + [None], dtype=object)
+        return lookup[self[column]]
+
+    def code(self, column, value):
+        """Code of a category value (-1 if the snapshot has no such value)."""
+        dictionary = self.dictionary(column)
+        return dictionary.index(value) if value in dictionary else -1
+
+
+def open_snapshot(db_path=PHONES_DB_PATH, snapshot_dir=SNAPSHOT_DIR, rebuild=True):
+    """
+    Opens the snapshot of db_path, recompiling it when it is missing, was built by another
+    format or spec-parser version, or from a database whose sha256 differs. With rebuild=False
+    a stale or missing snapshot raises ValueError instead.
+    """
+    manifest_path = os.path.join(snapshot_dir, MANIFEST_NAME)
+    manifest = None
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    fresh = (manifest is not None and manifest.get("format_version") == SNAPSHOT_FORMAT_VERSION
+             and manifest.get("parser_version") == PARSER_VERSION
+             and manifest.get("source_sha256") == source_hash(db_path))
+    if not fresh:
+        if not rebuild:
+            raise ValueError(f"Snapshot in {snapshot_dir} is missing or stale for {db_path}")
+        manifest = compile_snapshot(db_path, snapshot_dir)
+    return PhoneSnapshot(snapshot_dir, manifest)
+
+
+def main(db_path=PHONES_DB_PATH, snapshot_dir=SNAPSHOT_DIR):
+    for build, part, expected in MATERIAL_CHECKS:
+        assert _material(build, part) == expected, (build, part, _material(build, part))
+
+    t0 = time.time()
+    snapshot = open_snapshot(db_path, snapshot_dir)
+    first = time.time() - t0
+    t0 = time.time()
+    snapshot = open_snapshot(db_path, snapshot_dir)
+    weights = np.asarray(snapshot["weight_g"])
+    warm = time.time() - t0
+
+    manifest = snapshot.manifest
+    print(f"\n=== PHONE SNAPSHOT: {len(snapshot)} rows, {len(snapshot.columns)} columns, "
+          f"source sha256 {manifest['source_sha256'][:16]} ===")
+    print(f"First open {first * 1000:.1f} ms (compile {manifest['compile_sec'] * 1000:.1f} ms if it ran), "
+          f"open + read one column {warm * 1000:.2f} ms ({np.sum(np.isfinite(weights))} weights)")
+    print("\n| Column                 | Kind        | dtype | Non-missing | Categories | Bytes  |")
+    print("| :--------------------- | :---------- | :---- | :---------: | :--------: | :----: |")
+    for column in snapshot.columns:
+        values, kind = snapshot[column], snapshot.kind(column)
+        present = (np.sum(np.isfinite(values)) if kind == "numeric" else
+                   np.sum(values >= 0) if kind == "categorical" else np.sum(values != ""))
+        categories = len(snapshot.dictionary(column)) if kind == "categorical" else "-"
+        size = os.path.getsize(os.path.join(snapshot_dir, manifest["columns"][column]["file"]))
+        print(f"| {column:<22} | {kind:<11} | {values.dtype.str:<5} | {present:>11} | {categories!s:>10} | {size:>6} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+GSMArena Spec-String Parser
+---------------------------
+Extracts the numeric fields the scoring rules need from the free-text `specs` blocks of
+data/phones_db.json, e.g.
+
+    "Unfolded: 159.2 x 214.1 x 3.9-4.2 mmFolded: 159.2 x 75 x 12.9 mm"  -> 159.2 / 75 / 12.9 mm
+    "512GB 16GB RAM, 1TB 16GB RAM"                                       -> RAM 16 GB, storage 512-1024 GB
+    "1584 x 2160 pixels, 4:3 ratio (~269 ppi density)"                   -> 269 ppi
+
+Every extractor is a precompiled pattern without nested or overlapping quantifiers (so a
+search costs linear time in the string length), guarded by a plain substring test that skips
+the regex when the marker text is absent. parse_batch() runs one extractor at a time across
+the whole database (column-major), which keeps the pattern hot and gives per-field timings.
+
+Fields (rule section in brackets):
+    height_mm, width_mm, thickness_mm [1.4]   folded or unfolded state of foldables (folded=...),
+                                              upper end of ranges
+    weight_g [1.5], peak_nits / hbm_nits [2.2], ppi [2.5], max_refresh_hz [2.6],
+    ram_gb_min / ram_gb_max [6.6], storage_gb_min / storage_gb_max [6.8], memory_variants,
+    battery_mah, display_inches, screen_to_body_pct, resolution px, charging W, announced_year
+
+Missing or unparseable values are NaN. A "failure" is a non-empty source string that yields
+no value (a format the parser does not understand); an absent string only counts as missing.
+
+Usage:
+    python src/spec_parser.py    (coverage / failures per field, then a 100k-phone throughput run)
+"""
+
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHONES_DB_PATH = os.path.join(ROOT_DIR, "data", "phones_db.json")
+PARSER_VERSION = 1  # bump whenever an extractor's output can change
+BENCHMARK_ROWS = 100_000
+
+NUM = r"(\d+(?:\.\d+)?)"
+DIMENSIONS_RE = re.compile(NUM + r" x " + NUM + r" x " + NUM + r"(?:-" + NUM + r")? mm")
+WEIGHT_RE = re.compile(NUM + r" g\b")
+NITS_RE = re.compile(r"(\d+) nits \((peak|HBM)\)")
+RESOLUTION_RE = re.compile(r"(\d+) x (\d+) pixels")
+PPI_RE = re.compile(r"~(\d+) ppi")
+REFRESH_RE = re.compile(r"(\d+)Hz")
+SIZE_RE = re.compile(NUM + r" inches")
+SCREEN_TO_BODY_RE = re.compile(r"~" + NUM + r"% screen-to-body")
+MEMORY_RE = re.compile(r"(\d+)(GB|TB|MB) " + NUM + r"(GB|MB) RAM")
+BATTERY_RE = re.compile(r"(\d+) mAh")
+WIRED_RE = re.compile(NUM + r"W wired")
+WIRELESS_RE = re.compile(NUM + r"W wireless")
+YEAR_RE = re.compile(r"\b(\d{4})\b")
+
+NAN = float("nan")
+GB_PER_UNIT = {"MB": 1 / 1024, "GB": 1.0, "TB": 1024.0}
+
+
+def _dimensions(text, folded=True):
+    # Foldables list "Unfolded: ... Folded: ..."; the first triple is the unfolded state
+    start = text.find("Folded:") if folded else -1
+    m = DIMENSIONS_RE.search(text, start if start >= 0 else 0) or DIMENSIONS_RE.search(text)
+    if m is None:
+        return None
+    return float(m.group(1)), float(m.group(2)), float(m.group(4) or m.group(3))
+
+
+def _brightness(text):
+    if "nits" not in text:
+        return None
+    levels = {"peak": [], "HBM": []}
+    for value, kind in NITS_RE.findall(text):
+        levels[kind].append(float(value))
+    return max(levels["peak"], default=NAN), max(levels["HBM"], default=NAN)
+
+
+def _refresh(text):
+    if "Hz" not in text:
+        return None
+    rates = REFRESH_RE.findall(text)
+    return (max(float(r) for r in rates),) if rates else None
+
+
+def _resolution(text):
+    m = RESOLUTION_RE.search(text)
+    return (float(m.group(1)), float(m.group(2))) if m else None
+
+
+def _memory(text):
+    if "RAM" not in text:
+        return None
+    variants = MEMORY_RE.findall(text)
+    if not variants:
+        return None
+    storage = [float(s) * GB_PER_UNIT[su] for s, su, _, _ in variants]
+    ram = [float(r) * GB_PER_UNIT[ru] for _, _, r, ru in variants]
+    return min(ram), max(ram), min(storage), max(storage), float(len(variants))
+
+
+def _first(pattern, marker=None):
+    def extract(text):
+        if marker is not None and marker not in text:
+            return None
+        m = pattern.search(text)
+        return (float(m.group(1)),) if m else None
+    return extract
+
+
+# (section, key, extractor returning a tuple or None, output fields)
+EXTRACTORS = [
+    ("Body", "Dimensions", _dimensions, ("height_mm", "width_mm", "thickness_mm")),
+    ("Body", "Weight", _first(WEIGHT_RE, " g"), ("weight_g",)),
+    ("Display", "Type", _brightness, ("peak_nits", "hbm_nits")),
+    ("Display", "Type", _refresh, ("max_refresh_hz",)),
+    ("Display", "Size", _first(SIZE_RE, "inches"), ("display_inches",)),
+    ("Display", "Size", _first(SCREEN_TO_BODY_RE, "screen-to-body"), ("screen_to_body_pct",)),
+    ("Display", "Resolution", _resolution, ("resolution_width_px", "resolution_height_px")),
+    ("Display", "Resolution", _first(PPI_RE, "ppi"), ("ppi",)),
+    ("Memory", "Internal", _memory, ("ram_gb_min", "ram_gb_max", "storage_gb_min", "storage_gb_max",
+                                     "memory_variants")),
+    ("Battery", "Type", _first(BATTERY_RE, "mAh"), ("battery_mah",)),
+    ("Battery", "Charging", _first(WIRED_RE, "wired"), ("wired_charging_w",)),
+    ("Battery", "Charging", _first(WIRELESS_RE, "W wireless"), ("wireless_charging_w",)),
+    ("Launch", "Announced", _first(YEAR_RE), ("announced_year",)),
+]
+FIELDS = [field for *_, outputs in EXTRACTORS for field in outputs]
+
+# GSMArena states these only when they apply (no nits on basic LCDs, no screen-to-body ratio on
+# watches, no wireless charging on budget phones), so an empty result is not a parse failure
+OPTIONAL_FIELDS = {"peak_nits", "hbm_nits", "max_refresh_hz", "screen_to_body_pct", "wired_charging_w",
+                   "wireless_charging_w"}
+
+
+def _unfolded_dimensions(text):
+    return _dimensions(text, folded=False)
+
+
+def _extractors(folded):
+    """EXTRACTORS with the dimensions read from the folded or the unfolded state of foldables."""
+    if folded:
+        return EXTRACTORS
+    return [(section, key, _unfolded_dimensions if extract is _dimensions else extract, outputs)
+            for section, key, extract, outputs in EXTRACTORS]
+
+
+def _source(phone, section, key):
+    return ((phone.get("specs") or {}).get(section) or {}).get(key) or ""
+
+
+def parse_specs(phone, folded=True):
+    """{field: float} for one phone record (NaN where missing); folded as in parse_batch()."""
+    row = dict.fromkeys(FIELDS, NAN)
+    for section, key, extract, outputs in _extractors(folded):
+        values = extract(_source(phone, section, key))
+        if values is not None:
+            row.update(zip(outputs, values))
+    return row
+
+
+def parse_batch(phones, folded=True):
+    """
+    Parses every phone, one extractor at a time.
+
+    Args:
+        phones: Phone records of phones_db.json.
+        folded: Dimensions of foldables in the folded state (the pocket size the 1.4 ergonomics
+            rule scores); False reads the unfolded state (the full chassis area, e.g. for heat).
+
+    Returns:
+        columns: {field: float64 array (N,)}, NaN where missing
+        report: {field: {"seconds", "missing", "failures", "parsed"}}; seconds is the time of the
+            extractor that produced the field (shared by fields parsed from the same string)
+    """
+    n = len(phones)
+    columns = {field: np.full(n, np.nan) for field in FIELDS}
+    report = {}
+    specs = [p.get("specs") or {} for p in phones]
+    for section, key, extract, outputs in _extractors(folded):
+        t0 = time.perf_counter()
+        texts = [(s.get(section) or {}).get(key) or "" for s in specs]
+        missing = failures = 0
+        targets = [columns[field] for field in outputs]
+        for i, text in enumerate(texts):
+            if not text:
+                missing += 1
+                continue
+            values = extract(text)
+            if values is None:
+                failures += 1
+                continue
+            for target, value in zip(targets, values):
+                target[i] = value
+        seconds = time.perf_counter() - t0
+        for field, target in zip(outputs, targets):
+            # Counted from the column: an extractor may leave one of its fields NaN (no peak nits)
+            report[field] = {"seconds": seconds, "missing": missing,
+                             "failures": 0 if field in OPTIONAL_FIELDS else failures,
+                             "parsed": int(np.sum(~np.isnan(target)))}
+    return columns, report
+
+
+def load_phones(db_path=PHONES_DB_PATH):
+    with open(db_path, encoding="utf-8") as f:
+        return json.load(f).get("phones", [])
+
+
+def main(db_path=PHONES_DB_PATH, benchmark_rows=BENCHMARK_ROWS):
+    phones = load_phones(db_path)
+    columns, report = parse_batch(phones)
+
+    print(f"\n=== SPEC PARSER v{PARSER_VERSION}: {len(phones)} phones, {len(FIELDS)} fields ===")
+    print("\n| Field                  | Parsed | Missing | Failures | Median     | Range               |")
+    print("| :--------------------- | :----: | :-----: | :------: | :--------: | :-----------------: |")
+    for field in FIELDS:
+        values, r = columns[field], report[field]
+        finite = values[~np.isnan(values)]
+        median = f"{np.median(finite):.1f}" if finite.size else "-"
+        span = f"{finite.min():.1f} - {finite.max():.1f}" if finite.size else "-"
+        print(f"| {field:<22} | {r['parsed']:>6} | {r['missing']:>7} | {r['failures']:>8} | {median:>10} | {span:>19} |")
+
+    # Throughput: the database replicated to benchmark_rows records
+    batch = (phones * (benchmark_rows // max(len(phones), 1) + 1))[:benchmark_rows]
+    t0 = time.perf_counter()
+    _, report = parse_batch(batch)
+    total = time.perf_counter() - t0
+    print(f"\nThroughput on {len(batch):,} phones: {total:.2f} s ({total / len(batch) * 1e6:.1f} us/phone)")
+    print("\n| Extractor source        | Fields                                   | Seconds |")
+    print("| :---------------------- | :--------------------------------------- | :-----: |")
+    for section, key, _, outputs in EXTRACTORS:
+        print(f"| {section + '.' + key:<23} | {', '.join(outputs)[:40]:<40} | {report[outputs[0]]['seconds']:>7.3f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+TDSI Method C: Thermodynamic RC Model (scoring_rules.md Section 6.10.C)
+-----------------------------------------------------------------------
+Batched solver of the lumped resistor-capacitor thermal model for every phone in
+data/phones_db.json, with the ambient temperature as an extra array dimension.
+
+Per phone (Section 6.10.C.2 - 4):
+
+    1 / R_total = 1 / R_front + 1 / R_back + 1 / R_frame          (parallel paths, K/W)
+    C           = mass_kg * 850 + subscore_pcm * 25                 (J/K)
+    tau         = R_total * C                                       (s)
+    T(t)        = T_amb + power_in * R_total * (1 - exp(-t / tau))  (step input power)
+
+    power_admissible     = rise_limit / (R_total * (1 - exp(-1200 / tau)))
+    power_admissible_soc = power_admissible - power_base_needs
+    power_ratio          = power_admissible_soc / power_peak_soc
+    stability_pct        = 100 * power_ratio^0.333                  (gamma bridge, clamped 0 - 100)
+    TDSI                 = 10 * log(stability / 40) / log(100 / 40) (clamped 0 - 10)
+
+with rise_limit = 45 C - T_amb (20 K at the standard 25 C ambient, 15 K at 30 C). The
+stability_pct column is the quantity the charging scripts feed to calc_tdsi_and_power_ratio
+(section_8_2 working_files/sweep_huber_delta_fine.py). That function uses the same 40 / 100
+log anchors, and its power_ratio = (stability / 100)^3 inverts the bridge.
+
+Besides the 1200 s admissible power, the transient of the unthrottled workload
+(power_in = power_peak_soc + power_base_needs) is solved in closed form: the time at which
+the skin reaches the limit (throttle onset) and, with curves=True, the temperature and power
+trajectories on a time grid. Once the limit is reached the governor holds it, so the power
+drops to rise_limit / R_total.
+
+All inputs are (N,) arrays and the ambient temperatures an (A,) array, so every output is
+computed for all phones and ambients at once with shape (A, N). Curves are (A, N, n_t).
+
+Inputs come from the GSMArena spec strings (Body dimensions / weight / build, Display type /
+size / resolution / refresh rate, Platform chipset; dimensions, weight and display through
+spec_parser.parse_batch, unfolded for foldables) and the power_peak_soc_w column of
+docs/references/soc_reference.md. Cooling hardware (vapor chamber area, graphite layer, fan,
+PCM buffer) is not part of the GSMArena specs. It defaults to "None" (the Section 6.10.C
+value when no spreader is documented) and is set per phone through the `cooling` argument of
+extract_thermal_inputs (keyed by model name). Phones without a resolvable SoC or geometry
+(tablets on laptop-class chips, watches) are reported as unresolved with NaN outputs.
+
+Usage:
+    python src/tdsi_rc_model.py    (S24 Ultra worked-example check, then all phones at 25 / 30 C)
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+
+from spec_parser import parse_batch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHONES_DB_PATH = os.path.join(ROOT_DIR, "data", "phones_db.json")
+SOC_REFERENCE_PATH = os.path.join(ROOT_DIR, "docs", "references", "soc_reference.md")
+
+# Section 6.10.C constants
+H_PASSIVE = 10.0              # natural convection + radiation, W/m^2 K
+S_EFF_FRONT = 0.25            # front screen spreading (PCB thermal wall)
+FRAME_CHI = 0.85              # mid-frame band height factor
+F_FAN = 0.10                  # back-panel fraction of the fan duct
+H_FAN_DEFAULT = 80.0          # fan present but speed / diameter unknown
+ALPHA_VC = 2.7                # vapor chamber spreading constant
+SPECIFIC_HEAT = 850.0         # J/kg K
+C_PCM = 25.0                  # J/K per unit PCM subscore
+T_WINDOW_S = 1200.0           # 3DMark Wild Life Extreme stress window
+T_SKIN_LIMIT_C = 45.0         # ergonomic limit (20 K over the standard 25 C ambient)
+P_STATIC_BASE = 0.40          # logic board baseline, W
+BRIGHTNESS_SCALE = 2.5        # 200 -> 500 nits
+K_HEAT_CONVERSION = 0.95
+GAMMA_BRIDGE = 0.333
+THERMAL_STABILITY_MIN = 40.0  # scoring_constants.md
+THERMAL_STABILITY_MAX = 100.0
+DEFAULT_AMBIENTS_C = (25.0, 30.0)
+
+# Frame material -> frame s_eff; back material -> (s_0, s_max) (Section 6.10.C.2.4)
+FRAME_S_EFF = {1: 1.00, 2: 0.40, 3: 0.05}
+BACK_SATURATION = {1: (0.60, 1.00), 2: (0.25, 1.00), 3: (0.05, 0.95)}
+MATERIAL_CLASSES = [  # first keyword found in the material phrase wins
+    ("aluminum", 1), ("aluminium", 1), ("magnesium", 1), ("zinc", 1),
+    ("stainless steel", 2), ("titanium", 2), ("amorphous", 2),
+    ("ceramic", 3), ("glass", 3), ("sapphire", 3), ("plastic", 3), ("polymer", 3), ("leather", 3),
+]
+
+# Graphite / graphene layer -> (alpha, phi)
+GRAPHITE_LAYERS = {
+    "None (SoC Only)": (0.0, 0.00),
+    "Standard Graphite Sheet": (0.6, 0.40),
+    "Multi-layer Graphite": (0.8, 0.50),
+    "Synthetic Graphene Film": (1.2, 0.50),
+}
+DEFAULT_COOLING = {"vc_area_mm2": 0.0, "graphite": "None (SoC Only)", "fan_rpm": 0.0, "fan_diameter_mm": 0.0,
+                   "pcm_subscore": 0.0}
+
+# Panel technology keyword -> C_panel (W/cm^2 at 200 nits); first match wins
+PANEL_EFFICIENCY = [("tandem", 0.0035), ("ltpo", 0.0035), ("oled", 0.0045), ("lcd", 0.0060), ("ips", 0.0060),
+                    ("tft", 0.0060), ("pls", 0.0060)]
+
+INPUT_FIELDS = ["height_mm", "width_mm", "thickness_mm", "weight_g", "frame_class", "back_class",
+                "diagonal_in", "aspect_ratio", "megapixels", "max_hz", "c_panel", "power_peak_soc",
+                "vc_area_mm2", "graphite_alpha", "graphite_phi", "h_fan", "pcm_subscore"]
+
+
+def load_soc_power_table(path=SOC_REFERENCE_PATH):
+    """{SoC name: power_peak_soc_w} from the Markdown tables of soc_reference.md."""
+    table = {}
+    with open(path, encoding="utf-8") as f:
+        column = None
+        for line in f:
+            cells = [c.strip() for c in line.strip().strip("|").split("|")]
+            if "power_peak_soc_w" in cells:
+                column = cells.index("power_peak_soc_w")
+            elif column is not None and line.startswith("| **"):
+                name = re.sub(r"\s*\(Est\.\)", "", cells[0].strip("* "))
+                value = re.search(r"[\d.]+", cells[column])
+                if value and "Legacy" not in name:
+                    table[name] = float(value.group())
+            elif not line.startswith("|"):
+                column = None
+    return table
+
+
+def match_soc(chipset, soc_table):
+    """Reference SoC named in a GSMArena chipset string (earliest, then longest match), or None."""
+    if not chipset:
+        return None
+    best = None
+    for name in soc_table:
+        pattern = r"(?<![\w+])" + re.escape(name.lower()) + r"(?![\w+])"
+        m = re.search(pattern, chipset.lower())
+        if m and (best is None or (m.start(), -len(name)) < (best[0], -len(best[1]))):
+            best = (m.start(), name)
+    return None if best is None else best[1]
+
+
+def _material_class(build, part):
+    """Material class (1 - 3) of the '<material> back' / '<material> frame' phrase in a Build string."""
+    for phrase in (build or "").lower().split(","):
+        if part in phrase:
+            for keyword, cls in MATERIAL_CLASSES:
+                if keyword in phrase:
+                    return cls
+    return 3  # Material Not Disclosed
+
+
+def _phone_inputs(phone, soc_table, cooling):
+    """Build, panel, SoC and cooling inputs of one phone as a {field: float} dict (NaN where missing)."""
+    specs = phone.get("specs", {})
+    build = specs.get("Body", {}).get("Build")
+    panel = (specs.get("Display", {}).get("Type") or "").lower()
+    soc = match_soc(specs.get("Platform", {}).get("Chipset"), soc_table)
+
+    hw = dict(DEFAULT_COOLING, **cooling.get(phone.get("model_name"), {}))
+    alpha, phi = GRAPHITE_LAYERS[hw["graphite"]]
+    if hw["fan_rpm"] is None or hw["fan_diameter_mm"] is None:
+        h_fan = H_FAN_DEFAULT
+    elif hw["fan_rpm"] > 0:
+        h_fan = 10.0 + 100.0 * (hw["fan_rpm"] * hw["fan_diameter_mm"] / 240000.0) ** 0.8
+    else:
+        h_fan = 0.0
+
+    return {
+        "frame_class": _material_class(build, "frame"),
+        "back_class": _material_class(build, "back"),
+        "c_panel": next((c for keyword, c in PANEL_EFFICIENCY if keyword in panel), np.nan),
+        "power_peak_soc": soc_table[soc] if soc else np.nan,
+        "vc_area_mm2": hw["vc_area_mm2"], "graphite_alpha": alpha, "graphite_phi": phi,
+        "h_fan": h_fan, "pcm_subscore": hw["pcm_subscore"],
+    }, soc
+
+
+def extract_thermal_inputs(phones, soc_table=None, cooling=None):
+    """
+    Column table of the RC-model inputs.
+
+    Args:
+        phones: Phone records of phones_db.json.
+        soc_table: {SoC name: power_peak_soc_w} (default: load_soc_power_table()).
+        cooling: {model name: partial DEFAULT_COOLING dict} of documented cooling hardware
+            (vc_area_mm2, graphite identifier, fan_rpm / fan_diameter_mm with None for a
+            confirmed fan of unknown spec, pcm_subscore).
+
+    Returns:
+        ({field: (N,) array}, names, socs, resolved mask).
+    """
+    soc_table = load_soc_power_table() if soc_table is None else soc_table
+    rows, socs = zip(*(_phone_inputs(p, soc_table, cooling or {}) for p in phones))
+    columns = {field: [row[field] for row in rows] for field in rows[0]}
+
+    # Geometry from the spec parser; the unfolded state of foldables is the chassis that sheds heat
+    parsed, _ = parse_batch(phones, folded=False)
+    short_px = np.minimum(parsed["resolution_width_px"], parsed["resolution_height_px"])
+    long_px = np.maximum(parsed["resolution_width_px"], parsed["resolution_height_px"])
+    columns.update(
+        height_mm=parsed["height_mm"], width_mm=parsed["width_mm"], thickness_mm=parsed["thickness_mm"],
+        weight_g=parsed["weight_g"], diagonal_in=parsed["display_inches"],
+        aspect_ratio=long_px / short_px, megapixels=short_px * long_px / 1e6,
+        max_hz=np.where(np.isnan(parsed["max_refresh_hz"]), 60.0, parsed["max_refresh_hz"]),
+    )
+    inputs = {field: np.array(columns[field], dtype=float) for field in INPUT_FIELDS}
+    resolved = np.all([np.isfinite(inputs[f]) for f in INPUT_FIELDS], axis=0)
+    return inputs, [p.get("model_name", "") for p in phones], list(socs), resolved
+
+
+def tdsi_score(stability_pct):
+    """Logarithmic TDSI (0 - 10) of a stability percentage."""
+    return np.clip(10.0 * np.log(stability_pct / THERMAL_STABILITY_MIN)
+                   / np.log(THERMAL_STABILITY_MAX / THERMAL_STABILITY_MIN), 0.0, 10.0)
+
+
+def solve_rc(inputs, ambients_c=DEFAULT_AMBIENTS_C, t_window=T_WINDOW_S, curves=False, n_t=121):
+    """
+    Solves the RC model for every phone and ambient temperature at once.
+
+    Args:
+        inputs: Column table from extract_thermal_inputs().
+        ambients_c: Ambient temperatures (C), the leading output dimension.
+        t_window: Evaluation window (s).
+        curves: Also return the throttled temperature / power trajectories.
+        n_t: Points of the trajectory time grid over [0, t_window].
+
+    Returns:
+        Dict of (N,) chassis terms (resistances, capacitance, time constant, base and input
+        power) and (A, N) outputs: power_admissible, power_admissible_soc, power_ratio,
+        stability_pct, tdsi, throttle_onset_s (inf when the limit is never reached) and
+        temperature_end_unthrottled. With curves: "t" (n_t,), "temperature" and "power" (A, N, n_t).
+    """
+    x = inputs
+    h_m, w_m, d_m = x["height_mm"] / 1000.0, x["width_mm"] / 1000.0, x["thickness_mm"] / 1000.0
+    footprint = h_m * w_m
+    frame_area = 2.0 * (h_m + w_m) * d_m * FRAME_CHI
+
+    # Resistances (conduction terms omitted, Section 6.10.C.2.1 note)
+    s_0, s_max = (np.choose(x["back_class"].astype(int) - 1, [BACK_SATURATION[c][i] for c in (1, 2, 3)])
+                  for i in (0, 1))
+    effort = ALPHA_VC * x["vc_area_mm2"] / (x["height_mm"] * x["width_mm"]) + x["graphite_alpha"] * x["graphite_phi"]
+    s_eff_back = s_0 + (s_max - s_0) * (1.0 - np.exp(-effort))
+    f_fan = np.where(x["h_fan"] > 0, F_FAN, 0.0)
+    r_back = 1.0 / (footprint * (x["h_fan"] * f_fan + H_PASSIVE * (s_eff_back - f_fan)))
+    r_front = 1.0 / (H_PASSIVE * footprint * S_EFF_FRONT)
+    s_eff_frame = np.choose(x["frame_class"].astype(int) - 1, [FRAME_S_EFF[c] for c in (1, 2, 3)])
+    r_frame = 1.0 / (H_PASSIVE * frame_area * s_eff_frame)
+    r_total = 1.0 / (1.0 / r_front + 1.0 / r_back + 1.0 / r_frame)
+    capacitance = x["weight_g"] / 1000.0 * SPECIFIC_HEAT + x["pcm_subscore"] * C_PCM
+    tau = r_total * capacitance
+
+    # Heat generation (Section 6.10.C.4)
+    r = x["aspect_ratio"]
+    display_area = (x["diagonal_in"] * 2.54) ** 2 * (r / (r ** 2 + 1.0))
+    power_display = (display_area * x["c_panel"] * BRIGHTNESS_SCALE * (1.0 + 0.0025 * (x["max_hz"] - 60.0))
+                     * (1.0 + 0.025 * (x["megapixels"] - 2.0)) * K_HEAT_CONVERSION)
+    power_base = P_STATIC_BASE + power_display
+    power_in = x["power_peak_soc"] + power_base
+
+    # Ambient dimension: (A, 1) against (N,) chassis terms
+    ambients = np.asarray(ambients_c, dtype=float)[:, None]
+    rise_limit = T_SKIN_LIMIT_C - ambients
+    impedance = r_total * (1.0 - np.exp(-t_window / tau))
+    power_admissible = rise_limit / impedance
+    power_admissible_soc = power_admissible - power_base
+    power_ratio = power_admissible_soc / x["power_peak_soc"]
+    stability = 100.0 * np.clip(power_ratio, 0.0, 1.0) ** GAMMA_BRIDGE
+
+    steady_rise = power_in * r_total
+    with np.errstate(divide="ignore", invalid="ignore"):
+        onset = np.where(steady_rise > rise_limit, -tau * np.log1p(-rise_limit / steady_rise), np.inf)
+    out = {
+        "r_front": r_front, "r_back": r_back, "r_frame": r_frame, "r_total": r_total, "s_eff_back": s_eff_back,
+        "capacitance": capacitance, "time_constant": tau, "power_base": power_base, "power_in": power_in,
+        "ambients_c": ambients[:, 0], "power_admissible": power_admissible,
+        "power_admissible_soc": power_admissible_soc, "power_ratio": power_ratio, "stability_pct": stability,
+        "tdsi": tdsi_score(np.maximum(stability, 1e-12)), "throttle_onset_s": onset,
+        "temperature_end_unthrottled": ambients + steady_rise * (1.0 - np.exp(-t_window / tau)),
+    }
+    if curves:
+        t = np.linspace(0.0, t_window, n_t)
+        free = ambients[:, :, None] + (steady_rise * (1.0 - np.exp(-t[:, None] / tau))).T[None]
+        held = t[None, None, :] >= onset[:, :, None]
+        out["t"] = t
+        out["temperature"] = np.where(held, T_SKIN_LIMIT_C, free)
+        out["power"] = np.where(held, (rise_limit / r_total)[:, :, None], power_in[None, :, None])
+    return out
+
+
+def verify_worked_example():
+    """
+    Reproduces the Galaxy S24 Ultra worked example of proposed_data_structure.md (R_total 7.41 K/W,
+    tau 1461 s, power_admissible 4.82 W, power_ratio 0.2334, stability 61.6%, TDSI 4.71).
+    Returns the largest relative deviation.
+    """
+    s24 = {"height_mm": 162.3, "width_mm": 79.0, "thickness_mm": 8.6, "weight_g": 232.0, "frame_class": 2,
+           "back_class": 3, "diagonal_in": 6.8, "aspect_ratio": 19.5 / 9, "megapixels": 1440 * 3120 / 1e6,
+           "max_hz": 120.0, "c_panel": 0.0035, "power_peak_soc": 14.0, "vc_area_mm2": 4050.0,
+           "graphite_alpha": 0.8, "graphite_phi": 0.5, "h_fan": 0.0, "pcm_subscore": 0.0}
+    res = solve_rc({k: np.array([v], dtype=float) for k, v in s24.items()}, ambients_c=(25.0,))
+    expected = {"r_total": 7.41, "time_constant": 1461.0, "power_admissible": 4.82, "power_base": 1.5526,
+                "power_ratio": 0.2334, "stability_pct": 61.6, "tdsi": 4.71}
+    worst = max(abs(float(np.ravel(res[k])[0]) / v - 1.0) for k, v in expected.items())
+    status = "OK" if worst < 5e-3 else "MISMATCH"
+    print(f"S24 Ultra worked example | max rel deviation = {worst:.2e} | {status}")
+    return worst
+
+
+def main(db_path=PHONES_DB_PATH, ambients_c=DEFAULT_AMBIENTS_C, cooling=None):
+    verify_worked_example()
+    with open(db_path, encoding="utf-8") as f:
+        phones = json.load(f)["phones"]
+    inputs, names, socs, resolved = extract_thermal_inputs(phones, cooling=cooling)
+    res = solve_rc(inputs, ambients_c)
+
+    a0, a1 = ambients_c[0], ambients_c[-1]
+    print(f"\n=== TDSI METHOD C (RC MODEL): {int(resolved.sum())} / {len(names)} PHONES RESOLVED, "
+          f"AMBIENT {a0:.0f} C vs {a1:.0f} C ===")
+    print(f"| Phone                          | SoC                  | P_peak | R_total | C (J/K) | tau (s) | "
+          f"P_adm {a0:.0f}C | Stab {a0:.0f}C | Stab {a1:.0f}C | TDSI {a0:.0f}C | TDSI {a1:.0f}C | Onset {a0:.0f}C (s) |")
+    print("| :----------------------------- | :------------------- | :----: | :-----: | :-----: | :-----: | "
+          ":--------: | :-------: | :-------: | :-------: | :-------: | :-------------: |")
+    for i in np.flatnonzero(resolved):
+        name = names[i].split(" smartphone.")[0].split(" Android")[0].split(" tablet.")[0]
+        onset = res["throttle_onset_s"][0, i]
+        print(f"| {name[:30]:<30} | {socs[i][:20]:<20} | {inputs['power_peak_soc'][i]:>6.1f} | "
+              f"{res['r_total'][i]:>7.2f} | {res['capacitance'][i]:>7.1f} | {res['time_constant'][i]:>7.0f} | "
+              f"{res['power_admissible'][0, i]:>10.2f} | {res['stability_pct'][0, i]:>9.1f} | "
+              f"{res['stability_pct'][-1, i]:>9.1f} | {res['tdsi'][0, i]:>9.2f} | {res['tdsi'][-1, i]:>9.2f} | "
+              f"{'never' if np.isinf(onset) else f'{onset:.0f}':>15} |")
+    unresolved = [f"{' '.join(names[i].split()[:5])} ({socs[i] or 'SoC not in reference'})"
+                  for i in np.flatnonzero(~resolved)]
+    if unresolved:
+        print(f"\nUnresolved (missing SoC power or geometry): {'; '.join(unresolved)}")
+    print("\nCooling hardware defaults to 'None (SoC Only)' unless documented through `cooling`; "
+          "stability_pct is the input of calc_tdsi_and_power_ratio.")
+    return res
+
+
+if __name__ == "__main__":
+    main()